@@ -0,0 +1,58 @@
+import json
+import logging
+
+from fastapi import Request, Response
+
+from app.infrastructure.cache.codec import COMPRESSION_ZSTD, CacheEntry, zstd_compress
+
+logger = logging.getLogger(__name__)
+
+
+def accepts_encoding(request: Request, encoding: str) -> bool:
+    """
+    Indica se o cliente aceita o 'Content-Encoding' dado (cabeçalho
+    Accept-Encoding, ignorando as codificações com q=0).
+    """
+    for accepted in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = accepted.strip().partition(";")
+        if name.strip().lower() == encoding and params.replace(" ", "") != "q=0":
+            return True
+    return False
+
+
+def cached_json_response(
+    entry: CacheEntry, request: Request, **fields
+) -> Response | None:
+    """
+    Monta a resposta JSON {**fields, "data": <dados da entrada>} sem
+    desserializar os dados guardados no cache.
+
+    Se a entrada estiver comprimida com zstd e o cliente aceitar zstd, os bytes
+    guardados são enviados tal como estão, entre dois frames zstd com o início
+    e o fim do documento. Caso contrário, são apenas descomprimidos.
+
+    Returns:
+        Response | None: A resposta, ou None se a entrada não puder ser lida
+        (o chamador deve tratá-la como ausente).
+    """
+    head = json.dumps(fields)[:-1] + (', "data": ' if fields else '"data": ')
+    prefix, suffix = head.encode(), b"}"
+
+    if entry.compression == COMPRESSION_ZSTD and accepts_encoding(request, "zstd"):
+        return Response(
+            content=zstd_compress(prefix) + entry.payload + zstd_compress(suffix),
+            media_type="application/json",
+            headers={"Content-Encoding": "zstd", "Vary": "Accept-Encoding"},
+        )
+
+    try:
+        data = entry.json_bytes()
+    except ValueError as e:
+        logger.error(f"Entrada do cache ilegível: {e}")
+        return None
+
+    return Response(
+        content=prefix + data + suffix,
+        media_type="application/json",
+        headers={"Vary": "Accept-Encoding"},
+    )
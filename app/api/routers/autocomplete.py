@@ -1,20 +1,86 @@
+import math
+
 from fastapi import APIRouter, Depends, HTTPException, Query
 
+from app.config import settings
+from app.core.entities.location_bias import LocationBias
+from app.core.interfaces.autocomplete_repository import AutocompleteRepository
 from app.infrastructure.api_clients.autocomplete_client import AutocompleteService
+from app.infrastructure.api_clients.http_client import (
+    GOOGLE_PLACES_UPSTREAM,
+    get_http_client_pool,
+)
+from app.infrastructure.cache.cached_location_services import (
+    CachedAutocompleteService,
+)
+from app.infrastructure.cache.result_cache import get_result_cache
+from app.infrastructure.resilience.circuit_breaker import CircuitOpenError
+from app.infrastructure.resilience.rate_limiter import RateLimitExceededError
 
 router = APIRouter(tags=["Places"])
 
 
-def get_autocomplete_service() -> AutocompleteService:
-    return AutocompleteService()
+AUTOCOMPLETE_CACHE_NAME = "autocomplete"
+
+
+def get_autocomplete_service() -> AutocompleteRepository:
+    client = get_http_client_pool().get_client(GOOGLE_PLACES_UPSTREAM)
+    return CachedAutocompleteService(
+        repository=AutocompleteService(client=client),
+        cache=get_result_cache(
+            AUTOCOMPLETE_CACHE_NAME,
+            settings.AUTOCOMPLETE_CACHE_TTL,
+            prefix_window=settings.AUTOCOMPLETE_PREFIX_WINDOW,
+        ),
+    )
 
 
 @router.get("/suggestions")
 async def autocomplete_place(
     query: str = Query(..., description="Termo de busca para sugestões de lugares"),
-    autocomplete_service: AutocompleteService = Depends(get_autocomplete_service),
+    latitude: float | None = Query(
+        None, ge=-90, le=90, description="Latitude do centro do viés de localização"
+    ),
+    longitude: float | None = Query(
+        None,
+        ge=-180,
+        le=180,
+        description="Longitude do centro do viés de localização",
+    ),
+    radius: float = Query(
+        5000.0,
+        gt=0,
+        le=50000,
+        description="Raio, em metros, do viés de localização",
+    ),
+    autocomplete_service: AutocompleteRepository = Depends(get_autocomplete_service),
 ):
+    """
+    Retorna sugestões de lugares para o termo de busca. Com latitude e
+    longitude, as sugestões próximas desse ponto (dentro de 'radius') são
+    priorizadas.
+    """
+    if (latitude is None) != (longitude is None):
+        raise HTTPException(
+            status_code=422,
+            detail="Informe latitude e longitude juntas para o viés de localização.",
+        )
+
+    location_bias = None
+    if latitude is not None and longitude is not None:
+        location_bias = LocationBias(
+            latitude=latitude, longitude=longitude, radius=radius
+        )
+
     try:
-        return autocomplete_service.get_suggestions(query=query)
+        return await autocomplete_service.get_suggestions(
+            query=query, location_bias=location_bias
+        )
+    except (CircuitOpenError, RateLimitExceededError) as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
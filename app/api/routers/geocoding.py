@@ -1,26 +1,146 @@
+import asyncio
+import math
+from collections.abc import Awaitable, Callable
+from typing import Any
+
 from fastapi import APIRouter, Depends, HTTPException, Query
 
+from app.api.schemas.places import GeocodeBatchRequest, ReverseGeocodeBatchRequest
+from app.config import settings
+from app.core.interfaces.geocode_repository import GeocodeRepository
+from app.core.interfaces.reverse_geocode_repository import ReverseGeocodeRepository
+from app.core.utils.text import normalize_text
 from app.infrastructure.api_clients.geocode_client import GeocodeService
+from app.infrastructure.api_clients.http_client import (
+    GOOGLE_MAPS_UPSTREAM,
+    get_http_client_pool,
+)
 from app.infrastructure.api_clients.reverse_geocode_client import ReverseGeocodeService
+from app.infrastructure.cache.cached_location_services import (
+    CachedGeocodeService,
+    CachedReverseGeocodeService,
+    snap_coordinates,
+)
+from app.infrastructure.cache.result_cache import get_result_cache
+from app.infrastructure.resilience.circuit_breaker import CircuitOpenError
+from app.infrastructure.resilience.rate_limiter import RateLimitExceededError
 
 router = APIRouter(prefix="/geocoding", tags=["Geocoding"])
 
 
-def get_geocode_service() -> GeocodeService:
-    return GeocodeService()
+GEOCODE_CACHE_NAME = "geocode"
+REVERSE_GEOCODE_CACHE_NAME = "reverse_geocode"
+
+
+def _build_geocode_service(
+    concurrency: asyncio.Semaphore | None = None,
+) -> CachedGeocodeService:
+    client = get_http_client_pool().get_client(GOOGLE_MAPS_UPSTREAM)
+    return CachedGeocodeService(
+        repository=GeocodeService(client=client),
+        cache=get_result_cache(GEOCODE_CACHE_NAME, settings.GEOCODE_CACHE_TTL),
+        concurrency=concurrency,
+    )
+
+
+def _build_reverse_geocode_service(
+    concurrency: asyncio.Semaphore | None = None,
+) -> CachedReverseGeocodeService:
+    client = get_http_client_pool().get_client(GOOGLE_MAPS_UPSTREAM)
+    return CachedReverseGeocodeService(
+        repository=ReverseGeocodeService(client=client),
+        cache=get_result_cache(REVERSE_GEOCODE_CACHE_NAME, settings.GEOCODE_CACHE_TTL),
+        concurrency=concurrency,
+    )
+
+
+def get_geocode_service() -> GeocodeRepository:
+    return _build_geocode_service()
+
+
+def get_reverse_geocode_service() -> ReverseGeocodeRepository:
+    return _build_reverse_geocode_service()
+
+
+def get_batch_geocode_service() -> GeocodeRepository:
+    """
+    Serviço de geocodificação de um lote: as chamadas ao Google do pedido
+    ficam limitadas a GEOCODE_BATCH_CONCURRENCY em simultâneo.
+    """
+    return _build_geocode_service(asyncio.Semaphore(settings.GEOCODE_BATCH_CONCURRENCY))
+
+
+def get_batch_reverse_geocode_service() -> ReverseGeocodeRepository:
+    """
+    Serviço de geocodificação reversa de um lote (ver get_batch_geocode_service).
+    """
+    return _build_reverse_geocode_service(
+        asyncio.Semaphore(settings.GEOCODE_BATCH_CONCURRENCY)
+    )
+
 
+def _describe_error(error: Exception) -> dict:
+    """
+    Descreve a falha de um item de um lote com o código HTTP que a rota
+    individual devolveria.
+    """
+    if isinstance(error, HTTPException):
+        return {"status_code": error.status_code, "detail": error.detail}
+    if isinstance(error, (CircuitOpenError, RateLimitExceededError)):
+        return {
+            "status_code": 503,
+            "detail": str(error),
+            "retry_after": math.ceil(error.retry_after),
+        }
+    return {"status_code": 500, "detail": str(error)}
 
-def get_reverse_geocode_service() -> ReverseGeocodeService:
-    return ReverseGeocodeService()
+
+async def _resolve_batch(
+    keys: list[str], resolve: Callable[[int], Awaitable[Any]]
+) -> list[dict]:
+    """
+    Resolve os itens de um lote em paralelo, uma única vez por chave repetida,
+    e devolve os resultados na ordem de entrada.
+
+    Args:
+        keys (list[str]): Chave (normalizada) de cada item.
+        resolve: Função que resolve o item da posição dada.
+    """
+    first_index: dict[str, int] = {}
+    for index, key in enumerate(keys):
+        first_index.setdefault(key, index)
+
+    unique_indexes = list(first_index.values())
+    outcomes = await asyncio.gather(
+        *(resolve(index) for index in unique_indexes), return_exceptions=True
+    )
+    outcome_by_key = {
+        keys[index]: outcome for index, outcome in zip(unique_indexes, outcomes)
+    }
+
+    results: list[dict] = []
+    for key in keys:
+        outcome = outcome_by_key[key]
+        if isinstance(outcome, Exception):
+            results.append({"result": None, "error": _describe_error(outcome)})
+        else:
+            results.append({"result": outcome, "error": None})
+    return results
 
 
 @router.get("/")
 async def geocode_place(
     address: str = Query(..., description="Endereço completo para geocodificação"),
-    geocode_service: GeocodeService = Depends(get_geocode_service),
+    geocode_service: GeocodeRepository = Depends(get_geocode_service),
 ):
     try:
-        return geocode_service.get_coordinates(address=address)
+        return await geocode_service.get_coordinates(address=address)
+    except (CircuitOpenError, RateLimitExceededError) as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -29,13 +149,65 @@ async def geocode_place(
 async def reverse_geocode_place(
     latitude: float = Query(..., description="Latitude do local"),
     longitude: float = Query(..., description="Longitude do local"),
-    reverse_geocode_service: ReverseGeocodeService = Depends(
+    reverse_geocode_service: ReverseGeocodeRepository = Depends(
         get_reverse_geocode_service
     ),
 ):
     try:
-        return reverse_geocode_service.get_address(
+        return await reverse_geocode_service.get_address(
             latitude=latitude, longitude=longitude
         )
+    except (CircuitOpenError, RateLimitExceededError) as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch")
+async def geocode_batch(
+    request: GeocodeBatchRequest,
+    geocode_service: GeocodeRepository = Depends(get_batch_geocode_service),
+):
+    """
+    Geocodifica vários endereços num só pedido. Os resultados vêm na ordem de
+    entrada, cada um com "result" ou, se falhou, "error".
+    """
+    addresses = request.addresses
+    results = await _resolve_batch(
+        [normalize_text(address) for address in addresses],
+        lambda index: geocode_service.get_coordinates(address=addresses[index]),
+    )
+    return {"results": results}
+
+
+@router.post("/reverse/batch")
+async def reverse_geocode_batch(
+    request: ReverseGeocodeBatchRequest,
+    reverse_geocode_service: ReverseGeocodeRepository = Depends(
+        get_batch_reverse_geocode_service
+    ),
+):
+    """
+    Obtém os endereços de várias coordenadas num só pedido. Os resultados vêm
+    na ordem de entrada, cada um com "result" ou, se falhou, "error".
+    """
+    coordinates = request.coordinates
+    results = await _resolve_batch(
+        [
+            snap_coordinates(
+                item.latitude,
+                item.longitude,
+                settings.REVERSE_GEOCODE_COORDINATE_PRECISION,
+            )
+            for item in coordinates
+        ],
+        lambda index: reverse_geocode_service.get_address(
+            latitude=coordinates[index].latitude,
+            longitude=coordinates[index].longitude,
+        ),
+    )
+    return {"results": results}
@@ -1,41 +1,142 @@
+import asyncio
 import json
+import logging
+import math
+import time
+from collections.abc import AsyncGenerator, Iterator
 from datetime import date, timedelta
+from typing import Literal
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, status
+import numpy as np
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    status,
+)
+from fastapi.responses import StreamingResponse
 
+from app.api.cached_responses import cached_json_response
 from app.api.schemas.coordinates import CoordinateScheme
-from app.config import settings
-from app.infrastructure.api_clients.crossfire_client import CrossfireAPIService
-from app.infrastructure.auth.crossfire_auth_service import CrossfireAuthService
-from app.infrastructure.cache.redis_cache_service import RedisClient, get_redis_client
+from app.api.schemas.routes import RouteCorridorRequest
+from app.celery_app import app as celery_app
+from app.config import HotspotCity, settings
+from app.core.entities.bounding_box import BoundingBox
+from app.core.utils.polyline import decode_polyline
+from app.core.utils.route_corridor import (
+    densify_route,
+    occurrences_along_route,
+    route_grid_cells,
+    route_length_km,
+)
+from app.core.utils.spatial_index import (
+    build_grid_index,
+    count_grid_cells,
+    grid_cells_in,
+    occurrences_in_bbox,
+    occurrences_in_radius,
+    radius_bounding_box,
+)
+from app.core.utils.text import normalize_text
+from app.core.utils.tiles import tile_key
+from app.infrastructure.api_clients.crossfire_client import (
+    CrossfireAPIService,
+    PartialOccurrencesError,
+)
+from app.infrastructure.api_clients.crossfire_directory import (
+    CrossfireLocationDirectory,
+    get_crossfire_location_directory,
+)
+from app.infrastructure.api_clients.http_client import (
+    GOOGLE_MAPS_UPSTREAM,
+    get_crossfire_http_client,
+    get_google_maps_http_client,
+)
+from app.infrastructure.auth.crossfire_token_manager import (
+    CrossfireTokenManager,
+    get_crossfire_token_manager,
+)
+from app.infrastructure.cache.async_redis_cache_service import (
+    AsyncRedisClient,
+    get_async_redis_client,
+)
+from app.infrastructure.cache.codec import CacheEntry
+from app.infrastructure.cache.hot_cache import HotCache, get_hot_cache
+from app.infrastructure.geo.municipality_resolver import (
+    MunicipalityResolver,
+    get_municipality_resolver,
+)
+from app.infrastructure.resilience.circuit_breaker import CircuitOpenError
+from app.infrastructure.resilience.rate_limiter import (
+    REVERSE_GEOCODE_RATE_LIMIT,
+    RateLimitExceededError,
+)
+from app.infrastructure.resilience.single_flight import SingleFlight
+from app.infrastructure.resilience.upstream import call_upstream
 
-router = APIRouter(prefix="/occurrences", tags=["Occurrences"])
+logger = logging.getLogger(__name__)
 
+router = APIRouter(prefix="/occurrences", tags=["Occurrences"])
 
-CACHE_KEY = "analysis_result_salvador"
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_CHUNK_SIZE = 64 * 1024
+REFRESH_LOCK_TTL_MS = 60_000
+HOTSPOTS_REFRESH_LOCK_TTL_MS = 15 * 60_000
+FILL_POLL_INTERVAL = 0.2
+# Acima deste número de células, percorrer a lista da cidade sai mais barato
+MAX_GRID_CELLS = 4096
 
-def get_crossfire_auth_service() -> CrossfireAuthService:
-    return CrossfireAuthService()
+# Junta os preenchimentos simultâneos da mesma chave dentro do processo
+_occurrence_fills = SingleFlight()
 
 
-def get_occurrence_gateway() -> CrossfireAPIService:
-    return CrossfireAPIService()
+def get_occurrence_gateway(
+    client: httpx.AsyncClient = Depends(get_crossfire_http_client),
+    location_directory: CrossfireLocationDirectory = Depends(
+        get_crossfire_location_directory
+    ),
+    token_manager: CrossfireTokenManager = Depends(get_crossfire_token_manager),
+) -> CrossfireAPIService:
+    return CrossfireAPIService(
+        client=client,
+        location_directory=location_directory,
+        token_manager=token_manager,
+    )
 
 
-async def get_city_and_state(latitude: float, longitude: float) -> tuple[str, str]:
+async def get_city_and_state(
+    latitude: float,
+    longitude: float,
+    client: httpx.AsyncClient,
+    municipality_resolver: MunicipalityResolver,
+) -> tuple[str, str]:
     """
-    Obtém cidade e estado a partir da latitude e longitude usando a API do Google.
+    Obtém cidade e estado a partir da latitude e longitude.
+
+    A coordenada é resolvida pelos limites municipais em memória; a API do
+    Google só é consultada para pontos que eles não cobrem.
     """
+    resolved = municipality_resolver.resolve(latitude, longitude)
+    if resolved is not None:
+        return resolved
+
     url = (
         f"https://maps.googleapis.com/maps/api/geocode/json"
         f"?latlng={latitude},{longitude}&key={settings.GOOGLE_MAPS_API_KEY}"
     )
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        data = response.json()
+    response = await call_upstream(
+        GOOGLE_MAPS_UPSTREAM,
+        lambda: client.get(url),
+        rate_limit=REVERSE_GEOCODE_RATE_LIMIT,
+    )
+    response.raise_for_status()
+    data = response.json()
 
     cidade = estado = None
     if data["status"] == "OK":
@@ -54,111 +155,1216 @@ async def get_city_and_state(latitude: float, longitude: float) -> tuple[str, st
     return cidade, estado
 
 
-@router.get("/")
-async def get_occurrences(
-    coordinates: CoordinateScheme = Depends(),
-    crossfire_auth_service: CrossfireAuthService = Depends(get_crossfire_auth_service),
-    occurrence_gateway: CrossfireAPIService = Depends(get_occurrence_gateway),
-    redis_client: RedisClient = Depends(get_redis_client),
-):
+OCCURRENCES_DAYS_TO_SEARCH = 31
+
+
+def _occurrences_cache_key(city: str, state: str) -> str:
+    # A chave não tem a data: na mudança de dia o valor anterior continua
+    # a ser servido enquanto é atualizado, em vez de todos os pedidos
+    # falharem o cache ao mesmo tempo
+    return (
+        f"ocorrences_raw_{city.lower()}_{state.lower()}"
+        f"_last{OCCURRENCES_DAYS_TO_SEARCH}days"
+    )
+
+
+def _occurrences_date_range() -> tuple[str, str]:
     """
-    Retorna as ocorrências brutas para a cidade/estado obtidos pela latitude e longitude.
+    Datas inicial e final (AAAA-MM-DD) da busca das ocorrências recentes.
     """
-    try:
-        days_to_search = 31
+    today = date.today()
+    initial_date = today - timedelta(days=OCCURRENCES_DAYS_TO_SEARCH)
+    return initial_date.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d")
 
-        city, state = await get_city_and_state(
-            coordinates.latitude, coordinates.longitude
+
+def _upstream_http_exception(error: Exception) -> HTTPException:
+    """
+    Converte uma falha na obtenção das ocorrências no erro HTTP da resposta.
+    """
+    if isinstance(error, PartialOccurrencesError):
+        return HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Erro na API do CrossFire. {error}",
+        )
+    if isinstance(error, (CircuitOpenError, RateLimitExceededError)):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serviço externo temporariamente indisponível.",
+            headers={"Retry-After": str(math.ceil(error.retry_after))},
+        )
+    if isinstance(error, ValueError):
+        return HTTPException(status_code=401, detail=str(error))
+    if isinstance(error, httpx.HTTPStatusError):
+        return HTTPException(
+            status_code=error.response.status_code,
+            detail=f"Erro na API do CrossFire. {error.response.text}",
         )
+    if isinstance(error, httpx.RequestError):
+        return HTTPException(
+            status_code=503,
+            detail="Não foi possível conectar à API do CrossFire no momento.",
+        )
+    return HTTPException(
+        status_code=500, detail=f"Ocorreu um erro inesperado: {str(error)}"
+    )
 
-        today = date.today()
-        today_str = today.strftime("%Y-%m-%d")
 
-        analysis_id = (
-            f"ocorrences_raw_{city.lower()}_{state.lower()}"
-            f"_{today_str}_last{days_to_search}days"
-        )
+def _grid_cache_key(analysis_id: str) -> str:
+    return f"{analysis_id}:grid"
+
+
+async def _index_occurrences(
+    redis_client: AsyncRedisClient, analysis_id: str, occurrences: list
+):
+    """
+    Guarda o índice espacial das ocorrências: um hash com as ocorrências de
+    cada célula da grelha, para que as consultas por raio ou retângulo leiam
+    apenas as células que tocam.
+    """
+    grid = await asyncio.to_thread(
+        build_grid_index, occurrences, settings.OCCURRENCES_GRID_CELL_SIZE
+    )
+    await redis_client.set_swr_hash_cache(
+        _grid_cache_key(analysis_id),
+        grid,
+        fresh_for=settings.OCCURRENCES_CACHE_TTL,
+        stale_for=settings.OCCURRENCES_CACHE_STALE_TTL,
+    )
+
+
+async def _cache_occurrences(
+    redis_client: AsyncRedisClient,
+    hot_cache: HotCache,
+    analysis_id: str,
+    occurrences: list,
+):
+    if await redis_client.set_swr_cache(
+        analysis_id,
+        occurrences,
+        fresh_for=settings.OCCURRENCES_CACHE_TTL,
+        stale_for=settings.OCCURRENCES_CACHE_STALE_TTL,
+        item_per_line=True,
+    ):
+        await hot_cache.publish_invalidation(analysis_id)
+    await _index_occurrences(redis_client, analysis_id, occurrences)
 
-        cached_data = redis_client.get_json_cache(analysis_id)
 
-        if cached_data:
-            return {"message": "Raw occurrences list (cached)", "data": cached_data}
+async def _refresh_occurrences_cache(
+    analysis_id: str,
+    city: str,
+    state: str,
+    initial_date: str,
+    final_date: str,
+    occurrence_gateway: CrossfireAPIService,
+    redis_client: AsyncRedisClient,
+    hot_cache: HotCache,
+):
+    """
+    Atualiza em segundo plano um cache de ocorrências expirado ou prestes a
+    expirar. Um lock no Redis garante que apenas um processo faz a atualização
+    de cada chave.
+    """
+    lock_key = f"{analysis_id}:refresh"
+    owner = await redis_client.acquire_lock(lock_key, REFRESH_LOCK_TTL_MS)
+    if owner is None:
+        return
 
-        access_token = crossfire_auth_service.get_auth_token(
-            settings.EMAIL_CROSSFIRE_API, settings.PASSWORD_CROSSFIRE_API
+    try:
+        occurrences = await occurrence_gateway.get_occurrences(
+            city_name=city,
+            state_name=state,
+            initial_date=initial_date,
+            final_date=final_date,
         )
-        if not access_token:
-            raise ValueError("Não foi possível obter o token de autenticação.")
-        occurrence_gateway.set_access_token(access_token)
+        await _cache_occurrences(redis_client, hot_cache, analysis_id, occurrences)
+    except Exception:
+        logger.exception(f"Falha ao atualizar o cache '{analysis_id}'.")
+    finally:
+        await redis_client.release_lock(lock_key, owner)
 
-        final_date = today_str
-        initial_date = (today - timedelta(days=days_to_search)).strftime("%Y-%m-%d")
 
+async def _fill_occurrences_cache(
+    analysis_id: str,
+    city: str,
+    state: str,
+    initial_date: str,
+    final_date: str,
+    occurrence_gateway: CrossfireAPIService,
+    redis_client: AsyncRedisClient,
+    hot_cache: HotCache,
+) -> list:
+    """
+    Obtém as ocorrências de uma chave sem cache e guarda-as.
+
+    Usa o mesmo lock de '_refresh_occurrences_cache': se outro processo já
+    estiver a buscar a chave, aguarda até OCCURRENCES_FILL_WAIT segundos que
+    ele a publique, em vez de repetir a busca no CrossFire.
+    """
+    lock_key = f"{analysis_id}:refresh"
+    owner = await redis_client.acquire_lock(lock_key, REFRESH_LOCK_TTL_MS)
+
+    if owner is None:
+        deadline = time.monotonic() + settings.OCCURRENCES_FILL_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(FILL_POLL_INTERVAL)
+            cached = await redis_client.get_swr_cache(analysis_id)
+            if cached is not None:
+                filled: list = cached[0]
+                return filled
+
+    try:
         occurrences = await occurrence_gateway.get_occurrences(
             city_name=city,
             state_name=state,
             initial_date=initial_date,
             final_date=final_date,
         )
+        await _cache_occurrences(redis_client, hot_cache, analysis_id, occurrences)
+        return occurrences
+    finally:
+        if owner is not None:
+            await redis_client.release_lock(lock_key, owner)
+
 
-        redis_client.set_json_cache(analysis_id, occurrences, expire=3600)
+async def _request_hotspots_refresh(redis_client: AsyncRedisClient, city: HotspotCity):
+    """
+    Pede ao worker que recalcule os hotspots da cidade. O lock não é libertado
+    após o pedido, para que não seja repetido enquanto o worker o processa.
+    """
+    lock_key = f"{city.cache_key}:refresh"
+    owner = await redis_client.acquire_lock(lock_key, HOTSPOTS_REFRESH_LOCK_TTL_MS)
+    if owner is None:
+        return
+
+    try:
+        celery_app.send_task(
+            "tasks.process_and_cache_occurrences",
+            kwargs={
+                "city_name": city.city,
+                "state_name": city.state,
+                "days_ago": city.days_ago,
+                "cache_key": city.cache_key,
+            },
+        )
+    except Exception:
+        logger.exception("Falha ao pedir a atualização dos hotspots.")
+        await redis_client.release_lock(lock_key, owner)
+
+
+def _encode_ndjson(occurrences: list) -> str:
+    return "".join(json.dumps(occurrence) + "\n" for occurrence in occurrences)
+
+
+def _stream_cached_entry(analysis_id: str, entry: CacheEntry) -> Iterator[bytes]:
+    """
+    Transmite as ocorrências de uma entrada do cache, uma por linha, à medida
+    que a entrada é descomprimida (a lista nunca fica inteira em memória).
+    """
+    lines: list[bytes] = []
+    size = 0
+    try:
+        for item in entry.iter_items():
+            lines.append(item)
+            size += len(item) + 1
+            if size >= NDJSON_CHUNK_SIZE:
+                yield b"\n".join(lines) + b"\n"
+                lines, size = [], 0
+    except ValueError as e:
+        logger.error(f"Erro ao ler o cache '{analysis_id}': {e}")
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+def _stream_occurrences(
+    occurrences: list, failed_pages: list[int] | None = None
+) -> Iterator[str]:
+    """
+    Transmite uma lista de ocorrências já obtida, em blocos de linhas, com a
+    linha final {"partial": true, ...} se ela estiver incompleta.
+    """
+    for start in range(0, len(occurrences), settings.CROSSFIRE_PAGE_SIZE):
+        yield _encode_ndjson(occurrences[start : start + settings.CROSSFIRE_PAGE_SIZE])
+    if failed_pages:
+        yield json.dumps({"partial": True, "failed_pages": failed_pages}) + "\n"
+
+
+async def _stream_and_cache_pages(
+    first_page: list,
+    pages: AsyncGenerator[tuple[int, list], None],
+    redis_client: AsyncRedisClient,
+    hot_cache: HotCache,
+    analysis_id: str,
+    lock_owner: str,
+) -> AsyncGenerator[str, None]:
+    """
+    Transmite as páginas do CrossFire à medida que chegam e, quando todas
+    chegaram, guarda a lista na mesma entrada do cache usada pelo formato
+    'json'. Uma transmissão incompleta ou interrompida nunca fica em cache.
+
+    O lock de preenchimento da chave ('lock_owner') é libertado no fim.
+    """
+    received = {1: first_page}
+
+    try:
+        yield _encode_ndjson(first_page)
+
+        try:
+            async for page, items in pages:
+                received[page] = items
+                yield _encode_ndjson(items)
+        except PartialOccurrencesError as e:
+            # Última linha sinaliza que a lista está incompleta
+            yield json.dumps({"partial": True, "failed_pages": e.failed_pages}) + "\n"
+            return
+        except Exception:
+            logger.exception("Falha ao transmitir as ocorrências do CrossFire.")
+            # Sem saber que páginas faltam, a lista é assinalada como incompleta
+            yield json.dumps(
+                {
+                    "partial": True,
+                    "error": "Falha ao obter as restantes páginas do CrossFire.",
+                }
+            ) + "\n"
+            return
+
+        occurrences = [
+            occurrence for page in sorted(received) for occurrence in received[page]
+        ]
+        await _cache_occurrences(redis_client, hot_cache, analysis_id, occurrences)
+    finally:
+        await pages.aclose()
+        await redis_client.release_lock(f"{analysis_id}:refresh", lock_owner)
+
+
+async def _ndjson_response(
+    analysis_id: str,
+    city: str,
+    state: str,
+    initial_date: str,
+    final_date: str,
+    occurrence_gateway: CrossfireAPIService,
+    redis_client: AsyncRedisClient,
+    hot_cache: HotCache,
+    background_tasks: BackgroundTasks,
+) -> StreamingResponse:
+    entry = await hot_cache.get_entry(analysis_id)
+    if entry is not None:
+        if entry.is_stale or entry.should_refresh_early(
+            settings.OCCURRENCES_FILL_ESTIMATE,
+            settings.OCCURRENCES_EARLY_REFRESH_BETA,
+        ):
+            background_tasks.add_task(
+                _refresh_occurrences_cache,
+                analysis_id,
+                city,
+                state,
+                initial_date,
+                final_date,
+                occurrence_gateway,
+                redis_client,
+                hot_cache,
+            )
+        return StreamingResponse(
+            _stream_cached_entry(analysis_id, entry),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
+    # O mesmo lock de '_fill_occurrences_cache': se outro pedido (em qualquer
+    # formato) já estiver a buscar a chave, aguarda o seu resultado
+    owner = await redis_client.acquire_lock(
+        f"{analysis_id}:refresh", REFRESH_LOCK_TTL_MS
+    )
+    if owner is None:
+        try:
+            occurrences = await _occurrence_fills.run(
+                analysis_id,
+                lambda: _fill_occurrences_cache(
+                    analysis_id,
+                    city,
+                    state,
+                    initial_date,
+                    final_date,
+                    occurrence_gateway,
+                    redis_client,
+                    hot_cache,
+                ),
+            )
+        except PartialOccurrencesError as e:
+            return StreamingResponse(
+                _stream_occurrences(e.occurrences, e.failed_pages),
+                media_type=NDJSON_MEDIA_TYPE,
+            )
+        return StreamingResponse(
+            _stream_occurrences(occurrences), media_type=NDJSON_MEDIA_TYPE
+        )
+
+    pages = occurrence_gateway.iter_occurrence_pages(
+        city_name=city,
+        state_name=state,
+        initial_date=initial_date,
+        final_date=final_date,
+    )
+    # A primeira página é aguardada antes de responder, para que falhas de
+    # autenticação ou de localização ainda resultem no código HTTP correto
+    try:
+        _, first_page = await anext(pages)
+    except StopAsyncIteration:
+        first_page = []
+    except BaseException:
+        await pages.aclose()
+        await redis_client.release_lock(f"{analysis_id}:refresh", owner)
+        raise
+
+    return StreamingResponse(
+        _stream_and_cache_pages(
+            first_page, pages, redis_client, hot_cache, analysis_id, owner
+        ),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+
+def _parse_bbox(bbox: str) -> BoundingBox:
+    """
+    Lê um retângulo no formato "min_lon,min_lat,max_lon,max_lat".
+    """
+    try:
+        min_longitude, min_latitude, max_longitude, max_latitude = (
+            float(value) for value in bbox.split(",")
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=422,
+            detail="O parâmetro 'bbox' deve ter o formato min_lon,min_lat,max_lon,max_lat.",
+        )
+
+    if not (
+        -90 <= min_latitude <= max_latitude <= 90
+        and -180 <= min_longitude <= max_longitude <= 180
+    ):
+        raise HTTPException(
+            status_code=422, detail="O parâmetro 'bbox' não é um retângulo válido."
+        )
+
+    return BoundingBox(
+        min_latitude=min_latitude,
+        min_longitude=min_longitude,
+        max_latitude=max_latitude,
+        max_longitude=max_longitude,
+    )
+
+
+async def _area_candidates(
+    analysis_id: str,
+    cells: list[str],
+    redis_client: AsyncRedisClient,
+) -> tuple[list, bool] | None:
+    """
+    Lê do índice espacial as ocorrências das células dadas (uma única ida ao
+    Redis).
+
+    Returns:
+        tuple[list, bool] | None: (ocorrências candidatas, expirado), ou None se
+        o índice não existir.
+    """
+    grid_key = _grid_cache_key(analysis_id)
+    entries = [
+        entry
+        for entry in await redis_client.get_hash_fields_entries(grid_key, cells)
+        if entry is not None
+    ]
+    if not entries and not await redis_client.key_exists(grid_key):
+        return None
+
+    candidates = []
+    try:
+        for entry in entries:
+            candidates.extend(entry.decode())
+    except ValueError as e:
+        logger.error(f"Erro ao ler o índice espacial '{grid_key}': {e}")
+        return None
+
+    return candidates, any(entry.is_stale for entry in entries)
+
+
+async def _load_area_occurrences(
+    analysis_id: str,
+    city: str,
+    state: str,
+    initial_date: str,
+    final_date: str,
+    cells: list[str] | None,
+    occurrence_gateway: CrossfireAPIService,
+    redis_client: AsyncRedisClient,
+    hot_cache: HotCache,
+    background_tasks: BackgroundTasks,
+) -> tuple[list, bool, dict]:
+    """
+    Obtém as ocorrências da cidade candidatas a estar numa área: as das células
+    dadas, lidas do índice espacial.
+
+    Sem índice (ou com 'cells' None, para áreas grandes demais para ele),
+    devolve a lista completa da cidade, e o índice é reconstruído em segundo
+    plano se faltar. Um cache expirado é atualizado em segundo plano.
+
+    Returns:
+        tuple[list, bool, dict]: (ocorrências, expirado, campos a acrescentar
+        à resposta se a lista estiver incompleta).
+    """
+    fields: dict = {}
+    candidates = None
+    if cells is not None:
+        candidates = await _area_candidates(analysis_id, cells, redis_client)
+
+    if candidates is not None:
+        occurrences, stale = candidates
+    else:
+        entry = await hot_cache.get_entry(analysis_id)
+        cached_occurrences = None
+        if entry is not None:
+            try:
+                cached_occurrences = entry.decode()
+            except ValueError as e:
+                logger.error(f"Erro ao ler o cache '{analysis_id}': {e}")
+
+        if entry is not None and cached_occurrences is not None:
+            occurrences = cached_occurrences
+            stale = entry.is_stale
+            if not stale and not await redis_client.key_exists(
+                _grid_cache_key(analysis_id)
+            ):
+                background_tasks.add_task(
+                    _index_occurrences, redis_client, analysis_id, occurrences
+                )
+        else:
+            stale = False
+            try:
+                occurrences = await _occurrence_fills.run(
+                    analysis_id,
+                    lambda: _fill_occurrences_cache(
+                        analysis_id,
+                        city,
+                        state,
+                        initial_date,
+                        final_date,
+                        occurrence_gateway,
+                        redis_client,
+                        hot_cache,
+                    ),
+                )
+            except PartialOccurrencesError as e:
+                # Resultado incompleto: é devolvido sinalizado, mas não vai para o cache
+                occurrences = e.occurrences
+                fields = {"partial": True, "failed_pages": e.failed_pages}
+
+    if stale:
+        background_tasks.add_task(
+            _refresh_occurrences_cache,
+            analysis_id,
+            city,
+            state,
+            initial_date,
+            final_date,
+            occurrence_gateway,
+            redis_client,
+            hot_cache,
+        )
+
+    return occurrences, stale, fields
+
+
+async def _area_response(
+    analysis_id: str,
+    city: str,
+    state: str,
+    initial_date: str,
+    final_date: str,
+    coordinates: CoordinateScheme,
+    radius_km: float | None,
+    bbox: BoundingBox | None,
+    page: int,
+    page_size: int,
+    occurrence_gateway: CrossfireAPIService,
+    redis_client: AsyncRedisClient,
+    hot_cache: HotCache,
+    background_tasks: BackgroundTasks,
+) -> dict:
+    """
+    Responde a uma consulta por raio ou retângulo com uma página das
+    ocorrências encontradas, lidas do índice espacial.
+    """
+    if radius_km is not None:
+        bounds = radius_bounding_box(
+            coordinates.latitude, coordinates.longitude, radius_km
+        )
+    elif bbox is not None:
+        bounds = bbox
+    else:
+        raise ValueError("A consulta por área precisa de um raio ou de um retângulo.")
+
+    cell_size = settings.OCCURRENCES_GRID_CELL_SIZE
+    cells = None
+    if count_grid_cells(bounds, cell_size) <= MAX_GRID_CELLS:
+        cells = grid_cells_in(bounds, cell_size)
+
+    occurrences, stale, fields = await _load_area_occurrences(
+        analysis_id,
+        city,
+        state,
+        initial_date,
+        final_date,
+        cells,
+        occurrence_gateway,
+        redis_client,
+        hot_cache,
+        background_tasks,
+    )
+
+    if radius_km is not None:
+        selected = await asyncio.to_thread(
+            occurrences_in_radius,
+            occurrences,
+            coordinates.latitude,
+            coordinates.longitude,
+            radius_km,
+        )
+    else:
+        selected = await asyncio.to_thread(occurrences_in_bbox, occurrences, bounds)
+
+    start = (page - 1) * page_size
+    return {
+        "message": "Occurrences in area",
+        "data": selected[start : start + page_size],
+        "total": len(selected),
+        "page": page,
+        "page_size": page_size,
+        "next_page": page + 1 if start + page_size < len(selected) else None,
+        "stale": stale,
+        **fields,
+    }
+
+
+@router.get("/")
+async def get_occurrences(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    coordinates: CoordinateScheme = Depends(),
+    output_format: Literal["json", "ndjson"] = Query(
+        "json",
+        alias="format",
+        description=(
+            "Formato da resposta: 'json' (documento único) ou 'ndjson' "
+            "(uma ocorrência por linha, transmitida à medida que chega)"
+        ),
+    ),
+    radius_km: float | None = Query(
+        None,
+        gt=0,
+        le=settings.OCCURRENCES_MAX_RADIUS_KM,
+        description=(
+            "Devolve apenas as ocorrências a até este raio (em km) da coordenada, "
+            "da mais próxima para a mais distante"
+        ),
+    ),
+    bbox: str | None = Query(
+        None,
+        description=(
+            "Devolve apenas as ocorrências dentro do retângulo "
+            "'min_lon,min_lat,max_lon,max_lat', da mais recente para a mais antiga"
+        ),
+    ),
+    page: int = Query(
+        1, ge=1, description="Página das consultas por 'radius_km' ou 'bbox'"
+    ),
+    page_size: int = Query(
+        settings.OCCURRENCES_PAGE_SIZE,
+        ge=1,
+        le=settings.OCCURRENCES_MAX_PAGE_SIZE,
+        description="Ocorrências por página nas consultas por 'radius_km' ou 'bbox'",
+    ),
+    occurrence_gateway: CrossfireAPIService = Depends(get_occurrence_gateway),
+    redis_client: AsyncRedisClient = Depends(get_async_redis_client),
+    hot_cache: HotCache = Depends(get_hot_cache),
+    google_maps_client: httpx.AsyncClient = Depends(get_google_maps_http_client),
+    municipality_resolver: MunicipalityResolver = Depends(get_municipality_resolver),
+):
+    """
+    Retorna as ocorrências brutas para a cidade/estado obtidos pela latitude e longitude.
+
+    Um cache expirado continua a ser servido (com "stale": true) enquanto é
+    atualizado em segundo plano, e um cache prestes a expirar pode ser
+    atualizado antes do tempo. Sem cache, apenas um pedido por cidade busca as
+    ocorrências no CrossFire; os restantes aguardam o seu resultado. Se alguma
+    página do CrossFire falhar, a lista é devolvida com "partial": true e não é
+    guardada em cache; no formato 'ndjson' isso é indicado numa última linha
+    {"partial": true, ...}.
+
+    Com 'radius_km' ou 'bbox', a resposta traz só as ocorrências da área, em
+    páginas ("total", "page", "next_page"), lidas de um índice espacial em
+    grelha das ocorrências da cidade (a da coordenada).
+    """
+    if radius_km is not None and bbox is not None:
+        raise HTTPException(
+            status_code=422,
+            detail="Use apenas um dos parâmetros 'radius_km' ou 'bbox'.",
+        )
+    area_bbox = _parse_bbox(bbox) if bbox is not None else None
+    area_query = radius_km is not None or area_bbox is not None
+    if area_query and output_format == "ndjson":
+        raise HTTPException(
+            status_code=422,
+            detail="As consultas por 'radius_km' ou 'bbox' só suportam o formato 'json'.",
+        )
+
+    try:
+        city, state = await get_city_and_state(
+            coordinates.latitude,
+            coordinates.longitude,
+            google_maps_client,
+            municipality_resolver,
+        )
+
+        analysis_id = _occurrences_cache_key(city, state)
+        initial_date, final_date = _occurrences_date_range()
+
+        if area_query:
+            return await _area_response(
+                analysis_id,
+                city,
+                state,
+                initial_date,
+                final_date,
+                coordinates,
+                radius_km,
+                area_bbox,
+                page,
+                page_size,
+                occurrence_gateway,
+                redis_client,
+                hot_cache,
+                background_tasks,
+            )
+
+        if output_format == "ndjson":
+            return await _ndjson_response(
+                analysis_id,
+                city,
+                state,
+                initial_date,
+                final_date,
+                occurrence_gateway,
+                redis_client,
+                hot_cache,
+                background_tasks,
+            )
+
+        entry = await hot_cache.get_entry(analysis_id)
+        response = None
+        if entry is not None:
+            # Os dados em cache seguem para o cliente sem serem desserializados
+            response = cached_json_response(
+                entry,
+                request,
+                message="Raw occurrences list (cached)",
+                stale=entry.is_stale,
+            )
+
+        if entry is not None and response is not None:
+            if entry.is_stale or entry.should_refresh_early(
+                settings.OCCURRENCES_FILL_ESTIMATE,
+                settings.OCCURRENCES_EARLY_REFRESH_BETA,
+            ):
+                background_tasks.add_task(
+                    _refresh_occurrences_cache,
+                    analysis_id,
+                    city,
+                    state,
+                    initial_date,
+                    final_date,
+                    occurrence_gateway,
+                    redis_client,
+                    hot_cache,
+                )
+            return response
+
+        try:
+            occurrences = await _occurrence_fills.run(
+                analysis_id,
+                lambda: _fill_occurrences_cache(
+                    analysis_id,
+                    city,
+                    state,
+                    initial_date,
+                    final_date,
+                    occurrence_gateway,
+                    redis_client,
+                    hot_cache,
+                ),
+            )
+        except PartialOccurrencesError as e:
+            # Resultado incompleto: é devolvido sinalizado, mas não vai para o cache
+            return {
+                "message": "Raw occurrences list (partial)",
+                "data": e.occurrences,
+                "partial": True,
+                "failed_pages": e.failed_pages,
+            }
 
         return {"message": "Raw occurrences list", "data": occurrences}
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise _upstream_http_exception(e)
+
+
+def _decode_route(polyline: str, precision: int) -> np.ndarray:
+    try:
+        points = np.array(decode_polyline(polyline, precision), dtype=np.float64)
     except ValueError as e:
-        raise HTTPException(status_code=401, detail=str(e))
-    except (httpx.HTTPStatusError, httpx.RequestError) as exc:
-        status_code = (
-            exc.response.status_code if isinstance(exc, httpx.HTTPStatusError) else 503
+        raise HTTPException(status_code=422, detail=f"Polilinha inválida. {e}")
+
+    if not len(points):
+        raise HTTPException(status_code=422, detail="Polilinha sem pontos.")
+    if route_length_km(points) > settings.ROUTE_MAX_LENGTH_KM:
+        raise HTTPException(
+            status_code=422,
+            detail=(
+                "As rotas devem ter no máximo " f"{settings.ROUTE_MAX_LENGTH_KM:g} km."
+            ),
         )
-        detail = (
-            f"Erro na API do CrossFire. {exc.response.text}"
-            if isinstance(exc, httpx.HTTPStatusError)
-            else "Não foi possível conectar à API do CrossFire no momento."
+    return points
+
+
+def _sample_route_municipalities(
+    routes: list[np.ndarray], municipality_resolver: MunicipalityResolver
+) -> tuple[list[tuple[str, str]], bool]:
+    """
+    Municípios atravessados pelas rotas, pelos limites em memória, em pontos a
+    cada ROUTE_MUNICIPALITY_SAMPLE_KM.
+
+    Returns:
+        tuple[list[tuple[str, str]], bool]: Os municípios (cidade, estado), pela
+        ordem em que surgem, e se algum ponto ficou por resolver.
+    """
+    municipalities: dict[tuple[str, str], None] = {}
+    unresolved = False
+    for points in routes:
+        samples = densify_route(points, settings.ROUTE_MUNICIPALITY_SAMPLE_KM)
+        for latitude, longitude in samples.tolist():
+            resolved = municipality_resolver.resolve(latitude, longitude)
+            if resolved is None:
+                unresolved = True
+            else:
+                municipalities.setdefault(resolved, None)
+    return list(municipalities), unresolved
+
+
+async def _route_municipalities(
+    routes: list[np.ndarray],
+    google_maps_client: httpx.AsyncClient,
+    municipality_resolver: MunicipalityResolver,
+) -> list[tuple[str, str]]:
+    """
+    Obtém os municípios atravessados pelas rotas.
+
+    Os pontos fora dos limites municipais em memória não são enviados um a um
+    ao Google: apenas a origem e o destino de cada rota o são.
+    """
+    municipalities, unresolved = await asyncio.to_thread(
+        _sample_route_municipalities, routes, municipality_resolver
+    )
+    if not unresolved:
+        return municipalities
+
+    endpoints = list(
+        dict.fromkeys(
+            tuple(point) for points in routes for point in (points[0], points[-1])
+        )
+    )
+    results = await asyncio.gather(
+        *(
+            get_city_and_state(
+                latitude, longitude, google_maps_client, municipality_resolver
+            )
+            for latitude, longitude in endpoints
+        ),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, HTTPException) and result.status_code == 404:
+            continue
+        if isinstance(result, BaseException):
+            raise result
+        if result not in municipalities:
+            municipalities.append(result)
+    return municipalities
+
+
+def _merge_occurrences(occurrence_lists: list[list]) -> list:
+    """
+    Junta as ocorrências de vários municípios, sem repetir o mesmo id.
+    """
+    seen = set()
+    merged = []
+    for occurrences in occurrence_lists:
+        for occurrence in occurrences:
+            occurrence_id = occurrence.get("id")
+            if occurrence_id is not None:
+                if occurrence_id in seen:
+                    continue
+                seen.add(occurrence_id)
+            merged.append(occurrence)
+    return merged
+
+
+@router.post("/along-route")
+async def get_occurrences_along_route(
+    route_request: RouteCorridorRequest,
+    background_tasks: BackgroundTasks,
+    occurrence_gateway: CrossfireAPIService = Depends(get_occurrence_gateway),
+    redis_client: AsyncRedisClient = Depends(get_async_redis_client),
+    hot_cache: HotCache = Depends(get_hot_cache),
+    google_maps_client: httpx.AsyncClient = Depends(get_google_maps_http_client),
+    municipality_resolver: MunicipalityResolver = Depends(get_municipality_resolver),
+):
+    """
+    Retorna as ocorrências recentes a até 'corridor_km' de cada rota (polilinha
+    codificada), pela ordem em que surgem ao percorrê-la, e o número de
+    ocorrências de cada segmento da rota.
+
+    Várias rotas alternativas podem ser comparadas num só pedido. As
+    ocorrências vêm do índice espacial de cada município atravessado (apenas
+    das células junto às rotas), juntas numa única lista.
+    """
+    corridor_km = route_request.corridor_km
+    routes = [
+        _decode_route(polyline, route_request.precision)
+        for polyline in route_request.polylines
+    ]
+
+    try:
+        municipalities = await _route_municipalities(
+            routes, google_maps_client, municipality_resolver
+        )
+        if not municipalities:
+            raise HTTPException(
+                status_code=404,
+                detail="Nenhum município encontrado ao longo das rotas fornecidas.",
+            )
+        if len(municipalities) > settings.ROUTE_MAX_MUNICIPALITIES:
+            raise HTTPException(
+                status_code=422,
+                detail=(
+                    "As rotas atravessam mais de "
+                    f"{settings.ROUTE_MAX_MUNICIPALITIES} municípios."
+                ),
+            )
+
+        cell_size = settings.OCCURRENCES_GRID_CELL_SIZE
+        cells = set()
+        for points in routes:
+            cells.update(
+                await asyncio.to_thread(
+                    route_grid_cells, points, corridor_km, cell_size
+                )
+            )
+        grid_cells = sorted(cells) if len(cells) <= MAX_GRID_CELLS else None
+
+        initial_date, final_date = _occurrences_date_range()
+        loaded = await asyncio.gather(
+            *(
+                _load_area_occurrences(
+                    _occurrences_cache_key(city, state),
+                    city,
+                    state,
+                    initial_date,
+                    final_date,
+                    grid_cells,
+                    occurrence_gateway,
+                    redis_client,
+                    hot_cache,
+                    background_tasks,
+                )
+                for city, state in municipalities
+            )
         )
-        raise HTTPException(status_code=status_code, detail=detail)
+    except HTTPException:
+        raise
     except Exception as e:
+        raise _upstream_http_exception(e)
+
+    candidates = _merge_occurrences([occurrences for occurrences, _, _ in loaded])
+    results = []
+    for points in routes:
+        matches, segment_counts = await asyncio.to_thread(
+            occurrences_along_route, candidates, points, corridor_km
+        )
+        results.append(
+            {
+                "length_km": round(route_length_km(points), 3),
+                "total": len(matches),
+                "segment_counts": segment_counts,
+                "data": matches,
+            }
+        )
+
+    response = {
+        "message": "Occurrences along routes",
+        "municipalities": [
+            {"city": city, "state": state, **fields}
+            for (city, state), (_, _, fields) in zip(municipalities, loaded)
+        ],
+        "routes": results,
+        "stale": any(stale for _, stale, _ in loaded),
+    }
+    if any(fields for _, _, fields in loaded):
+        response["partial"] = True
+    return response
+
+
+def _find_hotspot_city(city: str, state: str) -> HotspotCity | None:
+    key = f"{normalize_text(city)}/{normalize_text(state)}"
+    return next((c for c in settings.HOTSPOT_CITIES if c.key == key), None)
+
+
+async def get_hotspot_city(
+    latitude: float | None = Query(
+        None, ge=-90, le=90, description="Latitude de um ponto da cidade"
+    ),
+    longitude: float | None = Query(
+        None, ge=-180, le=180, description="Longitude de um ponto da cidade"
+    ),
+    google_maps_client: httpx.AsyncClient = Depends(get_google_maps_http_client),
+    municipality_resolver: MunicipalityResolver = Depends(get_municipality_resolver),
+) -> HotspotCity:
+    """
+    Cidade de HOTSPOT_CITIES em que estão as coordenadas do pedido; sem
+    coordenadas, a primeira cidade do registo.
+    """
+    if (latitude is None) != (longitude is None):
         raise HTTPException(
-            status_code=500, detail=f"Ocorreu um erro inesperado: {str(e)}"
+            status_code=422,
+            detail="Informe latitude e longitude juntas.",
         )
+    if latitude is None or longitude is None:
+        return settings.HOTSPOT_CITIES[0]
+
+    try:
+        city, state = await get_city_and_state(
+            latitude, longitude, google_maps_client, municipality_resolver
+        )
+    except (CircuitOpenError, RateLimitExceededError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serviço externo temporariamente indisponível.",
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except (httpx.HTTPStatusError, httpx.RequestError):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Não foi possível identificar a cidade das coordenadas.",
+        )
+
+    hotspot_city = _find_hotspot_city(city, state)
+    if hotspot_city is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Não há análise de hotspots para {city}/{state}.",
+        )
+    return hotspot_city
+
+
+def _hotspots_cache_key(city: HotspotCity, view: str) -> str:
+    return city.cache_key if view == "points" else f"{city.cache_key}:summary"
+
+
+HotspotsView = Literal["points", "summary"]
+HOTSPOTS_VIEW_DESCRIPTION = (
+    "'points': todas as ocorrências, com o grupo de cada uma em 'cluster'; "
+    "'summary': apenas o resumo de cada grupo (centróide, envoltória, "
+    "contagens e densidade)"
+)
 
 
 @router.get("/hotspots")
-def get_hotspots(
-    redis_client: RedisClient = Depends(get_redis_client),
+async def get_hotspots(
+    request: Request,
+    view: HotspotsView = Query("points", description=HOTSPOTS_VIEW_DESCRIPTION),
+    city: HotspotCity = Depends(get_hotspot_city),
+    redis_client: AsyncRedisClient = Depends(get_async_redis_client),
+    hot_cache: HotCache = Depends(get_hot_cache),
 ):
     """
-    Obtém a análise de hotspots de ocorrências mais recente.
+    Obtém a análise de hotspots de ocorrências mais recente da cidade em que
+    estão a latitude e a longitude (sem elas, a da cidade padrão).
 
     Estes dados são pré-processados por um worker em segundo plano
-    e armazenados em cache para entrega imediata.
+    e armazenados em cache para entrega imediata. Se estiverem expirados,
+    continuam a ser servidos (com "stale": true) e o worker é acionado.
+    Com view=summary, devolve só o resumo de cada hotspot, uma pequena
+    fração do tamanho da lista completa.
     """
     try:
-        if not redis_client:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Serviço de cache indisponível.",
+        entry = await hot_cache.get_entry(_hotspots_cache_key(city, view))
+        response = None
+        if entry is not None:
+            response = cached_json_response(
+                entry,
+                request,
+                message="Análise de hotspots obtida com sucesso",
+                city=city.city,
+                state=city.state,
+                stale=entry.is_stale,
             )
 
-        cached_data_str = redis_client.get_data(CACHE_KEY)
-
-        if cached_data_str is None:
+        if entry is None or response is None:
+            if not await redis_client.ping():
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Serviço de cache indisponível.",
+                )
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Nenhum resultado de análise encontrado. O processamento inicial pode estar em andamento.",
             )
 
-        try:
-            analysis_data_dict = json.loads(cached_data_str)
-        except json.JSONDecodeError:
+        if entry.is_stale:
+            await _request_hotspots_refresh(redis_client, city)
+
+        return response
+
+    except HTTPException:
+        raise
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ocorreu um erro inesperado no servidor.",
+        )
+
+
+@router.get("/hotspots/cities")
+async def get_hotspots_by_city(
+    view: HotspotsView = Query("summary", description=HOTSPOTS_VIEW_DESCRIPTION),
+    redis_client: AsyncRedisClient = Depends(get_async_redis_client),
+    hot_cache: HotCache = Depends(get_hot_cache),
+):
+    """
+    Obtém a análise de hotspots de todas as cidades de HOTSPOT_CITIES, lidas
+    do cache numa única ida ao Redis. Cada cidade ("cidade/estado"
+    normalizado) tem os seus dados, ou null se ainda não foram calculados.
+    """
+    try:
+        cities = settings.HOTSPOT_CITIES
+        entries = await hot_cache.get_entries(
+            [_hotspots_cache_key(city, view) for city in cities]
+        )
+
+        data: dict[str, dict | None] = {}
+        for city, entry in zip(cities, entries):
+            data[city.key] = None
+            if entry is None:
+                continue
+            try:
+                data[city.key] = {
+                    "city": city.city,
+                    "state": city.state,
+                    "stale": entry.is_stale,
+                    "data": entry.decode(),
+                }
+            except ValueError as e:
+                logger.error(f"Erro ao ler o cache '{city.cache_key}': {e}")
+                continue
+            if entry.is_stale:
+                await _request_hotspots_refresh(redis_client, city)
+
+        return {"message": "Análise de hotspots obtida com sucesso", "data": data}
+
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ocorreu um erro inesperado no servidor.",
+        )
+
+
+@router.get("/hotspots/tiles/{z}/{x}/{y}")
+async def get_hotspot_tile(
+    request: Request,
+    z: int = Path(ge=0, le=22, description="Zoom"),
+    x: int = Path(ge=0),
+    y: int = Path(ge=0),
+    redis_client: AsyncRedisClient = Depends(get_async_redis_client),
+):
+    """
+    Obtém os hotspots de um tile (z/x/y, como nos mapas web), pré-calculados
+    pelo worker no detalhe adequado ao zoom: células de uma grelha com a
+    contagem de ocorrências ("kind": "grid") nos zooms afastados e o resumo
+    dos grupos ("kind": "clusters") nos próximos.
+
+    O tile é lido de todas as cidades numa única ida ao Redis; cada elemento
+    indica a sua cidade em "city". Acima de HOTSPOT_TILE_MAX_ZOOM é devolvido
+    o tile desse zoom que contém o pedido ("tile" indica qual).
+    """
+    if x >= 2**z or y >= 2**z:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tile inexistente.",
+        )
+    if z < settings.HOTSPOT_TILE_MIN_ZOOM:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Os hotspots só existem a partir do zoom {settings.HOTSPOT_TILE_MIN_ZOOM}.",
+        )
+    if z > settings.HOTSPOT_TILE_MAX_ZOOM:
+        shift = z - settings.HOTSPOT_TILE_MAX_ZOOM
+        z, x, y = settings.HOTSPOT_TILE_MAX_ZOOM, x >> shift, y >> shift
+
+    try:
+        cities = settings.HOTSPOT_CITIES
+        tiles_keys = [f"{city.cache_key}:tiles:{z}" for city in cities]
+        tile = {"z": z, "x": x, "y": y}
+        message = "Tile de hotspots obtido com sucesso"
+        kind = "grid" if z <= settings.HOTSPOT_TILE_GRID_MAX_ZOOM else "clusters"
+
+        entries = await redis_client.get_hash_cache_entries(tiles_keys, tile_key(x, y))
+        found = [(city, entry) for city, entry in zip(cities, entries) if entry]
+
+        for city, entry in found:
+            if entry.is_stale:
+                await _request_hotspots_refresh(redis_client, city)
+
+        if len(found) == 1:
+            # Caso mais comum: o tile é de uma só cidade e segue como está guardado
+            entry = found[0][1]
+            response = cached_json_response(
+                entry, request, message=message, tile=tile, stale=entry.is_stale
+            )
+            if response is not None:
+                return response
+
+        features = []
+        for city, entry in found:
+            try:
+                features.extend(entry.decode()["features"])
+            except ValueError as e:
+                logger.error(f"Erro ao ler o tile {tile} de '{city.key}': {e}")
+
+        if not found and not await redis_client.key_exists(*tiles_keys):
+            if not await redis_client.ping():
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Serviço de cache indisponível.",
+                )
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Erro ao processar dados do cache. Formato inválido.",
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Nenhum resultado de análise encontrado. O processamento inicial pode estar em andamento.",
             )
 
+        # Tile de várias cidades, ou sem ocorrências num zoom já calculado
         return {
-            "message": "Análise de hotspots obtida com sucesso",
-            "data": analysis_data_dict,
+            "message": message,
+            "tile": tile,
+            "stale": any(entry.is_stale for _, entry in found),
+            "data": {"kind": kind, "features": features},
         }
 
     except HTTPException:
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.config import settings
 
 
 class GeocodeRequest(BaseModel):
@@ -17,3 +19,15 @@ class ReverseGeocodeRequest(BaseModel):
 
 class ReverseGeocodeResponse(BaseModel):
     address: str
+
+
+class GeocodeBatchRequest(BaseModel):
+    addresses: list[str] = Field(
+        ..., min_length=1, max_length=settings.GEOCODE_BATCH_MAX_ITEMS
+    )
+
+
+class ReverseGeocodeBatchRequest(BaseModel):
+    coordinates: list[ReverseGeocodeRequest] = Field(
+        ..., min_length=1, max_length=settings.GEOCODE_BATCH_MAX_ITEMS
+    )
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+
+from app.config import settings
+
+
+class RouteCorridorRequest(BaseModel):
+    polylines: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.ROUTE_MAX_ROUTES,
+        description="Rotas alternativas, cada uma como polilinha codificada",
+    )
+    corridor_km: float = Field(
+        settings.ROUTE_CORRIDOR_KM,
+        gt=0,
+        le=settings.ROUTE_MAX_CORRIDOR_KM,
+        description="Distância máxima (em km) de uma ocorrência à rota",
+    )
+    precision: int = Field(
+        5,
+        ge=5,
+        le=6,
+        description="Casas decimais das polilinhas (5 no Google, 6 no OSRM/Mapbox)",
+    )
@@ -0,0 +1,11 @@
+from celery import Celery
+
+from app.config import settings
+
+CELERY_BROKER_URL = (
+    f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
+)
+
+# Aplicação Celery partilhada pelo worker (app.tasks, que regista as tarefas) e
+# pela API, que só envia tarefas pelo nome e não precisa de importar o worker
+app = Celery("tasks", broker=CELERY_BROKER_URL)
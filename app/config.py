@@ -1,5 +1,30 @@
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from app.core.utils.text import normalize_text
+
+
+class RateLimit(BaseModel):
+    rate: float  # requisições por segundo
+    burst: int
+    max_wait: float = 2.0  # espera máxima na fila, em segundos
+
+
+class HotspotCity(BaseModel):
+    city: str
+    state: str  # nome completo do estado (ex: "Bahia")
+    days_ago: int = 365  # janela da análise, em dias
+
+    @property
+    def key(self) -> str:
+        """Identificador normalizado, "cidade/estado" (ex: "salvador/bahia")."""
+        return f"{normalize_text(self.city)}/{normalize_text(self.state)}"
+
+    @property
+    def cache_key(self) -> str:
+        """Chave do cache dos hotspots da cidade no Redis."""
+        return "analysis_result_" + self.key.replace("/", "_").replace(" ", "_")
+
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "SafeReport API"
@@ -14,6 +39,130 @@ class Settings(BaseSettings):
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 2.0
+
+    HTTP_TIMEOUT: float = 10.0
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = True
+
+    UPSTREAM_RETRY_ATTEMPTS: int = 3
+    UPSTREAM_RETRY_BASE_DELAY: float = 0.2
+    UPSTREAM_RETRY_MAX_DELAY: float = 2.0
+
+    RATE_LIMITS: dict[str, RateLimit] = {
+        "google_maps:geocode": RateLimit(rate=40, burst=40),
+        "google_maps:reverse_geocode": RateLimit(rate=40, burst=40),
+        "google_places:search_text": RateLimit(rate=10, burst=10),
+        "crossfire:occurrences": RateLimit(rate=5, burst=10, max_wait=30.0),
+    }
+
+    CIRCUIT_BREAKER_WINDOW_SIZE: int = 20
+    CIRCUIT_BREAKER_MINIMUM_CALLS: int = 10
+    CIRCUIT_BREAKER_FAILURE_RATE: float = 0.5
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS: float = 5.0
+    CIRCUIT_BREAKER_SLOW_CALL_RATE: float = 0.8
+    CIRCUIT_BREAKER_OPEN_SECONDS: float = 30.0
+
+    CROSSFIRE_TOKEN_DEFAULT_TTL: int = 3600
+    CROSSFIRE_TOKEN_REFRESH_MARGIN: int = 300
+    CROSSFIRE_TOKEN_LOCK_TIMEOUT: float = 10.0
+
+    CROSSFIRE_PAGE_SIZE: int = 300
+    CROSSFIRE_MAX_CONCURRENT_PAGES: int = 5
+    # Sem 'pageMeta' na resposta, número máximo de páginas buscadas
+    CROSSFIRE_MAX_FALLBACK_PAGES: int = 200
+
+    CROSSFIRE_DIRECTORY_REFRESH_INTERVAL: int = 24 * 60 * 60
+    CROSSFIRE_DIRECTORY_CACHE_TTL: int = 7 * 24 * 60 * 60
+
+    # Entradas do cache a partir deste tamanho são comprimidas (zstd ou zlib)
+    CACHE_COMPRESSION_MIN_BYTES: int = 1024
+    CACHE_ZSTD_LEVEL: int = 3
+    CACHE_ZLIB_LEVEL: int = 6
+
+    OCCURRENCES_CACHE_TTL: int = 60 * 60
+    OCCURRENCES_CACHE_STALE_TTL: int = 6 * 60 * 60
+    # Tempo que um pedido aguarda o preenchimento do cache feito por outro
+    OCCURRENCES_FILL_WAIT: float = 20.0
+    # Duração estimada da busca no CrossFire, usada na atualização antecipada
+    OCCURRENCES_FILL_ESTIMATE: float = 10.0
+    OCCURRENCES_EARLY_REFRESH_BETA: float = 1.0
+    # Índice espacial das ocorrências de cada cidade: grelha de células com
+    # este lado (em graus, ~2,2 km no equador), uma por campo de um hash
+    OCCURRENCES_GRID_CELL_SIZE: float = 0.02
+    OCCURRENCES_MAX_RADIUS_KM: float = 50.0
+    OCCURRENCES_PAGE_SIZE: int = 100
+    OCCURRENCES_MAX_PAGE_SIZE: int = 1000
+    # Consulta das ocorrências ao longo de rotas (POST /occurrences/along-route)
+    ROUTE_CORRIDOR_KM: float = 0.2
+    ROUTE_MAX_CORRIDOR_KM: float = 2.0
+    ROUTE_MAX_ROUTES: int = 5
+    ROUTE_MAX_LENGTH_KM: float = 300.0
+    ROUTE_MAX_MUNICIPALITIES: int = 20
+    # Espaçamento dos pontos da rota usados para obter os municípios
+    ROUTE_MUNICIPALITY_SAMPLE_KM: float = 0.5
+    HOTSPOTS_CACHE_TTL: int = 26 * 60 * 60
+    HOTSPOTS_CACHE_STALE_TTL: int = 30 * 24 * 60 * 60
+    # Nível em memória de cada processo à frente do Redis (hotspots e ocorrências)
+    HOT_CACHE_MAX_ENTRIES: int = 64
+    HOT_CACHE_TTL: int = 5 * 60
+
+    # Os termos do Google permitem guardar coordenadas por até 30 dias
+    GEOCODE_CACHE_TTL: int = 30 * 24 * 60 * 60
+    AUTOCOMPLETE_CACHE_TTL: int = 7 * 24 * 60 * 60
+    REVERSE_GEOCODE_COORDINATE_PRECISION: int = 4
+    LOCAL_CACHE_MAX_ENTRIES: int = 10_000
+    LOCAL_CACHE_TTL: int = 10 * 60
+    RESULT_CACHE_LOCK_TIMEOUT: float = 5.0
+    # Intervalo de envio para o Redis das métricas de acerto dos caches
+    RESULT_CACHE_METRICS_FLUSH_INTERVAL: float = 10.0
+    AUTOCOMPLETE_PREFIX_WINDOW: float = 1.0
+    AUTOCOMPLETE_BIAS_PRECISION: int = 2
+    GEOCODE_BATCH_MAX_ITEMS: int = 100
+    GEOCODE_BATCH_CONCURRENCY: int = 8
+
+    # Armazenamento local do worker; tem de sobreviver à recriação do
+    # contentor (no docker-compose, volume safereport_worker_volume)
+    OCCURRENCE_STORE_PATH: str = "data/occurrences.sqlite3"
+    OCCURRENCE_SYNC_OVERLAP_DAYS: int = 3
+
+    # Motor de agrupamento dos hotspots: "haversine_dbscan", "projected_dbscan"
+    # ou "hdbscan". CLUSTERING_ENGINE_BY_CITY escolhe outro por cidade, com a
+    # chave "cidade/estado" normalizada (ex: {"salvador/bahia": "hdbscan"})
+    CLUSTERING_ENGINE: str = "haversine_dbscan"
+    CLUSTERING_ENGINE_BY_CITY: dict[str, str] = {}
+    CLUSTERING_EPSILON_KM: float = 0.7
+    CLUSTERING_MIN_SAMPLES: int = 8
+
+    # Cidades cujos hotspots são calculados pelo worker; a primeira é a usada
+    # quando o pedido não indica coordenadas
+    HOTSPOT_CITIES: list[HotspotCity] = [HotspotCity(city="Salvador", state="Bahia")]
+    # Máximo de cidades processadas ao mesmo tempo (entre todos os workers)
+    HOTSPOT_MAX_PARALLEL_CITIES: int = 2
+    HOTSPOT_SLOT_RETRY_DELAY: int = 60
+    # Sem vaga após estas tentativas, a cidade fica para a próxima execução
+    HOTSPOT_SLOT_MAX_RETRIES: int = 60
+
+    # Pirâmide de tiles dos hotspots: grelha até HOTSPOT_TILE_GRID_MAX_ZOOM e
+    # grupos acima dele, com CLUSTERING_EPSILON_KM a partir do zoom de referência
+    HOTSPOT_TILE_MIN_ZOOM: int = 8
+    HOTSPOT_TILE_MAX_ZOOM: int = 16
+    HOTSPOT_TILE_GRID_MAX_ZOOM: int = 11
+    HOTSPOT_TILE_REFERENCE_ZOOM: int = 14
+    HOTSPOT_TILE_GRID_SIZE: int = 16
+
+    # GeoJSON com os limites dos municípios (malha municipal do IBGE; ver o
+    # README). Com MUNICIPALITY_BOUNDARIES_REQUIRED, a API não arranca sem ele
+    MUNICIPALITY_BOUNDARIES_PATH: str = "data/municipalities.geojson"
+    MUNICIPALITY_BOUNDARIES_REQUIRED: bool = False
+    MUNICIPALITY_NAME_PROPERTY: str = "NM_MUN"
+    MUNICIPALITY_STATE_PROPERTY: str = "SIGLA_UF"
+    MUNICIPALITY_GRID_CELL_SIZE: float = 0.25
 
     model_config = SettingsConfigDict(env_file=".env")
 
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class BoundingBox:
+    """Retângulo geográfico, em graus."""
+
+    min_latitude: float
+    min_longitude: float
+    max_latitude: float
+    max_longitude: float
@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ClusterSummary:
+    """
+    Resumo de um grupo (hotspot) de ocorrências, para desenhar no mapa sem os
+    registos individuais.
+    """
+
+    cluster: int
+    count: int
+    latitude: float  # centróide
+    longitude: float
+    hull: list[list[float]]  # envoltória convexa, em pares [latitude, longitude]
+    first_date: str | None
+    last_date: str | None
+    victims: int
+    police_actions: int
+    area_km2: float
+    density: float  # ocorrências por km²
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class LocationBias:
+    """Círculo em torno do qual as sugestões de lugares são priorizadas."""
+
+    latitude: float
+    longitude: float
+    radius: float
@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
 
 from app.core.entities.address import Address
+from app.core.entities.location_bias import LocationBias
 
 
 class AutocompleteRepository(ABC):
     @abstractmethod
-    def get_suggestions(self, query: str) -> list[Address]:
+    async def get_suggestions(
+        self, query: str, location_bias: LocationBias | None = None
+    ) -> list[Address]:
         raise NotImplementedError
@@ -0,0 +1,13 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class ClusteringEngine(ABC):
+    @abstractmethod
+    def fit_predict(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """
+        Agrupa os pontos e devolve o rótulo do grupo de cada um (-1 para os
+        pontos isolados), na mesma ordem das coordenadas (em graus).
+        """
+        raise NotImplementedError
@@ -3,5 +3,5 @@ from abc import ABC, abstractmethod
 
 class GeocodeRepository(ABC):
     @abstractmethod
-    def get_coordinates(self, address: str):
+    async def get_coordinates(self, address: str):
         raise NotImplementedError
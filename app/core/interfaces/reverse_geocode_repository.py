@@ -3,5 +3,5 @@ from abc import ABC, abstractmethod
 
 class ReverseGeocodeRepository(ABC):
     @abstractmethod
-    def get_address(self, latitude: float, longitude: float):
+    async def get_address(self, latitude: float, longitude: float):
         raise NotImplementedError
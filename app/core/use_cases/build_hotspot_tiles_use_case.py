@@ -0,0 +1,117 @@
+from collections.abc import Callable
+from dataclasses import asdict
+
+import numpy as np
+
+from app.core.entities.cluster_summary import ClusterSummary
+from app.core.interfaces.clustering_engine import ClusteringEngine
+from app.core.use_cases.cluster_occurrences_use_case import ClusterOccurrencesUseCase
+from app.core.utils.occurrence_columns import OccurrenceColumns, extract_columns
+from app.core.utils.tiles import tile_coordinates, tile_key
+
+
+class BuildHotspotTilesUseCase:
+    """
+    Pré-calcula os hotspots de cada tile (z/x/y) numa pirâmide de zooms, para
+    que o mapa obtenha apenas os tiles visíveis, no detalhe adequado ao zoom.
+
+    Até 'grid_max_zoom', as ocorrências de cada tile são agregadas numa grelha
+    de 'grid_size' x 'grid_size' células. Acima dele, são agrupadas com um raio
+    que passa para metade a cada zoom, até 'epsilon_km' no 'reference_zoom'
+    (e nos seguintes), e cada tile guarda o resumo dos grupos que o tocam.
+    """
+
+    def __init__(
+        self,
+        engine_factory: Callable[[float], ClusteringEngine],
+        epsilon_km: float,
+        min_zoom: int,
+        max_zoom: int,
+        grid_max_zoom: int,
+        reference_zoom: int,
+        grid_size: int,
+    ):
+        """
+        Args:
+            engine_factory: Cria o motor de agrupamento para um raio (em km).
+        """
+        self.engine_factory = engine_factory
+        self.epsilon_km = epsilon_km
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.grid_max_zoom = grid_max_zoom
+        self.reference_zoom = reference_zoom
+        self.grid_size = grid_size
+
+    def execute(self, occurrences: list[dict]) -> dict[int, dict[str, dict]]:
+        """
+        Returns:
+            dict[int, dict[str, dict]]: Para cada zoom, o conteúdo de cada tile
+            não vazio, pelo identificador "x/y": {"kind": "grid", "features":
+            [células]} ou {"kind": "clusters", "features": [resumos]}.
+        """
+        columns = extract_columns(occurrences)
+        if not len(columns):
+            return {}
+
+        tiles = {}
+        summaries_by_epsilon: dict[float, list[ClusterSummary]] = {}
+
+        for zoom in range(self.min_zoom, self.max_zoom + 1):
+            if zoom <= self.grid_max_zoom:
+                tiles[zoom] = self._grid_tiles(columns, zoom)
+                continue
+
+            epsilon_km = self.epsilon_km * 2 ** max(self.reference_zoom - zoom, 0)
+            if epsilon_km not in summaries_by_epsilon:
+                clustering = ClusterOccurrencesUseCase(self.engine_factory(epsilon_km))
+                summaries_by_epsilon[epsilon_km] = clustering.summarize(
+                    clustering.execute(occurrences)
+                )
+            tiles[zoom] = self._cluster_tiles(summaries_by_epsilon[epsilon_km], zoom)
+
+        return tiles
+
+    def _grid_tiles(self, columns: OccurrenceColumns, zoom: int) -> dict[str, dict]:
+        xs, ys = tile_coordinates(columns.latitudes, columns.longitudes, zoom)
+        cells_x = np.floor(xs * self.grid_size).astype(np.int64)
+        cells_y = np.floor(ys * self.grid_size).astype(np.int64)
+
+        # Um identificador por célula, para agregar com np.unique
+        cells_per_side = 2**zoom * self.grid_size
+        cell_ids, inverse, counts = np.unique(
+            cells_x * cells_per_side + cells_y, return_inverse=True, return_counts=True
+        )
+        # Cada célula é desenhada no centróide das suas ocorrências
+        latitudes = np.bincount(inverse, weights=columns.latitudes) / counts
+        longitudes = np.bincount(inverse, weights=columns.longitudes) / counts
+
+        tiles: dict[str, dict] = {}
+        for cell_id, latitude, longitude, count in zip(
+            cell_ids.tolist(), latitudes.tolist(), longitudes.tolist(), counts.tolist()
+        ):
+            cell_x, cell_y = divmod(cell_id, cells_per_side)
+            key = tile_key(cell_x // self.grid_size, cell_y // self.grid_size)
+            tile = tiles.setdefault(key, {"kind": "grid", "features": []})
+            tile["features"].append(
+                {"latitude": latitude, "longitude": longitude, "count": count}
+            )
+        return tiles
+
+    def _cluster_tiles(
+        self, summaries: list[ClusterSummary], zoom: int
+    ) -> dict[str, dict]:
+        tiles: dict[str, dict] = {}
+        for summary in summaries:
+            hull = np.array(summary.hull)
+            xs, ys = tile_coordinates(hull[:, 0], hull[:, 1], zoom)
+            feature = asdict(summary)
+
+            # O grupo vai para todos os tiles que o retângulo da envoltória toca
+            for x in range(int(xs.min()), int(xs.max()) + 1):
+                for y in range(int(ys.min()), int(ys.max()) + 1):
+                    tile = tiles.setdefault(
+                        tile_key(x, y), {"kind": "clusters", "features": []}
+                    )
+                    tile["features"].append(feature)
+        return tiles
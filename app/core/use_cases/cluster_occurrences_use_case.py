@@ -1,43 +1,108 @@
 import numpy as np
-import pandas as pd
-from sklearn.cluster import DBSCAN
 
-from app.core.entities.occurrence import Occurrence
+from app.core.entities.cluster_summary import ClusterSummary
+from app.core.interfaces.clustering_engine import ClusteringEngine
+from app.core.utils.geo import convex_hull, polygon_area, project_equirectangular
+from app.core.utils.occurrence_columns import extract_columns
+
+# Área mínima de um grupo na densidade, para que grupos com todos os pontos no
+# mesmo lugar (ou alinhados) não tenham densidade infinita
+MIN_CLUSTER_AREA_KM2 = 0.01
 
 
 class ClusterOccurrencesUseCase:
 
-    def __init__(self, epsilon_km: float = 1.5, min_samples: int = 3):
-        self.epsilon_km = epsilon_km
-        self.min_samples = min_samples
+    def __init__(self, engine: ClusteringEngine):
+        self.engine = engine
+
+    def execute(self, occurrences: list[dict]) -> list[dict]:
+        """
+        Agrupa as ocorrências por proximidade, com o motor de agrupamento dado.
 
-    def execute(self, occurrences: list[Occurrence]) -> list[Occurrence]:
+        Só o id, as coordenadas e a data são extraídos para arrays NumPy; o
+        rótulo de cada grupo é depois acrescentado a uma cópia rasa do registo
+        original, em "cluster" (-1 para as ocorrências isoladas). As
+        ocorrências sem coordenadas numéricas são descartadas.
+        """
         if not occurrences:
             return []
 
-        df = pd.DataFrame([o for o in occurrences])
-
         required_columns = ["latitude", "longitude"]
-        if not all(col in df.columns for col in required_columns):
-            raise ValueError(f"As colunas {required_columns} são obrigatórias.")
-
         for col in required_columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-        df.dropna(subset=required_columns, inplace=True)
-        if df.empty:
+            if not any(col in o for o in occurrences):
+                raise ValueError(f"As colunas {required_columns} são obrigatórias.")
+
+        columns = extract_columns(occurrences)
+        if not len(columns):
+            return []
+
+        labels = self.engine.fit_predict(columns.latitudes, columns.longitudes)
+
+        return [
+            {
+                **occurrences[position],
+                "latitude": latitude,
+                "longitude": longitude,
+                "cluster": label,
+            }
+            for position, latitude, longitude, label in zip(
+                columns.positions.tolist(),
+                columns.latitudes.tolist(),
+                columns.longitudes.tolist(),
+                labels.tolist(),
+            )
+        ]
+
+    def summarize(self, clustered: list[dict]) -> list[ClusterSummary]:
+        """
+        Resume cada grupo das ocorrências devolvidas por 'execute' (as isoladas
+        são ignoradas): centróide, envoltória convexa, número de ocorrências,
+        intervalo de datas, vítimas, ações policiais e densidade.
+        """
+        columns = extract_columns(clustered)
+        if not len(columns):
             return []
 
-        coords_radians = np.radians(df[["latitude", "longitude"]].values)
-        kms_per_radian = 6371.0
-        epsilon_radians = self.epsilon_km / kms_per_radian
+        records = [clustered[position] for position in columns.positions.tolist()]
+        labels = np.array([record["cluster"] for record in records])
+        victims = np.array([len(record.get("victims") or []) for record in records])
+        police_actions = np.array(
+            [bool(record.get("police_action")) for record in records]
+        )
+        points_km = project_equirectangular(columns.latitudes, columns.longitudes)
+
+        # Ordena por grupo para obter os membros de cada um em fatias contíguas
+        order = np.argsort(labels, kind="stable")
+        cluster_labels, starts = np.unique(labels[order], return_index=True)
+        members_by_cluster = np.split(order, starts[1:])
+
+        summaries = []
+        for label, members in zip(cluster_labels.tolist(), members_by_cluster):
+            if label < 0:
+                continue
+
+            latitudes = columns.latitudes[members]
+            longitudes = columns.longitudes[members]
+            hull = convex_hull(points_km[members])
+            area_km2 = polygon_area(points_km[members][hull]) if len(hull) > 2 else 0.0
 
-        db = DBSCAN(
-            eps=epsilon_radians,
-            min_samples=self.min_samples,
-            algorithm="ball_tree",
-            metric="haversine",
-        ).fit(coords_radians)
+            dates = columns.dates[members]
+            dates = dates[~np.isnat(dates)]
 
-        df["cluster"] = db.labels_
+            summaries.append(
+                ClusterSummary(
+                    cluster=label,
+                    count=len(members),
+                    latitude=float(latitudes.mean()),
+                    longitude=float(longitudes.mean()),
+                    hull=np.column_stack((latitudes[hull], longitudes[hull])).tolist(),
+                    first_date=str(dates.min()) if len(dates) else None,
+                    last_date=str(dates.max()) if len(dates) else None,
+                    victims=int(victims[members].sum()),
+                    police_actions=int(np.count_nonzero(police_actions[members])),
+                    area_km2=area_km2,
+                    density=len(members) / max(area_km2, MIN_CLUSTER_AREA_KM2),
+                )
+            )
 
-        return df.to_dict(orient="records")
+        return summaries
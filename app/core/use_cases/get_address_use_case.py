@@ -5,5 +5,5 @@ class GetAddressUseCase:
     def __init__(self, repository: ReverseGeocodeRepository):
         self.repository = repository
 
-    def execute(self, latitude: float, longitude: float):
-        return self.repository.get_address(latitude, longitude)
+    async def execute(self, latitude: float, longitude: float):
+        return await self.repository.get_address(latitude, longitude)
@@ -5,5 +5,5 @@ class GetCoordinatesUseCase:
     def __init__(self, repository: GeocodeRepository):
         self.repository = repository
 
-    def execute(self, address: str):
-        return self.repository.get_coordinates(address)
+    async def execute(self, address: str):
+        return await self.repository.get_coordinates(address)
@@ -1,4 +1,5 @@
 from app.core.entities.address import Address
+from app.core.entities.location_bias import LocationBias
 from app.core.interfaces.autocomplete_repository import AutocompleteRepository
 
 
@@ -6,5 +7,7 @@ class GetSuggestionsUseCase:
     def __init__(self, repository: AutocompleteRepository):
         self.repository = repository
 
-    def execute(self, query: str) -> list[Address]:
-        return self.repository.get_suggestions(query)
+    async def execute(
+        self, query: str, location_bias: LocationBias | None = None
+    ) -> list[Address]:
+        return await self.repository.get_suggestions(query, location_bias)
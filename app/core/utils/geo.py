@@ -0,0 +1,117 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def ring_contains(ring: np.ndarray, longitude: float, latitude: float) -> bool:
+    """
+    Indica se o ponto está dentro de um anel (polígono fechado), pelo método
+    do lançamento de raio (ray casting).
+
+    Args:
+        ring (np.ndarray): Vértices do anel, em forma (N, 2) de (longitude, latitude).
+        longitude (float): Longitude do ponto.
+        latitude (float): Latitude do ponto.
+    """
+    xs, ys = ring[:, 0], ring[:, 1]
+    previous_xs, previous_ys = np.roll(xs, 1), np.roll(ys, 1)
+
+    # Arestas que atravessam a horizontal do ponto
+    crosses = (ys > latitude) != (previous_ys > latitude)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        intersection_xs = (previous_xs - xs) * (latitude - ys) / (previous_ys - ys) + xs
+
+    return bool(np.count_nonzero(crosses & (longitude < intersection_xs)) % 2)
+
+
+def polygon_contains(
+    rings: list[np.ndarray], longitude: float, latitude: float
+) -> bool:
+    """
+    Indica se o ponto está dentro de um polígono com buracos (regra par-ímpar
+    sobre o anel exterior e os interiores).
+    """
+    inside = False
+    for ring in rings:
+        if ring_contains(ring, longitude, latitude):
+            inside = not inside
+    return inside
+
+
+def project_equirectangular(
+    latitudes: np.ndarray, longitudes: np.ndarray
+) -> np.ndarray:
+    """
+    Projeta as coordenadas num plano em quilómetros (projeção equirretangular
+    centrada na latitude média). À escala de uma cidade, as distâncias
+    euclidianas no plano diferem das distâncias na esfera bem menos de 1%.
+
+    Returns:
+        np.ndarray: Pontos em forma (N, 2) de (x, y), em km.
+    """
+    reference_latitude = np.radians(latitudes.mean())
+    xs = np.radians(longitudes) * np.cos(reference_latitude) * EARTH_RADIUS_KM
+    ys = np.radians(latitudes) * EARTH_RADIUS_KM
+    return np.column_stack((xs, ys))
+
+
+def convex_hull(points: np.ndarray) -> np.ndarray:
+    """
+    Envoltória convexa dos pontos pelo algoritmo da cadeia monótona (Andrew).
+
+    Args:
+        points (np.ndarray): Pontos em forma (N, 2).
+
+    Returns:
+        np.ndarray: Índices dos vértices da envoltória, em sentido anti-horário
+        e sem repetir o primeiro. Se os pontos forem colineares, apenas os
+        dois extremos.
+    """
+    order = np.lexsort((points[:, 1], points[:, 0])).tolist()
+    xy = points.tolist()
+
+    def build(indices: list[int]) -> list[int]:
+        chain: list[int] = []
+        for i in indices:
+            while len(chain) >= 2:
+                (ax, ay), (bx, by) = xy[chain[-2]], xy[chain[-1]]
+                # Remove o último vértice se não fizer uma curva à esquerda
+                if (bx - ax) * (xy[i][1] - ay) - (by - ay) * (xy[i][0] - ax) > 0:
+                    break
+                chain.pop()
+            chain.append(i)
+        return chain
+
+    lower, upper = build(order), build(order[::-1])
+    hull = lower[:-1] + upper[:-1]
+    if not hull:
+        return np.array(order[:1], dtype=np.intp)
+    return np.array(hull, dtype=np.intp)
+
+
+def polygon_area(points: np.ndarray) -> float:
+    """
+    Área de um polígono simples (fórmula do laço), nas unidades dos pontos ao
+    quadrado.
+    """
+    xs, ys = points[:, 0], points[:, 1]
+    return float(abs(np.dot(xs, np.roll(ys, -1)) - np.dot(ys, np.roll(xs, -1))) / 2)
+
+
+def haversine_km(
+    latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray
+) -> np.ndarray:
+    """
+    Distância (em km, pela fórmula de haversine) de um ponto a cada um dos
+    pontos dados.
+    """
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    distances: np.ndarray = (
+        2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    )
+    return distances
@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+
+@dataclass
+class OccurrenceColumns:
+    """
+    Campos usados na análise espacial das ocorrências com coordenadas válidas,
+    em arrays NumPy contíguos (um elemento por ocorrência).
+
+    'positions' guarda o índice de cada ocorrência na lista original, para que
+    os resultados possam ser associados de volta aos registos completos.
+    """
+
+    positions: np.ndarray
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    dates: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _parse_dates(raw_dates: list[str]) -> np.ndarray:
+    try:
+        return np.array(raw_dates, dtype="datetime64[D]")
+    except ValueError:
+        # Alguma data inválida: converte uma a uma, com NaT nas inválidas
+        dates = np.full(len(raw_dates), np.datetime64("NaT"), dtype="datetime64[D]")
+        for i, raw_date in enumerate(raw_dates):
+            try:
+                dates[i] = np.datetime64(raw_date, "D")
+            except ValueError:
+                pass
+        return dates
+
+
+def extract_columns(occurrences: list[dict]) -> OccurrenceColumns:
+    """
+    Extrai, numa única passagem pela lista, a latitude, a longitude e a data
+    (dia) de cada ocorrência, sem copiar os restantes campos.
+
+    As ocorrências sem coordenadas numéricas são descartadas; as datas
+    ausentes ou inválidas ficam NaT.
+    """
+    count = len(occurrences)
+    latitudes = np.empty(count, dtype=np.float64)
+    longitudes = np.empty(count, dtype=np.float64)
+    raw_dates = [""] * count
+
+    for i, occurrence in enumerate(occurrences):
+        latitudes[i] = _to_float(occurrence.get("latitude"))
+        longitudes[i] = _to_float(occurrence.get("longitude"))
+        raw_dates[i] = str(occurrence.get("date") or "NaT")[:10]
+
+    valid = ~(np.isnan(latitudes) | np.isnan(longitudes))
+    positions = np.flatnonzero(valid)
+    dates = _parse_dates([raw_dates[i] for i in positions.tolist()])
+
+    return OccurrenceColumns(
+        positions=positions,
+        latitudes=latitudes[valid],
+        longitudes=longitudes[valid],
+        dates=dates,
+    )
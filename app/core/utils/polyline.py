@@ -0,0 +1,37 @@
+def decode_polyline(encoded: str, precision: int = 5) -> list[tuple[float, float]]:
+    """
+    Descodifica uma polilinha no formato do Google ("Encoded Polyline
+    Algorithm Format"), usado também pelo OSRM e pelo Mapbox (precisão 6).
+
+    Returns:
+        list[tuple[float, float]]: Os pontos (latitude, longitude).
+
+    Raises:
+        ValueError: Se a polilinha estiver truncada ou tiver caracteres inválidos.
+    """
+    factor = 10**precision
+    points = []
+    index = latitude = longitude = 0
+
+    while index < len(encoded):
+        deltas = []
+        for _ in range(2):
+            result = shift = 0
+            while True:
+                if index >= len(encoded):
+                    raise ValueError("Polilinha truncada.")
+                byte = ord(encoded[index]) - 63
+                index += 1
+                if not 0 <= byte < 64:
+                    raise ValueError("Polilinha com caracteres inválidos.")
+                result |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+
+        latitude += deltas[0]
+        longitude += deltas[1]
+        points.append((latitude / factor, longitude / factor))
+
+    return points
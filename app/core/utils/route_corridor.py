@@ -0,0 +1,151 @@
+import math
+
+import numpy as np
+
+from app.core.utils.geo import EARTH_RADIUS_KM, project_equirectangular
+from app.core.utils.occurrence_columns import extract_columns
+from app.core.utils.spatial_index import KM_PER_DEGREE, grid_cell_key
+
+# Limita a memória da matriz ocorrências x segmentos
+_MAX_DISTANCE_MATRIX = 1_000_000
+
+
+def route_length_km(points: np.ndarray) -> float:
+    """
+    Comprimento (em km) da linha que une os pontos (latitude, longitude).
+    """
+    if len(points) < 2:
+        return 0.0
+    latitudes = np.radians(points[:, 0])
+    longitudes = np.radians(points[:, 1])
+    a = (
+        np.sin(np.diff(latitudes) / 2) ** 2
+        + np.cos(latitudes[:-1])
+        * np.cos(latitudes[1:])
+        * np.sin(np.diff(longitudes) / 2) ** 2
+    )
+    return float((2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))).sum())
+
+
+def densify_route(points: np.ndarray, spacing_km: float) -> np.ndarray:
+    """
+    Pontos (latitude, longitude) ao longo da rota, com no máximo 'spacing_km'
+    entre dois consecutivos (os vértices da rota estão sempre incluídos).
+    """
+    if len(points) < 2:
+        return points
+
+    samples = [points[:1]]
+    for start, end in zip(points[:-1], points[1:]):
+        steps = max(math.ceil(route_length_km(np.array([start, end])) / spacing_km), 1)
+        fractions = np.arange(1, steps + 1)[:, None] / steps
+        samples.append(start + (end - start) * fractions)
+    return np.concatenate(samples)
+
+
+def route_grid_cells(
+    points: np.ndarray, corridor_km: float, cell_size: float
+) -> list[str]:
+    """
+    Células da grelha (ver 'build_grid_index') a até 'corridor_km' da rota.
+    """
+    spacing_km = cell_size * KM_PER_DEGREE
+    samples = densify_route(points, spacing_km)
+    # Entre duas amostras, a rota fica a no máximo meio espaçamento de uma delas
+    reach_km = corridor_km + spacing_km / 2
+
+    cells = set()
+    for latitude, longitude in samples.tolist():
+        delta_latitude = reach_km / KM_PER_DEGREE
+        delta_longitude = reach_km / (
+            KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6)
+        )
+        for row in range(
+            math.floor((latitude - delta_latitude) / cell_size),
+            math.floor((latitude + delta_latitude) / cell_size) + 1,
+        ):
+            for column in range(
+                math.floor((longitude - delta_longitude) / cell_size),
+                math.floor((longitude + delta_longitude) / cell_size) + 1,
+            ):
+                cells.add(grid_cell_key(row, column))
+    return sorted(cells)
+
+
+def occurrences_along_route(
+    occurrences: list[dict], points: np.ndarray, corridor_km: float
+) -> tuple[list[dict], list[int]]:
+    """
+    Ocorrências a até 'corridor_km' da rota, pela ordem em que surgem ao
+    percorrê-la.
+
+    As distâncias são calculadas num único plano equirretangular para a rota
+    e as ocorrências, de uma vez para todos os pares ocorrência-segmento.
+
+    Returns:
+        tuple[list[dict], list[int]]: As ocorrências, com a distância à rota
+        ("distance_km"), a distância percorrida até elas ("along_km") e o
+        segmento mais próximo ("segment", o i-ésimo vai do ponto i ao i+1); e
+        o número de ocorrências de cada segmento.
+    """
+    segment_count = max(len(points) - 1, 1)
+    columns = extract_columns(occurrences)
+    if not len(columns) or not len(points):
+        return [], [0] * segment_count
+
+    projected = project_equirectangular(
+        np.concatenate((points[:, 0], columns.latitudes)),
+        np.concatenate((points[:, 1], columns.longitudes)),
+    )
+    route, targets = projected[: len(points)], projected[len(points) :]
+    if len(route) == 1:
+        route = np.vstack((route, route))
+
+    starts = route[:-1]
+    vectors = route[1:] - starts
+    lengths = np.hypot(vectors[:, 0], vectors[:, 1])
+    squared_lengths = np.where(lengths > 0, lengths**2, 1.0)
+    offsets = np.concatenate(([0.0], np.cumsum(lengths)[:-1]))
+
+    distances = np.empty(len(targets))
+    alongs = np.empty(len(targets))
+    segments = np.empty(len(targets), dtype=np.int64)
+
+    chunk = max(_MAX_DISTANCE_MATRIX // len(starts), 1)
+    for first in range(0, len(targets), chunk):
+        block = targets[first : first + chunk]
+        relative = block[:, None, :] - starts[None, :, :]
+        # Posição (0 a 1) da projeção de cada ocorrência em cada segmento
+        t = np.clip(
+            (relative * vectors[None, :, :]).sum(axis=2) / squared_lengths, 0.0, 1.0
+        )
+        gaps = relative - t[:, :, None] * vectors[None, :, :]
+        block_distances = np.hypot(gaps[:, :, 0], gaps[:, :, 1])
+
+        nearest = block_distances.argmin(axis=1)
+        rows = np.arange(len(block))
+        distances[first : first + chunk] = block_distances[rows, nearest]
+        alongs[first : first + chunk] = (
+            offsets[nearest] + t[rows, nearest] * lengths[nearest]
+        )
+        segments[first : first + chunk] = nearest
+
+    inside = np.flatnonzero(distances <= corridor_km)
+    order = inside[np.argsort(alongs[inside], kind="stable")]
+    counts = np.bincount(segments[inside], minlength=segment_count)
+
+    matches = [
+        {
+            **occurrences[position],
+            "distance_km": round(distance, 3),
+            "along_km": round(along, 3),
+            "segment": segment,
+        }
+        for position, distance, along, segment in zip(
+            columns.positions[order].tolist(),
+            distances[order].tolist(),
+            alongs[order].tolist(),
+            segments[order].tolist(),
+        )
+    ]
+    return matches, counts.tolist()
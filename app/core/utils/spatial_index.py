@@ -0,0 +1,125 @@
+import math
+
+import numpy as np
+
+from app.core.entities.bounding_box import BoundingBox
+from app.core.utils.geo import EARTH_RADIUS_KM, haversine_km
+from app.core.utils.occurrence_columns import extract_columns
+
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def grid_cell_key(row: int, column: int) -> str:
+    """Identificador de uma célula da grelha ("linha:coluna")."""
+    return f"{row}:{column}"
+
+
+def build_grid_index(
+    occurrences: list[dict], cell_size: float
+) -> dict[str, list[dict]]:
+    """
+    Distribui as ocorrências pelas células de uma grelha uniforme de
+    'cell_size' graus (as sem coordenadas numéricas são descartadas).
+
+    Returns:
+        dict[str, list[dict]]: As ocorrências de cada célula não vazia.
+    """
+    columns = extract_columns(occurrences)
+    rows = np.floor(columns.latitudes / cell_size).astype(np.int64).tolist()
+    cols = np.floor(columns.longitudes / cell_size).astype(np.int64).tolist()
+
+    index: dict[str, list[dict]] = {}
+    for position, row, column in zip(columns.positions.tolist(), rows, cols):
+        index.setdefault(grid_cell_key(row, column), []).append(occurrences[position])
+    return index
+
+
+def _grid_span(bbox: BoundingBox, cell_size: float) -> tuple[int, int, int, int]:
+    return (
+        math.floor(bbox.min_latitude / cell_size),
+        math.floor(bbox.max_latitude / cell_size),
+        math.floor(bbox.min_longitude / cell_size),
+        math.floor(bbox.max_longitude / cell_size),
+    )
+
+
+def count_grid_cells(bbox: BoundingBox, cell_size: float) -> int:
+    """
+    Número de células da grelha que intersetam o retângulo.
+    """
+    first_row, last_row, first_column, last_column = _grid_span(bbox, cell_size)
+    return (last_row - first_row + 1) * (last_column - first_column + 1)
+
+
+def grid_cells_in(bbox: BoundingBox, cell_size: float) -> list[str]:
+    """
+    Células da grelha que intersetam o retângulo.
+    """
+    first_row, last_row, first_column, last_column = _grid_span(bbox, cell_size)
+    return [
+        grid_cell_key(row, column)
+        for row in range(first_row, last_row + 1)
+        for column in range(first_column, last_column + 1)
+    ]
+
+
+def radius_bounding_box(
+    latitude: float, longitude: float, radius_km: float
+) -> BoundingBox:
+    """
+    Retângulo que contém o círculo de raio 'radius_km' em torno do ponto.
+    """
+    delta_latitude = radius_km / KM_PER_DEGREE
+    # Perto dos polos, um grau de longitude tende para 0 km
+    cos_latitude = max(math.cos(math.radians(latitude)), 1e-6)
+    delta_longitude = min(radius_km / (KM_PER_DEGREE * cos_latitude), 180.0)
+    return BoundingBox(
+        min_latitude=latitude - delta_latitude,
+        min_longitude=longitude - delta_longitude,
+        max_latitude=latitude + delta_latitude,
+        max_longitude=longitude + delta_longitude,
+    )
+
+
+def occurrences_in_radius(
+    occurrences: list[dict], latitude: float, longitude: float, radius_km: float
+) -> list[dict]:
+    """
+    Ocorrências a até 'radius_km' do ponto, da mais próxima para a mais
+    distante, com a distância em "distance_km".
+    """
+    columns = extract_columns(occurrences)
+    distances = haversine_km(latitude, longitude, columns.latitudes, columns.longitudes)
+    inside = np.flatnonzero(distances <= radius_km)
+    order = inside[np.argsort(distances[inside], kind="stable")]
+
+    return [
+        {**occurrences[position], "distance_km": round(distance, 3)}
+        for position, distance in zip(
+            columns.positions[order].tolist(), distances[order].tolist()
+        )
+    ]
+
+
+def occurrences_in_bbox(occurrences: list[dict], bbox: BoundingBox) -> list[dict]:
+    """
+    Ocorrências dentro do retângulo, da mais recente para a mais antiga.
+    """
+    columns = extract_columns(occurrences)
+    inside = (
+        (columns.latitudes >= bbox.min_latitude)
+        & (columns.latitudes <= bbox.max_latitude)
+        & (columns.longitudes >= bbox.min_longitude)
+        & (columns.longitudes <= bbox.max_longitude)
+    )
+    selected = [
+        occurrences[position] for position in columns.positions[inside].tolist()
+    ]
+    return sorted(
+        selected,
+        key=lambda occurrence: (
+            str(occurrence.get("date") or ""),
+            str(occurrence.get("id")),
+        ),
+        reverse=True,
+    )
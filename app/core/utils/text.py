@@ -0,0 +1,11 @@
+import unicodedata
+
+
+def normalize_text(value: str) -> str:
+    """
+    Normaliza um texto para comparação: remove acentos, ignora maiúsculas e
+    minúsculas e colapsa espaços (ex: " São  Paulo " -> "sao paulo").
+    """
+    decomposed = unicodedata.normalize("NFKD", value)
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(without_accents.casefold().split())
@@ -0,0 +1,31 @@
+import numpy as np
+
+# Latitude máxima da projeção Web Mercator (os mapas cortam os polos)
+MAX_MERCATOR_LATITUDE = 85.05112878
+
+
+def tile_coordinates(
+    latitudes: np.ndarray, longitudes: np.ndarray, zoom: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Posição dos pontos na grelha de tiles Web Mercator (XYZ, como nos mapas
+    web) do zoom dado. A parte inteira é o tile e a fracionária a posição
+    dentro dele.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (x, y) fracionários de cada ponto.
+    """
+    tiles_per_side = 2**zoom
+    latitudes = np.radians(
+        np.clip(latitudes, -MAX_MERCATOR_LATITUDE, MAX_MERCATOR_LATITUDE)
+    )
+    xs = (np.asarray(longitudes) + 180.0) / 360.0 * tiles_per_side
+    ys = (1.0 - np.arcsinh(np.tan(latitudes)) / np.pi) / 2.0 * tiles_per_side
+    # Pontos exatamente na borda direita ou inferior ficam no último tile
+    limit = np.nextafter(tiles_per_side, 0)
+    return np.clip(xs, 0, limit), np.clip(ys, 0, limit)
+
+
+def tile_key(x: int, y: int) -> str:
+    """Identificador de um tile dentro do seu zoom."""
+    return f"{x}/{y}"
@@ -1,55 +1,89 @@
+from typing import Any
+
 import httpx
 
 from app.config import settings
+from app.core.entities.location_bias import LocationBias
 from app.core.interfaces.autocomplete_repository import AutocompleteRepository
+from app.infrastructure.api_clients.http_client import GOOGLE_PLACES_UPSTREAM
+from app.infrastructure.resilience.rate_limiter import PLACES_SEARCH_TEXT_RATE_LIMIT
+from app.infrastructure.resilience.upstream import call_upstream
 
 AUTOCOMPLETE_API_URL = "https://places.googleapis.com/v1/places:searchText"
 
+# Apenas os campos usados nas sugestões; "*" traria fotos, avaliações, etc.
+PLACES_FIELD_MASK = (
+    "places.id,places.formattedAddress,places.displayName,places.location"
+)
+
 
 class AutocompleteService(AutocompleteRepository):
-    def get_suggestions(self, query):
+    def __init__(self, client: httpx.AsyncClient):
+        self._client = client
+
+    async def get_suggestions(
+        self, query: str, location_bias: LocationBias | None = None
+    ):
         """
         Obtém sugestões de autocomplete da API.
 
         Args:
           query (str): O texto de consulta para o qual obter sugestões.
+          location_bias (LocationBias | None): Círculo em torno do qual as
+            sugestões são priorizadas (opcional).
 
         Raises:
+          RateLimitExceededError: Se o limite de requisições ao Google for atingido.
+          CircuitOpenError: Se o circuito do Google Places estiver aberto.
           httpx.HTTPStatusError: Se a API externa retornar um erro (4xx, 5xx).
           httpx.RequestError: Se houver um problema de conexão com a API.
         """
         headers = {
             "Content-Type": "application/json",
             "X-Goog-Api-Key": settings.GOOGLE_MAPS_API_KEY,
-            "X-Goog-FieldMask": "*",
+            "X-Goog-FieldMask": PLACES_FIELD_MASK,
         }
 
+        body: dict[str, Any] = {"textQuery": query}
+        if location_bias is not None:
+            body["locationBias"] = {
+                "circle": {
+                    "center": {
+                        "latitude": location_bias.latitude,
+                        "longitude": location_bias.longitude,
+                    },
+                    "radius": location_bias.radius,
+                }
+            }
+
         try:
-            with httpx.Client() as client:
-                response = client.post(
+            response = await call_upstream(
+                GOOGLE_PLACES_UPSTREAM,
+                lambda: self._client.post(
                     AUTOCOMPLETE_API_URL,
-                    json={"textQuery": query},
+                    json=body,
                     headers=headers,
-                    timeout=10.0,
-                )
-
-                response.raise_for_status()
-                response_data = response.json()
-
-                suggestions = response_data.get("places", [])
-
-                new_suggestions = [
-                    {
-                        "id": place.get("id", ""),
-                        "address": place.get("formattedAddress", ""),
-                        "description": place.get("displayName", {}).get("text", ""),
-                        "latitude": place.get("location", {}).get("latitude", 0.0),
-                        "longitude": place.get("location", {}).get("longitude", 0.0),
-                    }
-                    for place in suggestions
-                ]
-
-                return new_suggestions
+                ),
+                rate_limit=PLACES_SEARCH_TEXT_RATE_LIMIT,
+            )
+
+            response.raise_for_status()
+            response_data = response.json()
+
+            suggestions = response_data.get("places", [])
+
+            new_suggestions = [
+                {
+                    "id": place.get("id", ""),
+                    "address": place.get("formattedAddress", ""),
+                    "description": place.get("displayName", {}).get("text", ""),
+                    "latitude": place.get("location", {}).get("latitude", 0.0),
+                    "longitude": place.get("location", {}).get("longitude", 0.0),
+                }
+                for place in suggestions
+            ]
+
+            return new_suggestions
 
         except httpx.HTTPStatusError as e:
             raise ValueError(f"Falha ao obter sugestões: {e}")
@@ -1,17 +1,85 @@
 import asyncio
+import logging
+import math
+from collections.abc import AsyncGenerator
 
 import httpx
 from fastapi import HTTPException
 
+from app.config import settings
 from app.core.entities.occurrence import Occurrence
 from app.core.interfaces.occurrence_repository import OccurrenceRepository
+from app.infrastructure.api_clients.crossfire_directory import (
+    CrossfireLocationDirectory,
+)
+from app.infrastructure.api_clients.http_client import CROSSFIRE_UPSTREAM
+from app.infrastructure.auth.crossfire_token_manager import CrossfireTokenManager
+from app.infrastructure.resilience.circuit_breaker import CircuitOpenError
+from app.infrastructure.resilience.rate_limiter import (
+    CROSSFIRE_OCCURRENCES_RATE_LIMIT,
+    RateLimitExceededError,
+)
+from app.infrastructure.resilience.upstream import call_upstream
+
+logger = logging.getLogger(__name__)
 
 CROSSFIRE_API_BASE_URL = "https://api-service.fogocruzado.org.br/api/v2"
 
 
+def _read_page_count(payload: dict) -> int | None:
+    """
+    Lê o total de páginas dos metadados de paginação ('pageMeta') da resposta.
+    """
+    page_meta = payload.get("pageMeta") or {}
+
+    page_count = page_meta.get("pageCount")
+    if page_count is not None:
+        return int(page_count)
+
+    item_count, take = page_meta.get("itemCount"), page_meta.get("take")
+    if item_count is not None and take:
+        return math.ceil(int(item_count) / int(take))
+
+    return None
+
+
+def _join_pages(pages: dict[int, list[Occurrence]]) -> list[Occurrence]:
+    return [occurrence for page in sorted(pages) for occurrence in pages[page]]
+
+
+def _auth_headers(access_token: str) -> dict:
+    return {
+        "Authorization": f"Bearer {access_token}",
+        "Content-Type": "application/json",
+    }
+
+
+class PartialOccurrencesError(Exception):
+    """
+    Exceção lançada quando algumas páginas de ocorrências falharam mesmo após as
+    novas tentativas. O resultado obtido está incompleto e não deve ser
+    guardado em cache como se fosse completo.
+    """
+
+    def __init__(
+        self, failed_pages: list[int], occurrences: list[Occurrence] | None = None
+    ):
+        super().__init__(f"Falha ao obter as páginas {failed_pages} de ocorrências.")
+        self.failed_pages = failed_pages
+        self.occurrences = occurrences or []
+
+
 class CrossfireAPIService(OccurrenceRepository):
 
-    def __init__(self):
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        location_directory: CrossfireLocationDirectory,
+        token_manager: CrossfireTokenManager | None = None,
+    ):
+        self._client = client
+        self._location_directory = location_directory
+        self._token_manager = token_manager
         self._access_token: list[str] = None
         self._headers: dict = {}
 
@@ -20,129 +88,235 @@ class CrossfireAPIService(OccurrenceRepository):
         Define o token de acesso para as requisições.
         """
         self._access_token = access_token
-        self._headers = {
-            "Authorization": f"Bearer {self._access_token}",
-            "Content-Type": "application/json",
-        }
+        self._headers = _auth_headers(access_token)
 
-    def _get_state_id(self, state: str) -> str | None:
+    async def _get(
+        self, url: str, params: dict | None = None, rate_limit: str | None = None
+    ) -> httpx.Response:
         """
-        Busca o ID do estado a partir do nome. Método auxiliar interno.
-
-        Args:
-                                        state (str): Nome do estado (ex: "São Paulo").
-        Returns:
-                                        Optional[str]: ID do estado se encontrado, caso contrário None.
+        Faz um GET autenticado, com novas tentativas e disjuntor do CrossFire.
+        Com um gestor de tokens configurado, o token é obtido dele e, se a API
+        responder 401, é renovado e a requisição é repetida uma única vez.
         """
-        with httpx.Client() as client:
-            response = client.get(
-                f"{CROSSFIRE_API_BASE_URL}/states",
-                headers=self._headers,
-                timeout=10.0,
+        if self._token_manager is None:
+            return await self._send_get(url, self._headers, params, rate_limit)
+
+        token = await self._token_manager.get_token()
+        response = await self._send_get(url, _auth_headers(token), params, rate_limit)
+
+        if response.status_code == httpx.codes.UNAUTHORIZED:
+            await self._token_manager.invalidate(token)
+            token = await self._token_manager.get_token()
+            response = await self._send_get(
+                url, _auth_headers(token), params, rate_limit
             )
 
-            response.raise_for_status()
-            response_data = response.json()
-            data_payload = response_data.get("data", [])
+        return response
 
-            for state_info in data_payload:
-                state_name = state_info.get("name").lower()
-                if state_name == state.lower():
-                    return state_info.get("id")
+    async def _send_get(
+        self, url: str, headers: dict, params: dict | None, rate_limit: str | None
+    ) -> httpx.Response:
+        return await call_upstream(
+            CROSSFIRE_UPSTREAM,
+            lambda: self._client.get(url, headers=headers, params=params),
+            rate_limit=rate_limit,
+        )
 
-            return None
+    async def get_states(self) -> list[dict]:
+        """
+        Lista todos os estados cobertos pela API.
+
+        Raises:
+            httpx.HTTPStatusError: Se a API externa retornar um erro (4xx, 5xx).
+            httpx.RequestError: Se houver um problema de conexão com a API.
+        """
+        response = await self._get(f"{CROSSFIRE_API_BASE_URL}/states")
+        response.raise_for_status()
+        states: list[dict] = response.json().get("data", [])
+        return states
 
-    def _get_city_id(self, city: str) -> str | None:
+    async def get_cities(self, state_id: str) -> list[dict]:
         """
-        Busca o ID da cidade a partir do nome. Método auxiliar interno.
+        Lista as cidades cobertas pela API num estado.
 
         Args:
-                                        city (str): Nome da cidade (ex: "São Paulo").
+            state_id (str): ID do estado na API.
+        Raises:
+            httpx.HTTPStatusError: Se a API externa retornar um erro (4xx, 5xx).
+            httpx.RequestError: Se houver um problema de conexão com a API.
+        """
+        response = await self._get(
+            f"{CROSSFIRE_API_BASE_URL}/cities", params={"stateId": state_id}
+        )
+        response.raise_for_status()
+        cities: list[dict] = response.json().get("data", [])
+        return cities
+
+    async def _fetch_page(self, params: dict, page: int) -> dict:
+        """
+        Busca uma página de ocorrências e devolve o payload da resposta.
+        """
+        response = await self._get(
+            f"{CROSSFIRE_API_BASE_URL}/occurrences",
+            params={**params, "page": page},
+            rate_limit=CROSSFIRE_OCCURRENCES_RATE_LIMIT,
+        )
+        response.raise_for_status()
+        payload: dict = response.json()
+        return payload
+
+    async def _fetch_page_items(
+        self, params: dict, page: int, semaphore: asyncio.Semaphore
+    ) -> tuple[int, list[Occurrence] | None, bool]:
+        """
+        Busca os itens de uma página; devolve None no lugar dos itens se a
+        página falhar mesmo após as novas tentativas.
+
         Returns:
-                                        Optional[str]: ID da cidade se encontrado, caso contrário None.
+            tuple[int, list[Occurrence] | None, bool]: (página, itens, recusada),
+            em que 'recusada' indica que a requisição nem chegou a ser feita
+            (disjuntor aberto ou limite de taxa atingido).
         """
-        city = city.upper()
+        async with semaphore:
+            try:
+                data = await self._fetch_page(params, page)
+            except (CircuitOpenError, RateLimitExceededError) as e:
+                logger.error(f"Erro na página {page} de ocorrências: {e}")
+                return page, None, True
+            except httpx.HTTPError as e:
+                logger.error(f"Erro na página {page} de ocorrências: {e}")
+                return page, None, False
 
-        with httpx.Client() as client:
-            params = {"cityName": city}
-            response = client.get(
-                f"{CROSSFIRE_API_BASE_URL}/cities",
-                headers=self._headers,
-                params=params,
-                timeout=10.0,
-            )
-            response.raise_for_status()
-            response_data = response.json()
-            data_payload = response_data.get("data", [])
+        if data.get("code") != 200:
+            logger.warning(f"Página {page} de ocorrências não retornou código 200.")
+            return page, None, False
 
-            for city_info in data_payload:
-                city_name = city_info.get("name")
-                if city_name.upper() == city:
-                    return city_info.get("id")
-            return None
+        return page, data.get("data", []), False
 
-    async def get_occurrences(
+    async def iter_occurrence_pages(
         self, city_name: str, state_name: str, initial_date: str, final_date: str
-    ) -> list[Occurrence]:
+    ) -> AsyncGenerator[tuple[int, list[Occurrence]], None]:
         """
-        Busca ocorrências da API externa usando o nome da cidade e do estado.
+        Busca ocorrências da API externa página a página, à medida que chegam.
+
+        A primeira página é buscada sozinha e os seus metadados de paginação
+        ('pageMeta') indicam quantas páginas faltam; estas são buscadas em
+        paralelo com no máximo CROSSFIRE_MAX_CONCURRENT_PAGES requisições em
+        andamento. Se a API não devolver metadados, as páginas são buscadas em
+        lotes até surgir uma página incompleta, até um lote falhar por inteiro
+        ou o CrossFire recusar pedidos, ou até CROSSFIRE_MAX_FALLBACK_PAGES.
+
+        Yields:
+            tuple[int, list[Occurrence]]: (número da página, ocorrências), pela
+            ordem de chegada.
+        Raises:
+            PartialOccurrencesError: No fim, se alguma página falhou.
         """
-        if not self._access_token:
+        if not self._access_token and self._token_manager is None:
             raise ValueError("Token de acesso não configurado no serviço de API.")
 
-        state_id = self._get_state_id(state_name)
-        city_id = self._get_city_id(city_name)
+        await self._location_directory.ensure_loaded(self)
+        state_id, city_id = self._location_directory.resolve(city_name, state_name)
 
         if not city_id:
             raise HTTPException(
-                f"Localização '{city_name}, {state_name}' não encontrada."
+                status_code=404,
+                detail=f"Localização '{city_name}, {state_name}' não encontrada.",
             )
 
-        max_pages = 25
-
-        take = 150
-        occurrences = []
-
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            tasks = []
-
-            for page in range(1, max_pages + 1):
-                params = {
-                    "order": "ASC",
-                    "initialdate": initial_date,
-                    "finaldate": final_date,
-                    "idState": state_id,
-                    "idCities": city_id,
-                    "take": take,
-                    "page": page,
-                }
-                tasks.append(
-                    client.get(
-                        f"{CROSSFIRE_API_BASE_URL}/occurrences",
-                        headers=self._headers,
-                        params=params,
-                    )
-                )
+        take = settings.CROSSFIRE_PAGE_SIZE
+        params = {
+            "order": "ASC",
+            "initialdate": initial_date,
+            "finaldate": final_date,
+            "idState": state_id,
+            "idCities": city_id,
+            "take": take,
+        }
 
-            responses = await asyncio.gather(*tasks, return_exceptions=True)
+        first_page = await self._fetch_page(params, 1)
+        if first_page.get("code") != 200:
+            logger.warning("Página 1 de ocorrências não retornou código 200.")
+            raise PartialOccurrencesError(failed_pages=[1])
 
-            for page, response in enumerate(responses, start=1):
-                if isinstance(response, Exception):
-                    print(f"❌ Erro na página {page}: {response}")
-                    continue
+        first_items = first_page.get("data", [])
+        yield 1, first_items
 
-                response.raise_for_status()
-                data = response.json()
+        page_count = _read_page_count(first_page)
+        semaphore = asyncio.Semaphore(settings.CROSSFIRE_MAX_CONCURRENT_PAGES)
+        failed_pages = []
 
-                if data.get("code") != 200:
-                    print(f"⚠️ Página {page} não retornou código 200")
-                    continue
+        if page_count is not None:
+            tasks = [
+                asyncio.create_task(self._fetch_page_items(params, page, semaphore))
+                for page in range(2, page_count + 1)
+            ]
+            try:
+                for task in asyncio.as_completed(tasks):
+                    page, items, _ = await task
+                    if items is None:
+                        failed_pages.append(page)
+                    else:
+                        yield page, items
+            finally:
+                for task in tasks:
+                    task.cancel()
 
-                occurrences_raw = data.get("data", [])
-                occurrences.extend(occurrences_raw)
+        elif len(first_items) >= take:
+            # Sem metadados: busca lotes de páginas até encontrar uma incompleta
+            batch_size = settings.CROSSFIRE_MAX_CONCURRENT_PAGES
+            max_page = settings.CROSSFIRE_MAX_FALLBACK_PAGES
+            next_page = 2
+            while next_page <= max_page:
+                pages = range(next_page, min(next_page + batch_size, max_page + 1))
+                results = await asyncio.gather(
+                    *(self._fetch_page_items(params, page, semaphore) for page in pages)
+                )
+                next_page = pages.stop
+
+                last_page_reached = False
+                for page, items, _ in results:
+                    if items is None:
+                        failed_pages.append(page)
+                        continue
+                    yield page, items
+                    if len(items) < take:
+                        last_page_reached = True
 
-                # early stop: se veio menos do que o esperado, acabou
-                if len(occurrences_raw) < take:
+                # Sem páginas obtidas ou com pedidos recusados, as seguintes
+                # falhariam da mesma forma: termina com o resultado parcial
+                if (
+                    last_page_reached
+                    or all(items is None for _, items, _ in results)
+                    or any(rejected for _, _, rejected in results)
+                ):
                     break
+            else:
+                # Limite atingido sem encontrar a última página
+                failed_pages.append(next_page)
+
+        if failed_pages:
+            raise PartialOccurrencesError(failed_pages=sorted(failed_pages))
+
+    async def get_occurrences(
+        self, city_name: str, state_name: str, initial_date: str, final_date: str
+    ) -> list[Occurrence]:
+        """
+        Busca ocorrências da API externa usando o nome da cidade e do estado.
+
+        Raises:
+            PartialOccurrencesError: Se alguma página falhar; as ocorrências das
+            páginas obtidas ficam em 'occurrences' da exceção.
+        """
+        pages: dict[int, list[Occurrence]] = {}
+
+        try:
+            async for page, items in self.iter_occurrence_pages(
+                city_name, state_name, initial_date, final_date
+            ):
+                pages[page] = items
+        except PartialOccurrencesError as e:
+            e.occurrences = _join_pages(pages)
+            raise
 
-        return occurrences
+        return _join_pages(pages)
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from app.config import settings
+from app.core.utils.text import normalize_text
+from app.infrastructure.cache.async_redis_cache_service import (
+    AsyncRedisClient,
+    get_async_redis_client,
+)
+
+if TYPE_CHECKING:
+    from app.infrastructure.api_clients.crossfire_client import CrossfireAPIService
+
+logger = logging.getLogger(__name__)
+
+DIRECTORY_CACHE_KEY = "crossfire:location_directory"
+
+# Espera antes de tentar novamente quando a atualização periódica falha
+_REFRESH_RETRY_DELAY = 60
+
+
+class CrossfireLocationDirectory:
+    """
+    Diretório em memória dos estados e cidades da API do CrossFire, indexado
+    pelo nome normalizado (sem acentos e sem diferenciar maiúsculas).
+
+    É carregado do Redis (partilhado entre processos) ou, na falta dele, da
+    API, e atualizado periodicamente, de modo que resolver uma localização
+    não faz nenhuma requisição de rede.
+    """
+
+    def __init__(self, redis_client: AsyncRedisClient | None = None):
+        self._redis_client = redis_client
+        self._state_ids: dict[str, str] = {}
+        self._city_ids: dict[tuple[str, str], str] = {}
+        self._city_ids_by_name: dict[str, str] = {}
+        self._updated_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._updated_at is not None
+
+    def resolve(self, city_name: str, state_name: str) -> tuple[str | None, str | None]:
+        """
+        Resolve os IDs do estado e da cidade a partir dos nomes.
+
+        Args:
+            city_name (str): Nome da cidade (ex: "São Paulo").
+            state_name (str): Nome do estado (ex: "São Paulo").
+        Returns:
+            tuple[str | None, str | None]: (ID do estado, ID da cidade); cada um é
+            None se não for encontrado.
+        """
+        state_id = self._state_ids.get(normalize_text(state_name))
+        city_key = normalize_text(city_name)
+
+        if state_id is not None:
+            # Há muitos nomes repetidos entre estados: a cidade de outro estado
+            # nunca é a pedida
+            return state_id, self._city_ids.get((state_id, city_key))
+
+        return None, self._city_ids_by_name.get(city_key)
+
+    async def ensure_loaded(self, gateway: CrossfireAPIService):
+        """
+        Garante que o diretório está carregado, a partir do Redis ou da API.
+        """
+        if self.is_loaded:
+            return
+
+        async with self._lock:
+            if self.is_loaded:
+                return
+            if not await self._load_from_cache():
+                await self._refresh(gateway)
+
+    async def refresh(self, gateway: CrossfireAPIService):
+        """
+        Recarrega o diretório. Usa a cópia do Redis se outro processo a tiver
+        atualizado dentro do intervalo de atualização; caso contrário, consulta
+        a API e publica o resultado no Redis.
+        """
+        async with self._lock:
+            cached = await self._read_cache()
+            if cached is not None and not self._is_expired(cached["updated_at"]):
+                self._index(cached)
+                return
+            await self._refresh(gateway)
+
+    async def run_periodic_refresh(self, gateway: CrossfireAPIService):
+        """
+        Atualiza o diretório continuamente (tarefa de fundo da aplicação).
+        """
+        while True:
+            try:
+                await self.refresh(gateway)
+                delay = settings.CROSSFIRE_DIRECTORY_REFRESH_INTERVAL
+            except Exception:
+                logger.exception("Falha ao atualizar o diretório de localizações.")
+                delay = _REFRESH_RETRY_DELAY
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _is_expired(updated_at: float) -> bool:
+        return time.time() - updated_at >= settings.CROSSFIRE_DIRECTORY_REFRESH_INTERVAL
+
+    async def _refresh(self, gateway: CrossfireAPIService):
+        states = await gateway.get_states()
+        cities_per_state = await asyncio.gather(
+            *(gateway.get_cities(state["id"]) for state in states)
+        )
+
+        directory: dict[str, Any] = {
+            "updated_at": time.time(),
+            "states": [{"id": s["id"], "name": s["name"]} for s in states],
+            "cities": [
+                {"id": c["id"], "name": c["name"], "state_id": state["id"]}
+                for state, cities in zip(states, cities_per_state)
+                for c in cities
+            ],
+        }
+
+        self._index(directory)
+        if self._redis_client is not None:
+            await self._redis_client.set_data(
+                DIRECTORY_CACHE_KEY,
+                json.dumps(directory),
+                expire=settings.CROSSFIRE_DIRECTORY_CACHE_TTL,
+            )
+        logger.info(
+            f"Diretório de localizações atualizado: {len(directory['states'])} "
+            f"estados, {len(directory['cities'])} cidades."
+        )
+
+    async def _read_cache(self) -> dict | None:
+        if self._redis_client is None:
+            return None
+        return await self._redis_client.get_json_cache(DIRECTORY_CACHE_KEY)
+
+    async def _load_from_cache(self) -> bool:
+        cached = await self._read_cache()
+        if cached is None:
+            return False
+        self._index(cached)
+        return True
+
+    def _index(self, directory: dict):
+        self._state_ids = {
+            normalize_text(state["name"]): state["id"] for state in directory["states"]
+        }
+        self._city_ids = {
+            (city["state_id"], normalize_text(city["name"])): city["id"]
+            for city in directory["cities"]
+        }
+        self._city_ids_by_name = {
+            normalize_text(city["name"]): city["id"] for city in directory["cities"]
+        }
+        self._updated_at = directory["updated_at"]
+
+
+# Variável global para armazenar a única instância do diretório
+_location_directory_instance: CrossfireLocationDirectory | None = None
+
+
+def get_crossfire_location_directory() -> CrossfireLocationDirectory:
+    """
+    Função de dependência do FastAPI para fornecer uma única instância
+    (Singleton) do diretório de localizações por processo.
+    """
+    global _location_directory_instance
+
+    if _location_directory_instance is None:
+        _location_directory_instance = CrossfireLocationDirectory(
+            redis_client=get_async_redis_client()
+        )
+
+    return _location_directory_instance
@@ -1,11 +1,17 @@
+from dataclasses import dataclass
+
 import httpx
 from fastapi import HTTPException
 
 # from app.application.dtos.geocoding_dto import GeocodingResultDTO
 from app.config import settings
 from app.core.interfaces.geocode_repository import GeocodeRepository
+from app.infrastructure.api_clients.http_client import GOOGLE_MAPS_UPSTREAM
+from app.infrastructure.resilience.rate_limiter import GEOCODE_RATE_LIMIT
+from app.infrastructure.resilience.upstream import call_upstream
 
 
+@dataclass
 class GeocodingResultDTO:
     id: str
     formatted_address: str
@@ -18,60 +24,65 @@ GEOCODING_API_URL = "https://maps.googleapis.com/maps/api/geocode/json"
 
 
 class GeocodeService(GeocodeRepository):
-    def get_coordinates(self, address: str) -> GeocodingResultDTO:
+    def __init__(self, client: httpx.AsyncClient):
+        self._client = client
+
+    async def get_coordinates(self, address: str) -> GeocodingResultDTO:
         """
         Obtém as coordenadas (latitude e longitude) para um endereço fornecido.
 
         Args:
             address (str): O endereço a ser geocodificado.
         Raises:
+            RateLimitExceededError: Se o limite de requisições ao Google for atingido.
+            CircuitOpenError: Se o circuito do Google Maps estiver aberto.
             httpx.HTTPStatusError: Se a API externa retornar um erro (4xx, 5xx).
             httpx.RequestError: Se houver um problema de conexão com a API.
             HTTPException: Se o endereço não puder ser decodificado.
         """
         try:
-            with httpx.Client() as client:
-                response = client.get(
+            response = await call_upstream(
+                GOOGLE_MAPS_UPSTREAM,
+                lambda: self._client.get(
                     GEOCODING_API_URL,
                     params={"address": address, "key": settings.GOOGLE_MAPS_API_KEY},
-                    timeout=10.0,
-                )
+                ),
+                rate_limit=GEOCODE_RATE_LIMIT,
+            )
+
+            response.raise_for_status()
+            geocode_response = response.json()
 
-                response.raise_for_status()
-                geocode_response = response.json()
-
-                if (
-                    geocode_response["status"] == "ZERO_RESULTS"
-                    and not geocode_response["results"]
-                ):
-                    raise HTTPException(
-                        status_code=404,
-                        detail="Não foi possível decodificar o endereço",
-                    )
-
-                # TODO: Revisar o nome da variável "most_compatible_address"
-                most_compatible_address = geocode_response["results"][0]
-
-                location_data = most_compatible_address["geometry"]["location"]
-                latitude = location_data["lat"]
-                longitude = location_data["lng"]
-
-                street_name = ""
-                for component in most_compatible_address.get("address_components", []):
-                    if "route" in component.get("types", []):
-                        street_name = component.get("long_name", "")
-
-                geocode_result = GeocodingResultDTO(
-                    id=most_compatible_address.get("place_id", ""),
-                    formatted_address=most_compatible_address.get(
-                        "formatted_address", ""
-                    ),
-                    description=street_name,
-                    latitude=latitude,
-                    longitude=longitude,
+            if (
+                geocode_response["status"] == "ZERO_RESULTS"
+                and not geocode_response["results"]
+            ):
+                raise HTTPException(
+                    status_code=404,
+                    detail="Não foi possível decodificar o endereço",
                 )
 
-                return geocode_result
+            # TODO: Revisar o nome da variável "most_compatible_address"
+            most_compatible_address = geocode_response["results"][0]
+
+            location_data = most_compatible_address["geometry"]["location"]
+            latitude = location_data["lat"]
+            longitude = location_data["lng"]
+
+            street_name = ""
+            for component in most_compatible_address.get("address_components", []):
+                if "route" in component.get("types", []):
+                    street_name = component.get("long_name", "")
+
+            geocode_result = GeocodingResultDTO(
+                id=most_compatible_address.get("place_id", ""),
+                formatted_address=most_compatible_address.get("formatted_address", ""),
+                description=street_name,
+                latitude=latitude,
+                longitude=longitude,
+            )
+
+            return geocode_result
 
         except httpx.HTTPStatusError as e:
             raise ValueError(f"Falha ao obter sugestões: {e}")
@@ -0,0 +1,101 @@
+import importlib.util
+
+import httpx
+
+from app.config import settings
+
+CROSSFIRE_UPSTREAM = "crossfire"
+GOOGLE_MAPS_UPSTREAM = "google_maps"
+GOOGLE_PLACES_UPSTREAM = "google_places"
+
+
+def _http2_enabled() -> bool:
+    """
+    HTTP/2 só é habilitado se configurado e se o pacote 'h2' estiver instalado.
+    """
+    return settings.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+
+class HttpClientPool:
+    """
+    Mantém um cliente HTTP (com pool de conexões e keep-alive) por serviço
+    externo, reutilizado por todos os gateways durante a vida do processo.
+    """
+
+    def __init__(self):
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    @staticmethod
+    def _limits() -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+
+    def get_client(self, upstream: str) -> httpx.AsyncClient:
+        """
+        Obtém o cliente assíncrono do serviço externo, criando-o se necessário.
+
+        Args:
+            upstream (str): Identificador do serviço (ex: CROSSFIRE_UPSTREAM).
+        """
+        client = self._clients.get(upstream)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=_http2_enabled(),
+                limits=self._limits(),
+                timeout=settings.HTTP_TIMEOUT,
+            )
+            self._clients[upstream] = client
+        return client
+
+    async def aclose(self):
+        """
+        Fecha todos os clientes e as conexões mantidas em pool.
+        """
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+# Variável global para armazenar a única instância do pool de clientes HTTP
+_http_client_pool: HttpClientPool | None = None
+
+
+def get_http_client_pool() -> HttpClientPool:
+    """
+    Fornece a instância única (Singleton) do pool de clientes HTTP do processo.
+    """
+    global _http_client_pool
+
+    if _http_client_pool is None:
+        _http_client_pool = HttpClientPool()
+
+    return _http_client_pool
+
+
+async def close_http_client_pool():
+    """
+    Fecha o pool de clientes HTTP do processo (chamado no encerramento da
+    aplicação e do worker).
+    """
+    global _http_client_pool
+
+    if _http_client_pool is not None:
+        await _http_client_pool.aclose()
+        _http_client_pool = None
+
+
+def get_crossfire_http_client() -> httpx.AsyncClient:
+    """
+    Dependência do FastAPI que fornece o cliente HTTP da API do CrossFire.
+    """
+    return get_http_client_pool().get_client(CROSSFIRE_UPSTREAM)
+
+
+def get_google_maps_http_client() -> httpx.AsyncClient:
+    """
+    Dependência do FastAPI que fornece o cliente HTTP da API do Google Maps.
+    """
+    return get_http_client_pool().get_client(GOOGLE_MAPS_UPSTREAM)
@@ -3,20 +3,21 @@ from fastapi import HTTPException
 
 from app.config import settings
 from app.core.interfaces.reverse_geocode_repository import ReverseGeocodeRepository
+from app.infrastructure.api_clients.geocode_client import GeocodingResultDTO
+from app.infrastructure.api_clients.http_client import GOOGLE_MAPS_UPSTREAM
+from app.infrastructure.resilience.rate_limiter import REVERSE_GEOCODE_RATE_LIMIT
+from app.infrastructure.resilience.upstream import call_upstream
 
 GEOCODING_API_URL = "https://maps.googleapis.com/maps/api/geocode/json"
 
 
-class GeocodingResultDTO:
-    id: str
-    formatted_address: str
-    description: str
-    latitude: float
-    longitude: float
-
-
 class ReverseGeocodeService(ReverseGeocodeRepository):
-    def get_address(self, latitude: float, longitude: float) -> GeocodingResultDTO:
+    def __init__(self, client: httpx.AsyncClient):
+        self._client = client
+
+    async def get_address(
+        self, latitude: float, longitude: float
+    ) -> GeocodingResultDTO:
         """
         Obtém o endereço formatado a partir das coordenadas de latitude e longitude.
 
@@ -24,55 +25,59 @@ class ReverseGeocodeService(ReverseGeocodeRepository):
             latitude (float): Latitude do local.
             longitude (float): Longitude do local.
         Raises:
+            RateLimitExceededError: Se o limite de requisições ao Google for atingido.
+            CircuitOpenError: Se o circuito do Google Maps estiver aberto.
             httpx.HTTPStatusError: Se a API externa retornar um erro (4xx, 5xx).
             httpx.RequestError: Se houver um problema de conexão com a API.
         """
         try:
-            with httpx.Client() as client:
-                response = client.get(
+            response = await call_upstream(
+                GOOGLE_MAPS_UPSTREAM,
+                lambda: self._client.get(
                     GEOCODING_API_URL,
                     params={
                         "latlng": f"{latitude}, {longitude}",
                         "key": settings.GOOGLE_MAPS_API_KEY,
                     },
-                    timeout=10.0,
-                )
+                ),
+                rate_limit=REVERSE_GEOCODE_RATE_LIMIT,
+            )
 
-                response.raise_for_status()
-                reverse_geocode_response = response.json()
+            response.raise_for_status()
+            reverse_geocode_response = response.json()
 
-                if (
-                    reverse_geocode_response["status"] == "ZERO_RESULTS"
-                    and not reverse_geocode_response["results"]
-                ):
-                    raise HTTPException(
-                        status_code=404,
-                        detail="Não foi encontrado um endereço para as coordenadas fornecidas",
-                    )
+            if (
+                reverse_geocode_response["status"] == "ZERO_RESULTS"
+                and not reverse_geocode_response["results"]
+            ):
+                raise HTTPException(
+                    status_code=404,
+                    detail="Não foi encontrado um endereço para as coordenadas fornecidas",
+                )
 
-                # TODO: Revisar o nome da variável "most_compatible_address"
-                most_compatible_address = reverse_geocode_response["results"][0]
+            # TODO: Revisar o nome da variável "most_compatible_address"
+            most_compatible_address = reverse_geocode_response["results"][0]
 
-                location_data = most_compatible_address["geometry"]["location"]
-                resolved_latitude = location_data["lat"]
-                resolved_longitude = location_data["lng"]
+            location_data = most_compatible_address["geometry"]["location"]
+            resolved_latitude = location_data["lat"]
+            resolved_longitude = location_data["lng"]
 
-                street_name = ""
-                for component in most_compatible_address.get("address_components", []):
-                    if "route" in component.get("types", []):
-                        street_name = component.get("long_name", "")
+            street_name = ""
+            for component in most_compatible_address.get("address_components", []):
+                if "route" in component.get("types", []):
+                    street_name = component.get("long_name", "")
 
-                reverse_geocode_result = GeocodingResultDTO(
-                    id=reverse_geocode_response["results"][0].get("place_id", ""),
-                    formatted_address=reverse_geocode_response["results"][0].get(
-                        "formatted_address", ""
-                    ),
-                    description=street_name,
-                    latitude=resolved_latitude,
-                    longitude=resolved_longitude,
-                )
+            reverse_geocode_result = GeocodingResultDTO(
+                id=reverse_geocode_response["results"][0].get("place_id", ""),
+                formatted_address=reverse_geocode_response["results"][0].get(
+                    "formatted_address", ""
+                ),
+                description=street_name,
+                latitude=resolved_latitude,
+                longitude=resolved_longitude,
+            )
 
-                return reverse_geocode_result
+            return reverse_geocode_result
         except httpx.HTTPStatusError as e:
             raise ValueError(f"Falha ao obter sugestões: {e}")
         except httpx.RequestError as e:
@@ -1,49 +1,106 @@
+import base64
+import json
+import time
+from dataclasses import dataclass
+
 import httpx
 
+from app.config import settings
+from app.infrastructure.api_clients.http_client import CROSSFIRE_UPSTREAM
+from app.infrastructure.resilience.circuit_breaker import CircuitOpenError
+from app.infrastructure.resilience.upstream import call_upstream
+
 AUTH_API_URL = "https://api-service.fogocruzado.org.br/api/v2/auth/login"
 
 
+@dataclass
+class CrossfireAccessToken:
+    token: str
+    expires_at: float
+
+    def expires_in(self) -> float:
+        """Segundos restantes até a expiração do token."""
+        return self.expires_at - time.time()
+
+
+def _read_jwt_expiration(token: str) -> float | None:
+    """
+    Lê o campo 'exp' do payload de um JWT, sem validar a assinatura.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
 class CrossfireAuthService:
 
-    @staticmethod
-    def get_auth_token(email: str, password: str) -> str | None:
+    def __init__(self, client: httpx.AsyncClient):
+        self._client = client
+
+    async def login(self, email: str, password: str) -> CrossfireAccessToken:
         """
-        Obtém o token de autenticação da API.
+        Autentica na API e devolve o token de acesso com a sua expiração.
+
+        A expiração vem do campo 'expiresIn' da resposta; na sua ausência, do
+        'exp' do JWT e, em último caso, de CROSSFIRE_TOKEN_DEFAULT_TTL.
 
         Args:
-                    email (str): O email do usuário.
-                        password (str): A senha do usuário.
+            email (str): O email do usuário.
+            password (str): A senha do usuário.
 
         Raises:
-            httpx.HTTPStatusError: Se a API externa retornar um erro (4xx, 5xx).
-            httpx.RequestError: Se houver um problema de conexão com a API.
+            ValueError: Se a API recusar as credenciais ou não devolver o token.
+            ConnectionError: Se houver um problema de conexão com a API.
         """
         payload = {"email": email, "password": password}
 
         try:
-            with httpx.Client() as client:
-                response = client.post(
-                    AUTH_API_URL,
-                    json=payload,
-                    timeout=10.0,
-                )
+            response = await call_upstream(
+                CROSSFIRE_UPSTREAM,
+                lambda: self._client.post(AUTH_API_URL, json=payload),
+            )
+
+            response.raise_for_status()
+            response_data = response.json()
 
-                response.raise_for_status()
-                response_data = response.json()
+            data_payload = response_data.get("data", {})
+            access_token = data_payload.get("accessToken", "")
 
-                data_payload = response_data.get("data", {})
-                access_token = data_payload.get("accessToken", "")
+            if not access_token:
+                raise ValueError("Token de acesso não encontrado na resposta da API.")
 
-                if not access_token:
-                    raise ValueError(
-                        "Token de acesso não encontrado na resposta da API."
-                    )
+            expires_in = data_payload.get("expiresIn")
+            if expires_in:
+                expires_at = time.time() + float(expires_in)
+            else:
+                expires_at = _read_jwt_expiration(access_token) or (
+                    time.time() + settings.CROSSFIRE_TOKEN_DEFAULT_TTL
+                )
 
-                return access_token
+            return CrossfireAccessToken(token=access_token, expires_at=expires_at)
 
         except httpx.HTTPStatusError as e:
             raise ValueError(f"Falha na autenticação: {e}")
-        except httpx.RequestError as e:
+        except (httpx.RequestError, CircuitOpenError) as e:
             raise ConnectionError(
                 f"Erro de rede ao conectar com o serviço de autenticação: {e}"
             )
+
+    async def get_auth_token(self, email: str, password: str) -> str | None:
+        """
+        Obtém o token de autenticação da API.
+
+        Args:
+                    email (str): O email do usuário.
+                        password (str): A senha do usuário.
+
+        Raises:
+            ValueError: Se a API recusar as credenciais ou não devolver o token.
+            ConnectionError: Se houver um problema de conexão com a API.
+        """
+        access_token = await self.login(email, password)
+        return access_token.token
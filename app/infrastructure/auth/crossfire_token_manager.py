@@ -0,0 +1,178 @@
+import asyncio
+import json
+import logging
+import time
+from typing import TypeGuard
+
+from app.config import settings
+from app.infrastructure.api_clients.http_client import (
+    CROSSFIRE_UPSTREAM,
+    get_http_client_pool,
+)
+from app.infrastructure.auth.crossfire_auth_service import (
+    CrossfireAccessToken,
+    CrossfireAuthService,
+)
+from app.infrastructure.cache.async_redis_cache_service import (
+    AsyncRedisClient,
+    get_async_redis_client,
+)
+
+logger = logging.getLogger(__name__)
+
+TOKEN_CACHE_KEY = "crossfire:access_token"
+TOKEN_LOCK_KEY = "crossfire:access_token:lock"
+
+# Intervalo entre verificações enquanto outro processo renova o token
+_LOCK_POLL_INTERVAL = 0.1
+
+
+class CrossfireTokenManager:
+    """
+    Mantém o token de acesso da API do CrossFire em memória e no Redis,
+    renovando-o antes de expirar.
+
+    A renovação é feita por um único login: dentro do processo por um
+    asyncio.Lock e entre os workers do gunicorn/Celery por um lock no Redis.
+    """
+
+    def __init__(self, redis_client: AsyncRedisClient | None = None):
+        self._redis_client = redis_client
+        self._token: CrossfireAccessToken | None = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _is_fresh(
+        token: CrossfireAccessToken | None,
+    ) -> TypeGuard[CrossfireAccessToken]:
+        return (
+            token is not None
+            and token.expires_in() > settings.CROSSFIRE_TOKEN_REFRESH_MARGIN
+        )
+
+    async def get_token(self) -> str:
+        """
+        Devolve um token válido, renovando-o se estiver perto de expirar.
+
+        Raises:
+            ValueError: Se a API recusar as credenciais.
+            ConnectionError: Se houver um problema de conexão com a API.
+        """
+        if self._is_fresh(self._token):
+            return self._token.token
+
+        async with self._lock:
+            if self._is_fresh(self._token):
+                return self._token.token
+
+            shared_token = await self._read_shared_token()
+            if self._is_fresh(shared_token):
+                self._token = shared_token
+                return shared_token.token
+
+            try:
+                self._token = await self._refresh()
+            except (ValueError, ConnectionError):
+                # Enquanto o token atual não expirar, continua a ser usado
+                if self._token is not None and self._token.expires_in() > 0:
+                    logger.exception(
+                        "Falha ao renovar o token do CrossFire; usando o atual."
+                    )
+                    return self._token.token
+                raise
+
+            return self._token.token
+
+    async def invalidate(self, token: str):
+        """
+        Descarta o token, se ainda for o atual (ex: após um 401 da API).
+        """
+        if self._token is not None and self._token.token == token:
+            self._token = None
+
+        shared_token = await self._read_shared_token()
+        if (
+            self._redis_client is not None
+            and shared_token is not None
+            and shared_token.token == token
+        ):
+            await self._redis_client.delete_data(TOKEN_CACHE_KEY)
+
+    async def _refresh(self) -> CrossfireAccessToken:
+        if self._redis_client is None:
+            return await self._login()
+
+        lock_ttl_ms = int(settings.CROSSFIRE_TOKEN_LOCK_TIMEOUT * 1000)
+        owner = await self._redis_client.acquire_lock(TOKEN_LOCK_KEY, lock_ttl_ms)
+
+        if owner is None:
+            # Outro processo está a renovar: aguarda o token que ele publicar
+            deadline = time.monotonic() + settings.CROSSFIRE_TOKEN_LOCK_TIMEOUT
+            while time.monotonic() < deadline:
+                await asyncio.sleep(_LOCK_POLL_INTERVAL)
+                shared_token = await self._read_shared_token()
+                if self._is_fresh(shared_token):
+                    return shared_token
+            return await self._login()
+
+        try:
+            access_token = await self._login()
+            await self._write_shared_token(access_token)
+            return access_token
+        finally:
+            await self._redis_client.release_lock(TOKEN_LOCK_KEY, owner)
+
+    async def _login(self) -> CrossfireAccessToken:
+        client = get_http_client_pool().get_client(CROSSFIRE_UPSTREAM)
+        auth_service = CrossfireAuthService(client=client)
+        logger.info("Renovando o token de acesso do CrossFire.")
+        return await auth_service.login(
+            settings.EMAIL_CROSSFIRE_API, settings.PASSWORD_CROSSFIRE_API
+        )
+
+    async def _read_shared_token(self) -> CrossfireAccessToken | None:
+        if self._redis_client is None:
+            return None
+
+        cached = await self._redis_client.get_json_cache(TOKEN_CACHE_KEY)
+        if not cached:
+            return None
+
+        return CrossfireAccessToken(
+            token=cached["token"], expires_at=cached["expires_at"]
+        )
+
+    async def _write_shared_token(self, access_token: CrossfireAccessToken):
+        if self._redis_client is None:
+            return
+
+        expire = int(access_token.expires_in())
+        if expire <= 0:
+            return
+
+        await self._redis_client.set_data(
+            TOKEN_CACHE_KEY,
+            json.dumps(
+                {"token": access_token.token, "expires_at": access_token.expires_at}
+            ),
+            expire=expire,
+        )
+
+
+# Variável global para armazenar a única instância do gestor de tokens
+_token_manager_instance: CrossfireTokenManager | None = None
+
+
+def get_crossfire_token_manager() -> CrossfireTokenManager:
+    """
+    Função de dependência do FastAPI para fornecer uma única instância
+    (Singleton) do CrossfireTokenManager por processo.
+    """
+    global _token_manager_instance
+
+    if _token_manager_instance is None:
+        _token_manager_instance = CrossfireTokenManager(
+            redis_client=get_async_redis_client()
+        )
+
+    return _token_manager_instance
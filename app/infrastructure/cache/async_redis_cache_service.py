@@ -0,0 +1,466 @@
+import logging
+import time
+import uuid
+from typing import Any
+
+import redis.asyncio as redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, RedisError, TimeoutError
+from redis.typing import EncodableT, FieldT
+
+from app.config import settings
+from app.infrastructure.cache.codec import CacheEntry, encode_entry, parse_entry
+
+logger = logging.getLogger(__name__)
+
+# Remove o lock de forma atómica apenas se o valor ainda for o do dono
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def create_connection_pool() -> redis.ConnectionPool:
+    """
+    Cria o pool de conexões partilhado por todos os pedidos do processo.
+
+    As conexões ociosas são verificadas (PING) antes de voltarem a ser usadas
+    e as que caíram são restabelecidas, com novas tentativas em caso de erro
+    de conexão ou timeout.
+    """
+    return redis.ConnectionPool(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+        socket_keepalive=True,
+        retry=Retry(ExponentialBackoff(cap=1.0, base=0.05), retries=2),
+        retry_on_error=[ConnectionError, TimeoutError],
+    )
+
+
+class AsyncRedisClient:
+    """
+    Cliente assíncrono do Redis (redis.asyncio) sobre um pool de conexões
+    explícito. Não bloqueia o loop de eventos durante as leituras e escritas.
+
+    Os valores são lidos como bytes. Se o Redis estiver indisponível, as
+    operações registam o erro e devolvem None/False, como no RedisClient; a
+    conexão é restabelecida automaticamente na operação seguinte.
+    """
+
+    def __init__(self, connection_pool: redis.ConnectionPool):
+        self._pool = connection_pool
+        self.r = redis.Redis(connection_pool=connection_pool)
+
+    async def ping(self) -> bool:
+        """
+        Verifica se o Redis está acessível.
+        """
+        try:
+            return bool(await self.r.ping())
+        except RedisError as e:
+            logger.warning(f"Redis indisponível: {e}")
+            return False
+
+    async def aclose(self):
+        """
+        Fecha o cliente e todas as conexões do pool.
+        """
+        await self.r.aclose()
+        await self._pool.disconnect()
+
+    async def set_data(self, key: str, value: Any, expire: int | None = None) -> bool:
+        """
+        Salva dados (string, bytes, número, etc.) no Redis.
+
+        :param key: A chave para guardar os dados.
+        :param value: O valor a ser guardado.
+        :param expire: Tempo de expiração em segundos (opcional).
+        :return: True se a operação for bem-sucedida, False caso contrário.
+        """
+        try:
+            await self.r.set(key, value, ex=expire)
+            return True
+        except RedisError as e:
+            logger.error(f"Erro ao salvar dados no Redis para a chave '{key}': {e}")
+            return False
+
+    async def get_data(self, key: str) -> bytes | str | None:
+        """
+        Obtém dados guardados no Redis.
+
+        :param key: A chave para obter os dados.
+        :return: O valor em bytes, ou None se a chave não existir ou em caso de erro.
+        """
+        try:
+            return await self.r.get(key)
+        except RedisError as e:
+            logger.error(f"Erro ao obter dados do Redis para a chave '{key}': {e}")
+            return None
+
+    async def key_exists(self, *keys: str) -> bool:
+        """
+        Indica se alguma das chaves existe (False também em caso de erro).
+        """
+        try:
+            return bool(await self.r.exists(*keys))
+        except RedisError as e:
+            logger.error(f"Erro ao verificar as chaves {keys} no Redis: {e}")
+            return False
+
+    async def delete_data(self, key: str) -> bool:
+        """
+        Remove uma chave do Redis.
+
+        :param key: A chave a ser removida.
+        :return: True se a operação for bem-sucedida, False caso contrário.
+        """
+        try:
+            await self.r.delete(key)
+            return True
+        except RedisError as e:
+            logger.error(f"Erro ao remover a chave '{key}' do Redis: {e}")
+            return False
+
+    async def increment_counters(self, key: str, amounts: dict[str, int]) -> bool:
+        """
+        Incrementa vários contadores guardados nos campos de um hash do Redis,
+        numa única ida (pipeline de HINCRBY).
+
+        :param key: A chave do hash.
+        :param amounts: O valor a somar a cada campo.
+        :return: True se a operação for bem-sucedida, False caso contrário.
+        """
+        try:
+            async with self.r.pipeline(transaction=False) as pipeline:
+                for field, amount in amounts.items():
+                    pipeline.hincrby(key, field, amount)
+                await pipeline.execute()
+            return True
+        except RedisError as e:
+            logger.error(f"Erro ao incrementar os contadores '{key}' no Redis: {e}")
+            return False
+
+    async def publish_message(self, channel: str, message: str) -> bool:
+        """
+        Publica uma mensagem num canal de pub/sub do Redis.
+
+        :param channel: O canal.
+        :param message: A mensagem.
+        :return: True se a operação for bem-sucedida, False caso contrário.
+        """
+        try:
+            await self.r.publish(channel, message)
+            return True
+        except RedisError as e:
+            logger.error(f"Erro ao publicar no canal '{channel}' do Redis: {e}")
+            return False
+
+    # --- Lock Distribuído ---
+
+    async def acquire_lock(self, key: str, ttl_ms: int) -> str | None:
+        """
+        Tenta adquirir um lock distribuído (SET NX PX), partilhado entre processos.
+
+        :param key: A chave do lock.
+        :param ttl_ms: Tempo máximo, em milissegundos, que o lock pode ficar retido.
+        :return: O identificador do dono do lock, ou None se já estiver retido.
+        """
+        owner = uuid.uuid4().hex
+        try:
+            if await self.r.set(key, owner, nx=True, px=ttl_ms):
+                return owner
+            return None
+        except RedisError as e:
+            logger.error(f"Erro ao adquirir o lock '{key}' no Redis: {e}")
+            return None
+
+    async def release_lock(self, key: str, owner: str) -> bool:
+        """
+        Liberta o lock apenas se ainda pertencer a quem o adquiriu.
+
+        :param key: A chave do lock.
+        :param owner: O identificador devolvido por 'acquire_lock'.
+        :return: True se o lock foi libertado, False caso contrário.
+        """
+        try:
+            return bool(await self.r.eval(_RELEASE_LOCK_SCRIPT, 1, key, owner))
+        except RedisError as e:
+            logger.error(f"Erro ao libertar o lock '{key}' no Redis: {e}")
+            return False
+
+    # --- Cache de Estruturas Complexas (formato em codec.py) ---
+
+    async def get_cache_entry(self, key: str) -> CacheEntry | None:
+        """
+        Obtém uma entrada do cache sem desserializar os dados, para que possam
+        ser enviados ao cliente tal como estão guardados.
+
+        :param key: A chave do cache.
+        :return: A entrada se o cache existir e for válido, ou None.
+        """
+        raw = await self.get_data(key)
+        if raw is None:
+            return None
+
+        try:
+            return parse_entry(raw)
+        except ValueError as e:
+            logger.error(f"Erro ao ler a entrada do cache '{key}': {e}")
+            return None
+
+    def _parse_entries(
+        self, keys: list[str], raw_entries: list[bytes | str | None]
+    ) -> list[CacheEntry | None]:
+        entries = []
+        for key, raw in zip(keys, raw_entries):
+            entry = None
+            if raw is not None:
+                try:
+                    entry = parse_entry(raw)
+                except ValueError as e:
+                    logger.error(f"Erro ao ler a entrada do cache '{key}': {e}")
+            entries.append(entry)
+        return entries
+
+    async def get_cache_entries(self, keys: list[str]) -> list[CacheEntry | None]:
+        """
+        Obtém as entradas de várias chaves numa única ida ao Redis (MGET).
+
+        :param keys: As chaves do cache.
+        :return: A entrada de cada chave, na mesma ordem (None se não existir,
+                 for inválida ou em caso de erro).
+        """
+        if not keys:
+            return []
+        try:
+            raw_entries = await self.r.mget(keys)
+        except RedisError as e:
+            logger.error(f"Erro ao obter as chaves {keys} do Redis: {e}")
+            return [None] * len(keys)
+        return self._parse_entries(keys, raw_entries)
+
+    async def get_hash_cache_entries(
+        self, keys: list[str], field: str
+    ) -> list[CacheEntry | None]:
+        """
+        Obtém o mesmo campo de vários hashes gravados com 'set_swr_hash_cache'
+        numa única ida ao Redis (pipeline de HGET).
+
+        :param keys: As chaves dos hashes.
+        :param field: O campo.
+        :return: A entrada de cada hash, na mesma ordem (None se não existir,
+                 for inválida ou em caso de erro).
+        """
+        try:
+            async with self.r.pipeline(transaction=False) as pipeline:
+                for key in keys:
+                    pipeline.hget(key, field)
+                raw_entries = await pipeline.execute()
+        except RedisError as e:
+            logger.error(f"Erro ao obter o campo '{field}' dos hashes {keys}: {e}")
+            return [None] * len(keys)
+        return self._parse_entries([f"{key}/{field}" for key in keys], raw_entries)
+
+    async def get_hash_fields_entries(
+        self, key: str, fields: list[str]
+    ) -> list[CacheEntry | None]:
+        """
+        Obtém vários campos de um hash gravado com 'set_swr_hash_cache' numa
+        única ida ao Redis (HMGET).
+
+        :param key: A chave do hash.
+        :param fields: Os campos.
+        :return: A entrada de cada campo, na mesma ordem (None se não existir,
+                 for inválida ou em caso de erro).
+        """
+        if not fields:
+            return []
+        try:
+            raw_entries = await self.r.hmget(key, fields)
+        except RedisError as e:
+            logger.error(f"Erro ao obter os campos do hash '{key}': {e}")
+            return [None] * len(fields)
+        return self._parse_entries([f"{key}/{field}" for field in fields], raw_entries)
+
+    async def get_hash_cache_entry(self, key: str, field: str) -> CacheEntry | None:
+        """
+        Obtém, sem desserializar, a entrada de um campo de um hash gravado com
+        'set_swr_hash_cache' (uma única leitura, HGET).
+
+        :param key: A chave do hash.
+        :param field: O campo.
+        :return: A entrada se o campo existir e for válido, ou None.
+        """
+        try:
+            raw = await self.r.hget(key, field)
+        except RedisError as e:
+            logger.error(f"Erro ao obter o campo '{field}' do hash '{key}': {e}")
+            return None
+        if raw is None:
+            return None
+
+        try:
+            return parse_entry(raw)
+        except ValueError as e:
+            logger.error(f"Erro ao ler a entrada do cache '{key}/{field}': {e}")
+            return None
+
+    async def get_json_cache(self, key: str) -> Any | None:
+        """
+        Obtém e desserializa dados guardados com 'set_json_cache'.
+
+        :param key: A chave do cache.
+        :return: Os dados se o cache existir e for válido, ou None.
+        """
+        entry = await self.get_cache_entry(key)
+        if entry is None:
+            return None
+
+        try:
+            return entry.decode()
+        except ValueError as e:
+            logger.error(f"Erro ao desserializar os dados da chave '{key}': {e}")
+            return None
+
+    async def set_json_cache(self, key: str, data: Any, expire: int = 3600) -> bool:
+        """
+        Serializa, comprime e salva dados no Redis.
+
+        :param key: A chave do cache.
+        :param data: Os dados a serem guardados (serializáveis em JSON).
+        :param expire: Tempo de expiração em segundos (padrão: 3600s = 1 hora).
+        :return: True se a operação for bem-sucedida, False caso contrário.
+        """
+        try:
+            encoded = encode_entry(data)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Erro ao serializar os dados da chave '{key}': {e}")
+            return False
+        return await self.set_data(key, encoded, expire=expire)
+
+    # --- Cache com Stale-While-Revalidate ---
+
+    async def get_swr_cache(self, key: str) -> tuple[Any, bool] | None:
+        """
+        Obtém dados guardados com 'set_swr_cache'.
+
+        :param key: A chave do cache.
+        :return: (dados, expirado) se o cache existir, ou None. Quando 'expirado'
+                 é True os dados ainda podem ser servidos, mas devem ser
+                 atualizados em segundo plano.
+        """
+        entry = await self.get_cache_entry(key)
+        if entry is None:
+            return None
+
+        try:
+            return entry.decode(), entry.is_stale
+        except ValueError as e:
+            logger.error(f"Erro ao desserializar os dados da chave '{key}': {e}")
+            return None
+
+    async def set_swr_cache(
+        self,
+        key: str,
+        data: Any,
+        fresh_for: int,
+        stale_for: int,
+        item_per_line: bool = False,
+    ) -> bool:
+        """
+        Serializa e salva dados que são atuais durante 'fresh_for' segundos e que,
+        depois disso, ainda podem ser servidos durante 'stale_for' segundos
+        enquanto são atualizados.
+
+        :param key: A chave do cache.
+        :param data: Os dados a serem guardados.
+        :param fresh_for: Segundos durante os quais os dados são atuais.
+        :param stale_for: Segundos adicionais durante os quais podem ser servidos.
+        :param item_per_line: Grava uma lista com um elemento por linha (ver
+                              'encode_entry').
+        :return: True se a operação for bem-sucedida, False caso contrário.
+        """
+        try:
+            encoded = encode_entry(
+                data, fresh_until=time.time() + fresh_for, item_per_line=item_per_line
+            )
+        except (TypeError, ValueError) as e:
+            logger.error(f"Erro ao serializar os dados da chave '{key}': {e}")
+            return False
+        return await self.set_data(key, encoded, expire=fresh_for + stale_for)
+
+    async def set_swr_hash_cache(
+        self, key: str, entries: dict[str, Any], fresh_for: int, stale_for: int
+    ) -> bool:
+        """
+        Substitui, de forma atómica, um hash cujos campos são guardados como em
+        'set_swr_cache' (um valor serializado e comprimido por campo).
+
+        :param key: A chave do hash.
+        :param entries: Os dados de cada campo.
+        :param fresh_for: Segundos durante os quais os dados são atuais.
+        :param stale_for: Segundos adicionais durante os quais podem ser servidos.
+        :return: True se a operação for bem-sucedida, False caso contrário.
+        """
+        fresh_until = time.time() + fresh_for
+        try:
+            encoded: dict[FieldT, EncodableT] = {
+                field: encode_entry(data, fresh_until=fresh_until)
+                for field, data in entries.items()
+            }
+        except (TypeError, ValueError) as e:
+            logger.error(f"Erro ao serializar os dados da chave '{key}': {e}")
+            return False
+
+        try:
+            # MULTI/EXEC: os leitores nunca veem o hash meio substituído
+            async with self.r.pipeline() as pipeline:
+                pipeline.delete(key)
+                if encoded:
+                    pipeline.hset(key, mapping=encoded)
+                    pipeline.expire(key, fresh_for + stale_for)
+                await pipeline.execute()
+            return True
+        except RedisError as e:
+            logger.error(f"Erro ao salvar o hash '{key}' no Redis: {e}")
+            return False
+
+
+# Variável global para armazenar a única instância do cliente assíncrono
+_async_redis_client_instance: AsyncRedisClient | None = None
+
+
+def get_async_redis_client() -> AsyncRedisClient:
+    """
+    Função de dependência do FastAPI para fornecer uma única instância
+    (Singleton) do AsyncRedisClient por processo.
+
+    Ao contrário de 'get_redis_client', não testa a conexão ao ser criado: um
+    Redis indisponível no arranque não impede que seja usado quando voltar.
+    """
+    global _async_redis_client_instance
+
+    if _async_redis_client_instance is None:
+        _async_redis_client_instance = AsyncRedisClient(create_connection_pool())
+
+    return _async_redis_client_instance
+
+
+async def close_async_redis_client():
+    """
+    Fecha o cliente assíncrono do processo (chamado no encerramento da
+    aplicação e do worker).
+    """
+    global _async_redis_client_instance
+
+    if _async_redis_client_instance is not None:
+        await _async_redis_client_instance.aclose()
+        _async_redis_client_instance = None
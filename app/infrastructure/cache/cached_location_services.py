@@ -0,0 +1,147 @@
+import asyncio
+from contextlib import nullcontext
+from dataclasses import asdict
+
+from app.config import settings
+from app.core.entities.location_bias import LocationBias
+from app.core.interfaces.autocomplete_repository import AutocompleteRepository
+from app.core.interfaces.geocode_repository import GeocodeRepository
+from app.core.interfaces.reverse_geocode_repository import ReverseGeocodeRepository
+from app.core.utils.text import normalize_text
+from app.infrastructure.api_clients.geocode_client import GeocodingResultDTO
+from app.infrastructure.cache.result_cache import ResultCache
+
+
+def snap_coordinates(latitude: float, longitude: float, precision: int) -> str:
+    """
+    Arredonda as coordenadas para 'precision' casas decimais (4 casas ≈ 11 m),
+    de modo que pontos muito próximos partilhem a mesma chave de cache.
+    """
+    return f"{latitude:.{precision}f},{longitude:.{precision}f}"
+
+
+def _filter_suggestions(suggestions: list, query: str) -> list:
+    """
+    Sugestões cujo nome ou endereço contém todas as palavras da busca
+    normalizada.
+    """
+    words = query.split()
+    return [
+        suggestion
+        for suggestion in suggestions
+        if all(
+            word
+            in normalize_text(f"{suggestion['description']} {suggestion['address']}")
+            for word in words
+        )
+    ]
+
+
+class CachedGeocodeService(GeocodeRepository):
+    """
+    Geocodificação com cache, indexado pelo endereço normalizado (sem acentos,
+    maiúsculas ou espaços repetidos).
+
+    O semáforo 'concurrency', se fornecido, limita apenas as chamadas ao
+    serviço; os acertos no cache não esperam por ele.
+    """
+
+    def __init__(
+        self,
+        repository: GeocodeRepository,
+        cache: ResultCache,
+        concurrency: asyncio.Semaphore | None = None,
+    ):
+        self._repository = repository
+        self._cache = cache
+        self._concurrency = concurrency or nullcontext()
+
+    async def get_coordinates(self, address: str) -> GeocodingResultDTO:
+        async def load() -> dict:
+            async with self._concurrency:
+                result = await self._repository.get_coordinates(address)
+            return asdict(result)
+
+        cached = await self._cache.get_or_load(normalize_text(address), load)
+        return GeocodingResultDTO(**cached)
+
+
+class CachedReverseGeocodeService(ReverseGeocodeRepository):
+    """
+    Geocodificação reversa com cache, indexado pelas coordenadas arredondadas
+    para REVERSE_GEOCODE_COORDINATE_PRECISION casas decimais.
+
+    O semáforo 'concurrency' tem o mesmo papel que em CachedGeocodeService.
+    """
+
+    def __init__(
+        self,
+        repository: ReverseGeocodeRepository,
+        cache: ResultCache,
+        concurrency: asyncio.Semaphore | None = None,
+    ):
+        self._repository = repository
+        self._cache = cache
+        self._concurrency = concurrency or nullcontext()
+
+    async def get_address(
+        self, latitude: float, longitude: float
+    ) -> GeocodingResultDTO:
+        key = snap_coordinates(
+            latitude, longitude, settings.REVERSE_GEOCODE_COORDINATE_PRECISION
+        )
+
+        async def load() -> dict:
+            async with self._concurrency:
+                result = await self._repository.get_address(latitude, longitude)
+            return asdict(result)
+
+        cached = await self._cache.get_or_load(key, load)
+        return GeocodingResultDTO(**cached)
+
+
+class CachedAutocompleteService(AutocompleteRepository):
+    """
+    Sugestões de lugares com cache, indexado pelo texto normalizado da busca.
+
+    Uma busca que estende outra em curso ou concluída há menos de
+    AUTOCOMPLETE_PREFIX_WINDOW segundos (ex: "rua sao j" depois de "rua sao")
+    usa as sugestões dessa, filtradas, se alguma ainda corresponder.
+
+    Com viés de localização, o centro (arredondado para
+    AUTOCOMPLETE_BIAS_PRECISION casas) e o raio fazem parte da chave.
+    """
+
+    def __init__(self, repository: AutocompleteRepository, cache: ResultCache):
+        self._repository = repository
+        self._cache = cache
+
+    async def get_suggestions(
+        self, query: str, location_bias: LocationBias | None = None
+    ) -> list:
+        normalized_query = normalize_text(query)
+        key = normalized_query
+        if location_bias is not None:
+            center = snap_coordinates(
+                location_bias.latitude,
+                location_bias.longitude,
+                settings.AUTOCOMPLETE_BIAS_PRECISION,
+            )
+            key = f"{center}:{location_bias.radius:g}|{normalized_query}"
+
+        cached: list | None = await self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Enquanto o usuário digita, a busca anterior (ainda em curso ou
+        # concluída há instantes) pode já conter as sugestões desta
+        prefix_match = await self._cache.single_flight.find_prefix(key)
+        if prefix_match is not None:
+            suggestions = _filter_suggestions(prefix_match[1], normalized_query)
+            if suggestions:
+                return suggestions
+
+        loaded: list = await self._cache.load(
+            key, lambda: self._repository.get_suggestions(query, location_bias)
+        )
+        return loaded
@@ -0,0 +1,264 @@
+import json
+import math
+import random
+import struct
+import time
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependência opcional
+    zstandard = None  # type: ignore[assignment]
+
+_DECOMPRESSION_ERRORS = (
+    (zlib.error, zstandard.ZstdError) if zstandard is not None else (zlib.error,)
+)
+
+# Cabeçalho das entradas: MAGIC, serializador (1 byte), compressão (1 byte) e
+# o instante (epoch, double) até ao qual os dados são atuais (0 se não tiver).
+# Entradas sem o MAGIC são JSON simples, gravadas antes deste formato.
+MAGIC = b"SRC1"
+_HEADER = struct.Struct(">4scc d")
+
+SERIALIZER_JSON = b"j"
+SERIALIZER_ORJSON = b"o"
+
+COMPRESSION_NONE = b"n"
+COMPRESSION_ZLIB = b"z"
+COMPRESSION_ZSTD = b"s"
+
+# Listas gravadas com 'item_per_line' começam por estes bytes, que o JSON
+# compacto dos serializadores nunca produz
+_ITEM_PER_LINE_START = b"[\n"
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson is not None else 0
+)
+
+
+def _serialize(data: Any) -> tuple[bytes, bytes]:
+    if orjson is not None:
+        return SERIALIZER_ORJSON, orjson.dumps(data, option=_ORJSON_OPTIONS)
+    return SERIALIZER_JSON, json.dumps(data).encode()
+
+
+def _serialize_items(items: list) -> tuple[bytes, bytes]:
+    if not items:
+        return _serialize(items)
+    serializer = SERIALIZER_ORJSON if orjson is not None else SERIALIZER_JSON
+    lines = b",\n".join(_serialize(item)[1] for item in items)
+    return serializer, _ITEM_PER_LINE_START + lines + b"\n]"
+
+
+def _deserialize(payload: bytes) -> Any:
+    # Os dois serializadores produzem JSON: qualquer um lê os dois formatos
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def zstd_compress(payload: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=settings.CACHE_ZSTD_LEVEL).compress(payload)
+
+
+def _compress(payload: bytes) -> tuple[bytes, bytes]:
+    if len(payload) < settings.CACHE_COMPRESSION_MIN_BYTES:
+        return COMPRESSION_NONE, payload
+    if zstandard is not None:
+        return COMPRESSION_ZSTD, zstd_compress(payload)
+    return COMPRESSION_ZLIB, zlib.compress(payload, settings.CACHE_ZLIB_LEVEL)
+
+
+def _decompress(compression: bytes, payload: bytes) -> bytes:
+    if compression == COMPRESSION_NONE:
+        return payload
+    if compression == COMPRESSION_ZSTD and zstandard is None:
+        raise ValueError("Entrada comprimida com zstd, mas 'zstandard' não existe.")
+
+    try:
+        if compression == COMPRESSION_ZSTD:
+            return zstandard.ZstdDecompressor().decompressobj().decompress(payload)
+        if compression == COMPRESSION_ZLIB:
+            return zlib.decompress(payload)
+    except _DECOMPRESSION_ERRORS as e:
+        raise ValueError(f"Entrada do cache corrompida: {e}")
+
+    raise ValueError(f"Compressão desconhecida: {compression!r}")
+
+
+def _iter_decompressed(compression: bytes, payload: bytes) -> Iterator[bytes]:
+    if compression == COMPRESSION_NONE:
+        for start in range(0, len(payload), _STREAM_CHUNK_SIZE):
+            yield payload[start : start + _STREAM_CHUNK_SIZE]
+        return
+    if compression == COMPRESSION_ZSTD and zstandard is None:
+        raise ValueError("Entrada comprimida com zstd, mas 'zstandard' não existe.")
+
+    try:
+        if compression == COMPRESSION_ZSTD:
+            yield from zstandard.ZstdDecompressor().read_to_iter(
+                payload, write_size=_STREAM_CHUNK_SIZE
+            )
+            return
+        if compression == COMPRESSION_ZLIB:
+            decompressor = zlib.decompressobj()
+            for start in range(0, len(payload), _STREAM_CHUNK_SIZE):
+                yield decompressor.decompress(
+                    payload[start : start + _STREAM_CHUNK_SIZE]
+                )
+            yield decompressor.flush()
+            return
+    except _DECOMPRESSION_ERRORS as e:
+        raise ValueError(f"Entrada do cache corrompida: {e}")
+
+    raise ValueError(f"Compressão desconhecida: {compression!r}")
+
+
+@dataclass
+class CacheEntry:
+    """
+    Entrada do cache ainda por desserializar: os dados ('payload') continuam
+    serializados e comprimidos como foram gravados.
+    """
+
+    serializer: bytes
+    compression: bytes
+    fresh_until: float | None
+    payload: bytes
+
+    @property
+    def is_stale(self) -> bool:
+        """Indica se os dados passaram do instante 'fresh_until'."""
+        return self.fresh_until is not None and time.time() > self.fresh_until
+
+    def should_refresh_early(self, recompute_time: float, beta: float = 1.0) -> bool:
+        """
+        Expiração antecipada probabilística (XFetch): a probabilidade de
+        atualizar os dados antes de 'fresh_until' cresce à medida que ele se
+        aproxima, tanto mais cedo quanto mais demorada for a recomputação.
+        Assim, os pedidos simultâneos raramente encontram o cache expirado.
+
+        Args:
+            recompute_time (float): Duração estimada, em segundos, da atualização.
+            beta (float): Fator de antecipação (> 1 antecipa mais).
+        """
+        if self.fresh_until is None:
+            return False
+        # 1 - random() está em (0, 1]: o logaritmo é sempre finito e <= 0
+        early_by = -recompute_time * beta * math.log(1.0 - random.random())
+        return time.time() + early_by >= self.fresh_until
+
+    def json_bytes(self) -> bytes:
+        """Os dados em JSON (descomprimidos, mas sem desserializar)."""
+        return _decompress(self.compression, self.payload)
+
+    def decode(self) -> Any:
+        """Os dados desserializados."""
+        return _deserialize(self.json_bytes())
+
+    def iter_items(self) -> Iterator[bytes]:
+        """
+        O JSON de cada elemento de uma lista, descomprimido aos poucos.
+
+        Listas gravadas com 'item_per_line' são lidas linha a linha, sem nunca
+        ter a lista inteira em memória; as restantes são desserializadas.
+
+        Raises:
+            ValueError: Se a entrada não puder ser lida (possivelmente depois
+            de alguns elementos).
+        """
+        chunks = _iter_decompressed(self.compression, self.payload)
+        buffer = b""
+        for chunk in chunks:
+            buffer += chunk
+            if len(buffer) >= len(_ITEM_PER_LINE_START):
+                break
+
+        if not buffer.startswith(_ITEM_PER_LINE_START):
+            for item in self.decode():
+                yield _serialize(item)[1]
+            return
+
+        buffer = buffer[len(_ITEM_PER_LINE_START) :]
+        while True:
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                yield line[:-1] if line.endswith(b",") else line
+            next_chunk = next(chunks, None)
+            if next_chunk is None:
+                break
+            buffer += next_chunk
+
+        if buffer != b"]":
+            raise ValueError("Entrada do cache truncada.")
+
+
+def encode_entry(
+    data: Any, fresh_until: float | None = None, item_per_line: bool = False
+) -> bytes:
+    """
+    Serializa (orjson, ou json sem ele) e comprime (zstd, ou zlib sem ele) os
+    dados, precedidos do cabeçalho do formato.
+
+    Args:
+        data: Os dados a guardar (serializáveis em JSON).
+        fresh_until (float | None): Instante até ao qual os dados são atuais,
+            para o cache com stale-while-revalidate (opcional).
+        item_per_line (bool): Se os dados forem uma lista, grava cada elemento
+            numa linha (continua a ser JSON válido), para que possam ser
+            transmitidos um a um com 'CacheEntry.iter_items'.
+    """
+    if item_per_line and isinstance(data, list):
+        serializer, serialized = _serialize_items(data)
+    else:
+        serializer, serialized = _serialize(data)
+    compression, payload = _compress(serialized)
+    header = _HEADER.pack(MAGIC, serializer, compression, fresh_until or 0.0)
+    return header + payload
+
+
+def parse_entry(raw: bytes | str) -> CacheEntry:
+    """
+    Lê o cabeçalho de uma entrada do cache, sem desserializar os dados.
+
+    Entradas antigas (JSON simples, com ou sem o envelope {"fresh_until",
+    "data"}) continuam a ser lidas.
+
+    Raises:
+        ValueError: Se a entrada não puder ser lida.
+    """
+    if isinstance(raw, str):
+        raw = raw.encode()
+
+    if raw.startswith(MAGIC):
+        _, serializer, compression, fresh_until = _HEADER.unpack_from(raw)
+        return CacheEntry(
+            serializer=serializer,
+            compression=compression,
+            fresh_until=fresh_until or None,
+            payload=raw[_HEADER.size :],
+        )
+
+    legacy = json.loads(raw)
+    fresh_until = None
+    if isinstance(legacy, dict) and {"fresh_until", "data"} <= legacy.keys():
+        fresh_until = legacy["fresh_until"]
+        raw = json.dumps(legacy["data"]).encode()
+
+    return CacheEntry(
+        serializer=SERIALIZER_JSON,
+        compression=COMPRESSION_NONE,
+        fresh_until=fresh_until,
+        payload=raw,
+    )
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.infrastructure.cache.async_redis_cache_service import (
+    AsyncRedisClient,
+    get_async_redis_client,
+)
+from app.infrastructure.cache.codec import CacheEntry
+from app.infrastructure.cache.lru_cache import TTLLRUCache
+
+logger = logging.getLogger(__name__)
+
+# Canal em que são publicadas as chaves que ganharam um novo valor
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Espera máxima por uma mensagem antes de verificar de novo a subscrição
+_LISTENER_POLL_TIMEOUT = 1.0
+_LISTENER_RETRY_INTERVAL = 5.0
+
+
+class HotCache:
+    """
+    Nível em memória do processo à frente do Redis para chaves muito lidas e
+    raramente atualizadas (hotspots, ocorrências por cidade).
+
+    As entradas são guardadas como vêm do Redis (CacheEntry, ainda serializadas
+    e comprimidas): um acerto não faz nenhuma chamada de rede nem
+    desserialização, e a resposta continua a poder ser enviada tal como está.
+
+    Quem grava um novo valor publica a chave em INVALIDATION_CHANNEL e cada
+    processo remove-a do seu nível ('run_invalidation_listener'). O tempo de
+    vida local limita o atraso se uma mensagem se perder.
+    """
+
+    def __init__(self, redis_client: AsyncRedisClient, local_cache: TTLLRUCache):
+        self._redis_client = redis_client
+        self._local_cache = local_cache
+        # Incrementado a cada invalidação: uma leitura do Redis que a
+        # atravessou pode trazer o valor antigo e não é guardada
+        self._generation = 0
+
+    async def get_entry(self, key: str) -> CacheEntry | None:
+        """
+        Obtém a entrada da chave, do nível local ou do Redis.
+        """
+        entry: CacheEntry | None = self._local_cache.get(key)
+        if entry is not None:
+            return entry
+
+        generation = self._generation
+        entry = await self._redis_client.get_cache_entry(key)
+        if entry is not None and generation == self._generation:
+            self._local_cache.set(key, entry)
+        return entry
+
+    async def get_entries(self, keys: list[str]) -> list[CacheEntry | None]:
+        """
+        Obtém as entradas de várias chaves: as que não estão no nível local
+        são lidas do Redis numa única ida (MGET).
+        """
+        entries = [self._local_cache.get(key) for key in keys]
+        missing = [i for i, entry in enumerate(entries) if entry is None]
+        if not missing:
+            return entries
+
+        generation = self._generation
+        fetched = await self._redis_client.get_cache_entries([keys[i] for i in missing])
+        for i, entry in zip(missing, fetched):
+            entries[i] = entry
+            if entry is not None and generation == self._generation:
+                self._local_cache.set(keys[i], entry)
+        return entries
+
+    def invalidate(self, key: str):
+        """
+        Remove a chave do nível local deste processo.
+        """
+        self._generation += 1
+        self._local_cache.delete(key)
+
+    async def publish_invalidation(self, key: str):
+        """
+        Avisa todos os processos (incluindo este) de que a chave mudou.
+        """
+        self.invalidate(key)
+        await self._redis_client.publish_message(INVALIDATION_CHANNEL, key)
+
+    async def run_invalidation_listener(self):
+        """
+        Remove do nível local as chaves publicadas em INVALIDATION_CHANNEL.
+        Corre até ser cancelada, restabelecendo a subscrição se o Redis cair.
+        """
+        while True:
+            pubsub = self._redis_client.r.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # As mensagens publicadas sem subscrição ativa perderam-se
+                self._generation += 1
+                self._local_cache.clear()
+
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=_LISTENER_POLL_TIMEOUT,
+                    )
+                    if message is not None:
+                        self.invalidate(message["data"].decode())
+            except RedisError as e:
+                logger.warning(f"Subscrição de invalidação do cache perdida: {e}")
+                await asyncio.sleep(_LISTENER_RETRY_INTERVAL)
+            finally:
+                await pubsub.aclose()
+
+
+# Variável global para armazenar a única instância do nível em memória
+_hot_cache_instance: HotCache | None = None
+
+
+def get_hot_cache() -> HotCache:
+    """
+    Função de dependência do FastAPI para fornecer uma única instância
+    (Singleton) do HotCache por processo.
+    """
+    global _hot_cache_instance
+
+    if _hot_cache_instance is None:
+        _hot_cache_instance = HotCache(
+            redis_client=get_async_redis_client(),
+            local_cache=TTLLRUCache(
+                max_entries=settings.HOT_CACHE_MAX_ENTRIES,
+                ttl=settings.HOT_CACHE_TTL,
+            ),
+        )
+
+    return _hot_cache_instance
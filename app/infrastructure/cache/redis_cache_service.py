@@ -1,16 +1,28 @@
-import json
+import time
+import uuid
 from typing import Any
 
 import redis
+from redis.typing import EncodableT, FieldT
 
 # Assumindo que 'app.core.config.settings' é um módulo acessível com as configurações
 from app.config import settings
+from app.infrastructure.cache.codec import encode_entry
+
+# Remove o lock de forma atómica apenas se o valor ainda for o do dono
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
 
 
 class RedisClient:
     """
     Cliente para gerir a conexão e as operações síncronas com o Redis.
-    Encapsula as funcionalidades básicas (set, get) e a lógica de cache (JSON).
+    Usado pelo worker: operações básicas (set, get), locks, pub/sub e a
+    escrita do cache com stale-while-revalidate.
     """
 
     def __init__(self):
@@ -22,7 +34,8 @@ class RedisClient:
                 host=settings.REDIS_HOST,
                 port=settings.REDIS_PORT,
                 db=settings.REDIS_DB,
-                decode_responses=True,
+                # Os valores são bytes (ver codec.py)
+                decode_responses=False,
             )
             self.r.ping()
             print("Conexão com Redis estabelecida com sucesso!")
@@ -51,12 +64,12 @@ class RedisClient:
             print(f"Erro ao salvar dados no Redis para a chave '{key}': {e}")
             return False
 
-    def get_data(self, key: str) -> str | None:
+    def get_data(self, key: str) -> bytes | str | None:
         """
         Obtém dados guardados no Redis.
 
         :param key: A chave para obter os dados.
-        :return: O valor como string, ou None se a chave não existir ou em caso de erro.
+        :return: O valor em bytes, ou None se a chave não existir ou em caso de erro.
         """
         if not self.r:
             return None
@@ -67,48 +80,120 @@ class RedisClient:
             print(f"Erro ao obter dados do Redis para a chave '{key}': {e}")
             return None
 
-    # --- Lógica de Cache (JSON) para Estruturas Mais Complexas ---
+    def publish_message(self, channel: str, message: str) -> bool:
+        """
+        Publica uma mensagem num canal de pub/sub do Redis.
 
-    def get_json_cache(self, key: str) -> dict[str, Any] | None:
+        :param channel: O canal.
+        :param message: A mensagem.
+        :return: True se a operação for bem-sucedida, False caso contrário.
         """
-        Obtém e desserializa dados JSON do Redis.
+        if not self.r:
+            return False
+        try:
+            self.r.publish(channel, message)
+            return True
+        except redis.exceptions.RedisError as e:
+            print(f"Erro ao publicar no canal '{channel}' do Redis: {e}")
+            return False
 
-        :param key: A chave do cache.
-        :return: Um dicionário (dict) se o cache existir e for válido, ou None.
+    # --- Lock Distribuído ---
+
+    def acquire_lock(self, key: str, ttl_ms: int) -> str | None:
         """
-        cached_str = self.get_data(key)  # Reutiliza o método síncrono 'get_data'
-        if cached_str is None:
-            return None
+        Tenta adquirir um lock distribuído (SET NX PX), partilhado entre processos.
 
+        :param key: A chave do lock.
+        :param ttl_ms: Tempo máximo, em milissegundos, que o lock pode ficar retido.
+        :return: O identificador do dono do lock, ou None se já estiver retido.
+        """
+        if not self.r:
+            return None
+        owner = uuid.uuid4().hex
         try:
-            # 2. Boa Prática: Tratamento de erro na desserialização JSON
-            return json.loads(cached_str)
-        except json.JSONDecodeError as e:
-            print(
-                f"Erro ao desserializar JSON para a chave '{key}': {e}. Valor: {cached_str}"
-            )
+            if self.r.set(key, owner, nx=True, px=ttl_ms):
+                return owner
             return None
+        except redis.exceptions.RedisError as e:
+            print(f"Erro ao adquirir o lock '{key}' no Redis: {e}")
+            return None
+
+    def release_lock(self, key: str, owner: str) -> bool:
+        """
+        Liberta o lock apenas se ainda pertencer a quem o adquiriu.
+
+        :param key: A chave do lock.
+        :param owner: O identificador devolvido por 'acquire_lock'.
+        :return: True se o lock foi libertado, False caso contrário.
+        """
+        if not self.r:
+            return False
+        try:
+            return bool(self.r.eval(_RELEASE_LOCK_SCRIPT, 1, key, owner))
+        except redis.exceptions.RedisError as e:
+            print(f"Erro ao libertar o lock '{key}' no Redis: {e}")
+            return False
+
+    # --- Cache com Stale-While-Revalidate ---
 
-    def set_json_cache(
-        self, key: str, data: dict[str, Any], expire: int = 3600
+    def set_swr_cache(
+        self, key: str, data: Any, fresh_for: int, stale_for: int
     ) -> bool:
         """
-        Serializa e salva um dicionário (dict) como JSON no Redis.
+        Serializa e salva dados que são atuais durante 'fresh_for' segundos e que,
+        depois disso, ainda podem ser servidos durante 'stale_for' segundos
+        enquanto são atualizados.
 
         :param key: A chave do cache.
-        :param data: O dicionário de dados a ser guardado.
-        :param expire: Tempo de expiração em segundos (padrão: 3600s = 1 hora).
+        :param data: Os dados a serem guardados.
+        :param fresh_for: Segundos durante os quais os dados são atuais.
+        :param stale_for: Segundos adicionais durante os quais podem ser servidos.
         :return: True se a operação for bem-sucedida, False caso contrário.
         """
         try:
-            # 3. Boa Prática: Serialização para JSON antes de salvar
-            json_data = json.dumps(data)
-            return self.set_data(
-                key, json_data, expire=expire
-            )  # Reutiliza o método síncrono 'set_data'
-        except TypeError as e:
-            # Tratamento de erro caso o objeto não seja serializável
-            print(f"Erro ao serializar dados para JSON para a chave '{key}': {e}")
+            encoded = encode_entry(data, fresh_until=time.time() + fresh_for)
+        except (TypeError, ValueError) as e:
+            print(f"Erro ao serializar os dados da chave '{key}': {e}")
+            return False
+        return self.set_data(key, encoded, expire=fresh_for + stale_for)
+
+    def set_swr_hash_cache(
+        self, key: str, entries: dict[str, Any], fresh_for: int, stale_for: int
+    ) -> bool:
+        """
+        Substitui, de forma atómica, um hash cujos campos são guardados como em
+        'set_swr_cache' (um valor serializado e comprimido por campo).
+
+        :param key: A chave do hash.
+        :param entries: Os dados de cada campo.
+        :param fresh_for: Segundos durante os quais os dados são atuais.
+        :param stale_for: Segundos adicionais durante os quais podem ser servidos.
+        :return: True se a operação for bem-sucedida, False caso contrário.
+        """
+        if not self.r:
+            return False
+
+        fresh_until = time.time() + fresh_for
+        try:
+            encoded: dict[FieldT, EncodableT] = {
+                field: encode_entry(data, fresh_until=fresh_until)
+                for field, data in entries.items()
+            }
+        except (TypeError, ValueError) as e:
+            print(f"Erro ao serializar os dados da chave '{key}': {e}")
+            return False
+
+        try:
+            # MULTI/EXEC: os leitores nunca veem o hash meio substituído
+            with self.r.pipeline() as pipeline:
+                pipeline.delete(key)
+                if encoded:
+                    pipeline.hset(key, mapping=encoded)
+                    pipeline.expire(key, fresh_for + stale_for)
+                pipeline.execute()
+            return True
+        except redis.exceptions.RedisError as e:
+            print(f"Erro ao salvar o hash '{key}' no Redis: {e}")
             return False
 
 
@@ -118,13 +203,16 @@ _redis_client_instance = None
 
 def get_redis_client() -> RedisClient:
     """
-    Função de dependência do FastAPI para fornecer uma única instância (Singleton)
-    do RedisClient síncrono.
+    Fornece uma única instância (Singleton) do RedisClient síncrono, usado pelo
+    worker do Celery. A API usa o AsyncRedisClient ('get_async_redis_client').
+
+    Se a conexão falhou, uma nova tentativa é feita na chamada seguinte, em vez
+    de a instância sem conexão ficar guardada para sempre.
     """
     global _redis_client_instance
 
-    # Se a instância ainda não foi criada, crie-a
-    if _redis_client_instance is None:
+    # Se a instância ainda não foi criada (ou ficou sem conexão), crie-a
+    if _redis_client_instance is None or _redis_client_instance.r is None:
         _redis_client_instance = RedisClient()
 
     # Verifica se a conexão falhou durante a inicialização
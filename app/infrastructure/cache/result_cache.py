@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.config import settings
+from app.infrastructure.cache.async_redis_cache_service import (
+    AsyncRedisClient,
+    get_async_redis_client,
+)
+from app.infrastructure.cache.lru_cache import TTLLRUCache
+from app.infrastructure.resilience.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Intervalo entre verificações enquanto outro processo obtém o mesmo valor
+_LOAD_POLL_INTERVAL = 0.05
+
+
+class ResultCache:
+    """
+    Cache em dois níveis para respostas de serviços externos: um LRU em memória
+    do processo à frente do Redis (partilhado entre processos).
+
+    Em 'get_or_load' e 'load', pedidos iguais e simultâneos fazem uma única
+    chamada ao serviço: dentro do processo pelo 'single_flight' e entre os
+    workers por um lock no Redis.
+
+    Os acertos e falhas de cada nível são contados no processo ('stats') e
+    somados periodicamente ao hash 'cache:metrics:<nome>' do Redis
+    ('flush_metrics'), para que um acerto local não custe uma ida à rede.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: int,
+        local_cache: TTLLRUCache,
+        redis_client: AsyncRedisClient | None = None,
+        single_flight: SingleFlight | None = None,
+    ):
+        self.name = name
+        self._ttl = ttl
+        self._local_cache = local_cache
+        self._redis_client = redis_client
+        self.single_flight = single_flight or SingleFlight()
+        self.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "coalesced": 0}
+        # Contagens ainda não somadas no Redis
+        self._unflushed: dict[str, int] = {}
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    def _count(self, outcome: str):
+        self.stats[outcome] += 1
+        self._unflushed[outcome] = self._unflushed.get(outcome, 0) + 1
+
+    async def flush_metrics(self):
+        """
+        Soma no Redis as contagens acumuladas desde a última chamada.
+        """
+        if self._redis_client is None or not self._unflushed:
+            return
+
+        amounts, self._unflushed = self._unflushed, {}
+        if not await self._redis_client.increment_counters(
+            f"cache:metrics:{self.name}", amounts
+        ):
+            # Ficam para a próxima tentativa
+            for outcome, amount in amounts.items():
+                self._unflushed[outcome] = self._unflushed.get(outcome, 0) + amount
+
+    async def _read_redis(self, key: str) -> Any | None:
+        if self._redis_client is None:
+            return None
+        value = await self._redis_client.get_json_cache(self._redis_key(key))
+        if value is None:
+            return None
+        self._local_cache.set(key, value)
+        return value
+
+    async def get(self, key: str) -> Any | None:
+        """
+        Obtém o valor guardado da chave, ou None se não estiver em nenhum nível.
+        """
+        value = self._local_cache.get(key)
+        if value is not None:
+            self._count("local_hits")
+            return value
+
+        value = await self._read_redis(key)
+        if value is not None:
+            self._count("redis_hits")
+            return value
+
+        self._count("misses")
+        return None
+
+    async def set(self, key: str, value: Any):
+        """
+        Guarda o valor (serializável em JSON) nos dois níveis.
+        """
+        self._local_cache.set(key, value)
+        if self._redis_client is not None:
+            await self._redis_client.set_json_cache(
+                self._redis_key(key), value, expire=self._ttl
+            )
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Obtém o valor da chave do cache ou, na falta dele, de 'loader'.
+
+        Args:
+            key (str): A chave (já normalizada) do cache.
+            loader: Função que obtém o valor no serviço externo.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        return await self.load(key, loader)
+
+    async def load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Obtém o valor da chave de 'loader' e guarda-o, com uma única chamada
+        por chave entre os pedidos simultâneos de todos os processos.
+        """
+        return await self.single_flight.run(key, lambda: self._load(key, loader))
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        owner = None
+        lock_key = f"{self._redis_key(key)}:lock"
+
+        if self._redis_client is not None:
+            lock_ttl_ms = int(settings.RESULT_CACHE_LOCK_TIMEOUT * 1000)
+            owner = await self._redis_client.acquire_lock(lock_key, lock_ttl_ms)
+
+            if owner is None:
+                # Outro processo está a obter o valor: aguarda que o publique
+                deadline = time.monotonic() + settings.RESULT_CACHE_LOCK_TIMEOUT
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(_LOAD_POLL_INTERVAL)
+                    value = await self._read_redis(key)
+                    if value is not None:
+                        self._count("coalesced")
+                        return value
+
+        try:
+            value = await loader()
+            await self.set(key, value)
+            return value
+        finally:
+            if owner is not None and self._redis_client is not None:
+                await self._redis_client.release_lock(lock_key, owner)
+
+
+# Caches por nome, partilhados pelos pedidos do processo
+_result_caches: dict[str, ResultCache] = {}
+
+
+async def run_metrics_flush():
+    """
+    Soma no Redis, a cada RESULT_CACHE_METRICS_FLUSH_INTERVAL segundos, as
+    contagens de todos os caches do processo. Corre até ser cancelada, e as
+    contagens pendentes são enviadas nesse momento.
+    """
+    try:
+        while True:
+            await asyncio.sleep(settings.RESULT_CACHE_METRICS_FLUSH_INTERVAL)
+            for cache in list(_result_caches.values()):
+                await cache.flush_metrics()
+    finally:
+        for cache in list(_result_caches.values()):
+            await cache.flush_metrics()
+
+
+def get_result_cache(name: str, ttl: int, prefix_window: float = 0.0) -> ResultCache:
+    """
+    Obtém o cache de respostas com o nome dado (um por processo), criando-o se
+    necessário.
+
+    Args:
+        name (str): Nome do cache (prefixo das chaves no Redis).
+        ttl (int): Tempo de expiração, em segundos, no Redis.
+        prefix_window (float): Segundos durante os quais um resultado concluído
+            pode servir buscas que o estendem (ver SingleFlight.find_prefix).
+    """
+    cache = _result_caches.get(name)
+    if cache is None:
+        cache = ResultCache(
+            name=name,
+            ttl=ttl,
+            local_cache=TTLLRUCache(
+                max_entries=settings.LOCAL_CACHE_MAX_ENTRIES,
+                ttl=min(settings.LOCAL_CACHE_TTL, ttl),
+            ),
+            redis_client=get_async_redis_client(),
+            single_flight=SingleFlight(recent_window=prefix_window),
+        )
+        _result_caches[name] = cache
+    return cache
@@ -0,0 +1,97 @@
+import numpy as np
+from sklearn.cluster import DBSCAN, HDBSCAN
+
+from app.core.interfaces.clustering_engine import ClusteringEngine
+from app.core.utils.geo import EARTH_RADIUS_KM, project_equirectangular
+
+
+class HaversineDBSCANEngine(ClusteringEngine):
+    """
+    DBSCAN com a distância haversine sobre uma ball tree: exato em qualquer
+    escala, mas o mais lento dos motores.
+    """
+
+    def __init__(self, epsilon_km: float, min_samples: int):
+        self.epsilon_km = epsilon_km
+        self.min_samples = min_samples
+
+    def fit_predict(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        coords_radians = np.radians(np.column_stack((latitudes, longitudes)))
+        labels: np.ndarray = DBSCAN(
+            eps=self.epsilon_km / EARTH_RADIUS_KM,
+            min_samples=self.min_samples,
+            algorithm="ball_tree",
+            metric="haversine",
+        ).fit_predict(coords_radians)
+        return labels
+
+
+class ProjectedDBSCANEngine(ClusteringEngine):
+    """
+    DBSCAN com distância euclidiana sobre uma KD-tree, depois de projetar as
+    coordenadas no plano. Os mesmos parâmetros do haversine, com resultados
+    praticamente iguais dentro de uma cidade e em bem menos tempo.
+    """
+
+    def __init__(self, epsilon_km: float, min_samples: int):
+        self.epsilon_km = epsilon_km
+        self.min_samples = min_samples
+
+    def fit_predict(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        labels: np.ndarray = DBSCAN(
+            eps=self.epsilon_km,
+            min_samples=self.min_samples,
+            algorithm="kd_tree",
+        ).fit_predict(project_equirectangular(latitudes, longitudes))
+        return labels
+
+
+class HDBSCANEngine(ClusteringEngine):
+    """
+    HDBSCAN sobre as coordenadas projetadas: encontra grupos de densidades
+    diferentes sem um raio fixo, pelo que só o tamanho mínimo do grupo precisa
+    de ser ajustado por cidade.
+    """
+
+    def __init__(self, min_cluster_size: int):
+        self.min_cluster_size = min_cluster_size
+
+    def fit_predict(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        # O HDBSCAN precisa de pelo menos dois pontos
+        if len(latitudes) < 2:
+            return np.full(len(latitudes), -1)
+        labels: np.ndarray = HDBSCAN(
+            min_cluster_size=max(self.min_cluster_size, 2),
+            algorithm="kd_tree",
+            copy=False,
+        ).fit_predict(project_equirectangular(latitudes, longitudes))
+        return labels
+
+
+CLUSTERING_ENGINES = ("haversine_dbscan", "projected_dbscan", "hdbscan")
+
+
+def create_clustering_engine(
+    name: str, epsilon_km: float, min_samples: int
+) -> ClusteringEngine:
+    """
+    Cria o motor de agrupamento com o nome dado (ver CLUSTERING_ENGINES).
+
+    Args:
+        name (str): Nome do motor.
+        epsilon_km (float): Raio da vizinhança, em km (ignorado pelo HDBSCAN).
+        min_samples (int): Número mínimo de ocorrências de um grupo.
+
+    Raises:
+        ValueError: Se o nome não corresponder a nenhum motor.
+    """
+    if name == "haversine_dbscan":
+        return HaversineDBSCANEngine(epsilon_km=epsilon_km, min_samples=min_samples)
+    if name == "projected_dbscan":
+        return ProjectedDBSCANEngine(epsilon_km=epsilon_km, min_samples=min_samples)
+    if name == "hdbscan":
+        return HDBSCANEngine(min_cluster_size=min_samples)
+    raise ValueError(
+        f"Motor de agrupamento desconhecido: '{name}'. "
+        f"Opções: {', '.join(CLUSTERING_ENGINES)}."
+    )
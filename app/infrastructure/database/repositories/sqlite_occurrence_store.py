@@ -0,0 +1,152 @@
+import json
+import os
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS occurrences (
+    id TEXT PRIMARY KEY,
+    city_key TEXT NOT NULL,
+    occurred_on TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_occurrences_city_date
+    ON occurrences (city_key, occurred_on);
+CREATE TABLE IF NOT EXISTS sync_watermarks (
+    city_key TEXT PRIMARY KEY,
+    window_start TEXT NOT NULL,
+    synced_until TEXT NOT NULL
+);
+"""
+
+
+def _occurred_on(occurrence: dict) -> str:
+    """Data (AAAA-MM-DD) da ocorrência, a partir do campo 'date' da API."""
+    return str(occurrence["date"])[:10]
+
+
+class SQLiteOccurrenceStore:
+    """
+    Armazenamento local (SQLite) das ocorrências já sincronizadas com a API do
+    CrossFire, por cidade, com a marca de até onde cada cidade foi sincronizada.
+
+    Permite ao worker buscar apenas as ocorrências novas desde a última
+    execução em vez de descarregar a janela inteira todos os dias.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get_sync_start(
+        self, city_key: str, window_start: str, overlap_days: int
+    ) -> str:
+        """
+        Calcula a data a partir da qual a cidade precisa ser sincronizada.
+
+        Se a cidade já foi sincronizada cobrindo o início da janela, devolve a
+        última data sincronizada menos 'overlap_days' (para apanhar ocorrências
+        editadas depois de publicadas); caso contrário, o início da janela.
+
+        Args:
+            city_key (str): Identificador da cidade no armazenamento.
+            window_start (str): Início (AAAA-MM-DD) da janela de análise.
+            overlap_days (int): Dias já sincronizados a buscar novamente.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT window_start, synced_until FROM sync_watermarks"
+                " WHERE city_key = ?",
+                (city_key,),
+            ).fetchone()
+
+        if row is None or row[0] > window_start:
+            return window_start
+
+        synced_until = date.fromisoformat(row[1])
+        sync_start = (synced_until - timedelta(days=overlap_days)).isoformat()
+        return max(sync_start, window_start)
+
+    def sync(
+        self,
+        city_key: str,
+        window_start: str,
+        window_end: str,
+        sync_start: str,
+        occurrences: list[dict],
+    ):
+        """
+        Grava numa única transação o resultado de uma sincronização.
+
+        As ocorrências entre 'sync_start' e 'window_end' são substituídas pelas
+        buscadas (o que também remove as que deixaram de existir na API), as
+        anteriores a 'window_start' são descartadas e a marca de sincronização
+        da cidade é atualizada.
+
+        Args:
+            city_key (str): Identificador da cidade no armazenamento.
+            window_start (str): Início (AAAA-MM-DD) da janela de análise.
+            window_end (str): Fim (AAAA-MM-DD) da janela de análise.
+            sync_start (str): Data a partir da qual as ocorrências foram buscadas.
+            occurrences (list[dict]): Ocorrências buscadas na API.
+        """
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM occurrences"
+                " WHERE city_key = ? AND occurred_on BETWEEN ? AND ?",
+                (city_key, sync_start, window_end),
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO occurrences"
+                " (id, city_key, occurred_on, payload) VALUES (?, ?, ?, ?)",
+                (
+                    (
+                        str(occurrence["id"]),
+                        city_key,
+                        _occurred_on(occurrence),
+                        json.dumps(occurrence),
+                    )
+                    for occurrence in occurrences
+                ),
+            )
+            connection.execute(
+                "DELETE FROM occurrences WHERE city_key = ? AND occurred_on < ?",
+                (city_key, window_start),
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO sync_watermarks"
+                " (city_key, window_start, synced_until) VALUES (?, ?, ?)",
+                (city_key, window_start, window_end),
+            )
+
+    def get_occurrences(
+        self, city_key: str, initial_date: str, final_date: str
+    ) -> list[dict]:
+        """
+        Obtém as ocorrências armazenadas da cidade entre duas datas (inclusive).
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT payload FROM occurrences"
+                " WHERE city_key = ? AND occurred_on BETWEEN ? AND ?"
+                " ORDER BY occurred_on",
+                (city_key, initial_date, final_date),
+            ).fetchall()
+
+        return [json.loads(payload) for (payload,) in rows]
@@ -0,0 +1,214 @@
+import json
+import logging
+import math
+import os
+from collections import defaultdict
+
+import numpy as np
+
+from app.config import settings
+from app.core.utils.geo import polygon_contains
+
+logger = logging.getLogger(__name__)
+
+# Nome dos estados pela sigla da UF, no formato usado pelo Google e pelo CrossFire
+STATE_NAMES = {
+    "AC": "Acre",
+    "AL": "Alagoas",
+    "AP": "Amapá",
+    "AM": "Amazonas",
+    "BA": "Bahia",
+    "CE": "Ceará",
+    "DF": "Distrito Federal",
+    "ES": "Espírito Santo",
+    "GO": "Goiás",
+    "MA": "Maranhão",
+    "MT": "Mato Grosso",
+    "MS": "Mato Grosso do Sul",
+    "MG": "Minas Gerais",
+    "PA": "Pará",
+    "PB": "Paraíba",
+    "PR": "Paraná",
+    "PE": "Pernambuco",
+    "PI": "Piauí",
+    "RJ": "Rio de Janeiro",
+    "RN": "Rio Grande do Norte",
+    "RS": "Rio Grande do Sul",
+    "RO": "Rondônia",
+    "RR": "Roraima",
+    "SC": "Santa Catarina",
+    "SP": "São Paulo",
+    "SE": "Sergipe",
+    "TO": "Tocantins",
+}
+
+
+def _read_polygons(geometry: dict) -> list[list[np.ndarray]]:
+    """
+    Converte uma geometria GeoJSON (Polygon ou MultiPolygon) numa lista de
+    polígonos, cada um com os seus anéis em arrays (N, 2).
+    """
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        return []
+
+    return [
+        [np.asarray(ring, dtype=np.float64)[:, :2] for ring in polygon]
+        for polygon in polygons
+    ]
+
+
+class MunicipalityResolver:
+    """
+    Resolve a cidade e o estado de uma coordenada sem consultar serviços
+    externos, a partir dos limites dos municípios carregados em memória.
+
+    Os municípios ficam num índice em grade (células de
+    MUNICIPALITY_GRID_CELL_SIZE graus): a consulta testa apenas os polígonos
+    da célula do ponto cujo retângulo envolvente o contém.
+    """
+
+    def __init__(self, cell_size: float):
+        self._cell_size = cell_size
+        self._names: list[tuple[str, str]] = []
+        self._polygons: list[list[np.ndarray]] = []
+        self._bounds = np.empty((0, 4), dtype=np.float64)
+        self._grid: dict[tuple[int, int], np.ndarray] = {}
+
+    @property
+    def is_loaded(self) -> bool:
+        return bool(self._names)
+
+    def _cell(self, longitude: float, latitude: float) -> tuple[int, int]:
+        return (
+            math.floor(longitude / self._cell_size),
+            math.floor(latitude / self._cell_size),
+        )
+
+    def load(self, path: str, name_property: str, state_property: str):
+        """
+        Carrega os municípios de um arquivo GeoJSON (FeatureCollection).
+
+        A propriedade do estado pode conter a sigla da UF ou o nome completo.
+
+        Args:
+            path (str): Caminho do arquivo GeoJSON.
+            name_property (str): Propriedade com o nome do município.
+            state_property (str): Propriedade com o estado do município.
+        """
+        with open(path, encoding="utf-8") as file:
+            collection = json.load(file)
+
+        names = []
+        polygons = []
+        bounds = []
+        for feature in collection["features"]:
+            properties = feature.get("properties") or {}
+            city = properties.get(name_property)
+            state = properties.get(state_property)
+            if not city or not state or not feature.get("geometry"):
+                continue
+
+            for polygon in _read_polygons(feature["geometry"]):
+                exterior = polygon[0]
+                names.append((city, STATE_NAMES.get(str(state).upper(), state)))
+                polygons.append(polygon)
+                bounds.append(
+                    (
+                        exterior[:, 0].min(),
+                        exterior[:, 1].min(),
+                        exterior[:, 0].max(),
+                        exterior[:, 1].max(),
+                    )
+                )
+
+        grid: dict[tuple[int, int], list[int]] = defaultdict(list)
+        for index, (min_x, min_y, max_x, max_y) in enumerate(bounds):
+            min_cell_x, min_cell_y = self._cell(min_x, min_y)
+            max_cell_x, max_cell_y = self._cell(max_x, max_y)
+            for cell_x in range(min_cell_x, max_cell_x + 1):
+                for cell_y in range(min_cell_y, max_cell_y + 1):
+                    grid[(cell_x, cell_y)].append(index)
+
+        self._names = names
+        self._polygons = polygons
+        self._bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        self._grid = {
+            cell: np.asarray(indexes, dtype=np.int64) for cell, indexes in grid.items()
+        }
+        logger.info(
+            f"Limites municipais carregados: {len(set(names))} municípios, "
+            f"{len(self._grid)} células."
+        )
+
+    def resolve(self, latitude: float, longitude: float) -> tuple[str, str] | None:
+        """
+        Obtém a cidade e o estado que contêm a coordenada.
+
+        Returns:
+            tuple[str, str] | None: (cidade, estado), ou None se a coordenada não
+            estiver dentro de nenhum município carregado.
+        """
+        candidates = self._grid.get(self._cell(longitude, latitude))
+        if candidates is None:
+            return None
+
+        bounds = self._bounds[candidates]
+        candidates = candidates[
+            (bounds[:, 0] <= longitude)
+            & (longitude <= bounds[:, 2])
+            & (bounds[:, 1] <= latitude)
+            & (latitude <= bounds[:, 3])
+        ]
+
+        for index in candidates:
+            if polygon_contains(self._polygons[index], longitude, latitude):
+                return self._names[int(index)]
+
+        return None
+
+
+# Variável global para armazenar a única instância do resolvedor
+_municipality_resolver_instance: MunicipalityResolver | None = None
+
+
+def get_municipality_resolver() -> MunicipalityResolver:
+    """
+    Função de dependência do FastAPI para fornecer uma única instância
+    (Singleton) do resolvedor de municípios, carregada uma vez por processo.
+
+    Se o arquivo de limites não existir (ou não tiver municípios), o resolvedor
+    fica vazio e a cidade passa a ser obtida apenas pelo Google, a menos que
+    MUNICIPALITY_BOUNDARIES_REQUIRED esteja ativo.
+
+    Raises:
+        RuntimeError: Se os limites forem obrigatórios e não forem carregados.
+    """
+    global _municipality_resolver_instance
+
+    if _municipality_resolver_instance is None:
+        resolver = MunicipalityResolver(cell_size=settings.MUNICIPALITY_GRID_CELL_SIZE)
+        path = settings.MUNICIPALITY_BOUNDARIES_PATH
+        if os.path.exists(path):
+            resolver.load(
+                path,
+                name_property=settings.MUNICIPALITY_NAME_PROPERTY,
+                state_property=settings.MUNICIPALITY_STATE_PROPERTY,
+            )
+
+        if not resolver.is_loaded:
+            message = (
+                f"Limites municipais não encontrados em '{path}' (ou sem "
+                f"municípios com as propriedades "
+                f"'{settings.MUNICIPALITY_NAME_PROPERTY}' e "
+                f"'{settings.MUNICIPALITY_STATE_PROPERTY}')"
+            )
+            if settings.MUNICIPALITY_BOUNDARIES_REQUIRED:
+                raise RuntimeError(f"{message}.")
+            logger.warning(f"{message}; a cidade será obtida pelo Google.")
+        _municipality_resolver_instance = resolver
+
+    return _municipality_resolver_instance
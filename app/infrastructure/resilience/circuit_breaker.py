@@ -0,0 +1,159 @@
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Exceção lançada quando o circuito de um serviço externo está aberto."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(
+            f"Circuito '{name}' aberto: serviço externo indisponível no momento."
+        )
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Disjuntor por serviço externo. Abre quando, nas últimas chamadas, a taxa de
+    falhas ou a taxa de chamadas lentas ultrapassa o limite; enquanto aberto,
+    as chamadas falham de imediato. Depois de 'open_seconds' deixa passar uma
+    chamada de teste (meio-aberto), que decide se volta a fechar.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int,
+        minimum_calls: int,
+        failure_rate_threshold: float,
+        slow_call_seconds: float,
+        slow_call_rate_threshold: float,
+        open_seconds: float,
+    ):
+        self.name = name
+        self.minimum_calls = minimum_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        # Cada entrada é (falhou, foi lenta)
+        self._calls: deque[tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= (
+            self.open_seconds
+        ):
+            return HALF_OPEN
+        return self._state
+
+    async def call(
+        self,
+        operation: Callable[[], Awaitable[T]],
+        is_failure: Callable[[T], bool] = lambda _: False,
+    ) -> T:
+        """
+        Executa a operação através do disjuntor.
+
+        Args:
+            operation: Função que devolve a corrotina a executar.
+            is_failure: Indica se um resultado (sem exceção) conta como falha.
+        Raises:
+            CircuitOpenError: Se o circuito estiver aberto.
+        """
+        state = self.state
+        if state == OPEN or (state == HALF_OPEN and self._probe_in_flight):
+            retry_after = self.open_seconds - (time.monotonic() - self._opened_at)
+            raise CircuitOpenError(self.name, max(retry_after, 0.0))
+
+        probing = state == HALF_OPEN
+        if probing:
+            self._probe_in_flight = True
+
+        started = time.monotonic()
+        try:
+            result = await operation()
+        except Exception:
+            self._record(failed=True, elapsed=time.monotonic() - started, probe=probing)
+            raise
+        except BaseException:
+            # Chamada cancelada: não conta, mas liberta o teste do meio-aberto
+            if probing:
+                self._probe_in_flight = False
+            raise
+
+        self._record(
+            failed=is_failure(result),
+            elapsed=time.monotonic() - started,
+            probe=probing,
+        )
+        return result
+
+    def _record(self, failed: bool, elapsed: float, probe: bool):
+        slow = elapsed >= self.slow_call_seconds
+
+        if probe:
+            self._probe_in_flight = False
+            if failed or slow:
+                self._open()
+            else:
+                self._state = CLOSED
+                self._calls.clear()
+            return
+
+        self._calls.append((failed, slow))
+        if self._state == CLOSED and self._should_open():
+            self._open()
+
+    def _should_open(self) -> bool:
+        total = len(self._calls)
+        if total < self.minimum_calls:
+            return False
+        failures = sum(1 for failed, _ in self._calls if failed)
+        slow_calls = sum(1 for _, slow in self._calls if slow)
+        return (
+            failures / total >= self.failure_rate_threshold
+            or slow_calls / total >= self.slow_call_rate_threshold
+        )
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._calls.clear()
+
+
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """
+    Obtém o disjuntor do serviço externo (um por processo), criando-o se
+    necessário com os limites configurados.
+    """
+    breaker = _circuit_breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            name=name,
+            window_size=settings.CIRCUIT_BREAKER_WINDOW_SIZE,
+            minimum_calls=settings.CIRCUIT_BREAKER_MINIMUM_CALLS,
+            failure_rate_threshold=settings.CIRCUIT_BREAKER_FAILURE_RATE,
+            slow_call_seconds=settings.CIRCUIT_BREAKER_SLOW_CALL_SECONDS,
+            slow_call_rate_threshold=settings.CIRCUIT_BREAKER_SLOW_CALL_RATE,
+            open_seconds=settings.CIRCUIT_BREAKER_OPEN_SECONDS,
+        )
+        _circuit_breakers[name] = breaker
+    return breaker
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+
+import redis
+
+from app.config import settings
+from app.infrastructure.cache.async_redis_cache_service import (
+    AsyncRedisClient,
+    get_async_redis_client,
+)
+
+logger = logging.getLogger(__name__)
+
+GEOCODE_RATE_LIMIT = "google_maps:geocode"
+REVERSE_GEOCODE_RATE_LIMIT = "google_maps:reverse_geocode"
+PLACES_SEARCH_TEXT_RATE_LIMIT = "google_places:search_text"
+CROSSFIRE_OCCURRENCES_RATE_LIMIT = "crossfire:occurrences"
+
+# Token bucket partilhado entre processos, usando o relógio do Redis.
+# Reserva o token mesmo que ainda não exista (o saldo fica negativo) se a
+# espera couber em ARGV[3]; assim os pedidos ficam numa fila justa.
+# Devolve a espera em ms, ou -espera se o pedido foi recusado.
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_wait_ms = tonumber(ARGV[3])
+local clock = redis.call("TIME")
+local now_ms = clock[1] * 1000 + math.floor(clock[2] / 1000)
+
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now_ms
+tokens = math.min(burst, tokens + math.max(0, now_ms - updated_at) * rate / 1000)
+
+local wait_ms = 0
+if tokens < 1 then
+    wait_ms = math.ceil((1 - tokens) * 1000 / rate)
+end
+if wait_ms > max_wait_ms then
+    return -wait_ms
+end
+
+redis.call("HSET", KEYS[1], "tokens", tokens - 1, "updated_at", now_ms)
+redis.call("PEXPIRE", KEYS[1], math.ceil(burst * 1000 / rate) + wait_ms + 1000)
+return wait_ms
+"""
+
+
+class RateLimitExceededError(Exception):
+    """
+    Exceção lançada quando um pedido teria de esperar mais do que o permitido
+    pelo limite de requisições de um serviço externo.
+    """
+
+    def __init__(self, bucket: str, retry_after: float):
+        super().__init__(
+            f"Limite de requisições de '{bucket}' atingido; "
+            f"tente novamente em {retry_after:.1f}s."
+        )
+        self.bucket = bucket
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    Limitador de requisições (token bucket) partilhado no Redis entre os
+    workers do gunicorn e do Celery, com um balde por serviço e endpoint.
+
+    Um pedido sem token disponível espera na fila até à sua vez, desde que a
+    espera não ultrapasse o 'max_wait' do balde. As contagens de pedidos
+    admitidos, atrasados e recusados ficam em 'ratelimit:metrics:<balde>'.
+    """
+
+    def __init__(self, redis_client: AsyncRedisClient | None):
+        self._redis_client = redis_client
+
+    async def _reserve(self, bucket: str) -> float:
+        """
+        Reserva um token do balde e devolve a espera, em segundos, até poder
+        usá-lo.
+
+        Raises:
+            RateLimitExceededError: Se a espera ultrapassar o 'max_wait' do balde.
+        """
+        limit = settings.RATE_LIMITS.get(bucket)
+        if limit is None or self._redis_client is None:
+            return 0.0
+
+        try:
+            wait_ms: int = await self._redis_client.r.eval(
+                _TOKEN_BUCKET_SCRIPT,
+                1,
+                f"ratelimit:bucket:{bucket}",
+                limit.rate,
+                limit.burst,
+                int(limit.max_wait * 1000),
+            )
+        except redis.exceptions.RedisError as e:
+            # Sem Redis o limitador não bloqueia as requisições
+            logger.warning(f"Limitador '{bucket}' indisponível: {e}")
+            return 0.0
+
+        if wait_ms < 0:
+            await self._record(bucket, "rejected", -wait_ms)
+            logger.warning(f"Limite de requisições de '{bucket}' atingido.")
+            raise RateLimitExceededError(bucket, -wait_ms / 1000)
+
+        await self._record(bucket, "throttled" if wait_ms else "admitted", wait_ms)
+        return wait_ms / 1000
+
+    async def _record(self, bucket: str, outcome: str, wait_ms: int):
+        if self._redis_client is None:
+            return
+        try:
+            async with self._redis_client.r.pipeline(transaction=False) as pipeline:
+                pipeline.hincrby(f"ratelimit:metrics:{bucket}", outcome, 1)
+                pipeline.hincrby(f"ratelimit:metrics:{bucket}", "wait_ms", wait_ms)
+                await pipeline.execute()
+        except redis.exceptions.RedisError:
+            pass
+
+    async def acquire(self, bucket: str):
+        """
+        Aguarda a vez de fazer uma requisição ao balde.
+
+        Raises:
+            RateLimitExceededError: Se a espera ultrapassar o 'max_wait' do balde.
+        """
+        wait = await self._reserve(bucket)
+        if wait:
+            await asyncio.sleep(wait)
+
+
+# Variável global para armazenar a única instância do limitador
+_rate_limiter_instance: RateLimiter | None = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Fornece a instância única (Singleton) do limitador de requisições.
+    """
+    global _rate_limiter_instance
+
+    if _rate_limiter_instance is None:
+        _rate_limiter_instance = RateLimiter(redis_client=get_async_redis_client())
+
+    return _rate_limiter_instance
@@ -0,0 +1,73 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+class SingleFlight:
+    """
+    Junta chamadas concorrentes com a mesma chave numa única execução: quem
+    chega enquanto a chave está em curso aguarda e recebe o mesmo resultado
+    (ou a mesma exceção).
+
+    Com 'recent_window' > 0, os resultados concluídos ficam disponíveis
+    durante esse número de segundos para 'find_prefix'.
+    """
+
+    def __init__(self, recent_window: float = 0.0):
+        self._recent_window = recent_window
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self._recent: dict[str, tuple[float, Any]] = {}
+
+    async def run(self, key: str, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Executa 'operation' para a chave, ou aguarda a execução já em curso.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(operation())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        # O shield impede que o cancelamento de um dos pedidos cancele os outros
+        return await asyncio.shield(task)
+
+    async def find_prefix(self, key: str) -> tuple[str, Any] | None:
+        """
+        Procura a chave mais longa, em curso ou concluída há menos de
+        'recent_window' segundos, de que 'key' é uma extensão, e devolve-a com
+        o seu resultado. Devolve None se não houver nenhuma ou se ela falhar.
+        """
+        self._prune_recent()
+
+        prefixes = [
+            candidate
+            for candidate in (*self._in_flight, *self._recent)
+            if candidate != key and key.startswith(candidate)
+        ]
+        if not prefixes:
+            return None
+
+        prefix = max(prefixes, key=len)
+        recent = self._recent.get(prefix)
+        if recent is not None:
+            return prefix, recent[1]
+
+        try:
+            return prefix, await asyncio.shield(self._in_flight[prefix])
+        except Exception:
+            return None
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self._recent_window > 0:
+            self._recent[key] = (time.monotonic(), task.result())
+
+    def _prune_recent(self):
+        oldest = time.monotonic() - self._recent_window
+        for key in [k for k, (at, _) in self._recent.items() if at < oldest]:
+            del self._recent[key]
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import random
+from collections.abc import Awaitable, Callable
+
+import httpx
+
+from app.config import settings
+from app.infrastructure.resilience.circuit_breaker import get_circuit_breaker
+from app.infrastructure.resilience.rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+_TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def is_transient_response(response: httpx.Response) -> bool:
+    """Indica se a resposta é uma falha temporária que vale a pena repetir."""
+    return response.status_code in _TRANSIENT_STATUS_CODES
+
+
+def _backoff_delay(attempt: int, response: httpx.Response | None) -> float:
+    """
+    Espera antes da próxima tentativa: respeita o 'Retry-After' da resposta ou,
+    na falta dele, usa backoff exponencial com jitter completo.
+    """
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), settings.UPSTREAM_RETRY_MAX_DELAY)
+
+    ceiling = min(
+        settings.UPSTREAM_RETRY_MAX_DELAY,
+        settings.UPSTREAM_RETRY_BASE_DELAY * 2 ** (attempt - 1),
+    )
+    return random.uniform(0, ceiling)
+
+
+async def call_upstream(
+    upstream: str,
+    send: Callable[[], Awaitable[httpx.Response]],
+    rate_limit: str | None = None,
+) -> httpx.Response:
+    """
+    Envia uma requisição a um serviço externo através do seu disjuntor,
+    repetindo-a com backoff em caso de erro de rede ou de resposta temporária
+    (429, 5xx). Cada tentativa consome um token do limitador 'rate_limit'.
+
+    Args:
+        upstream (str): Identificador do serviço (ex: CROSSFIRE_UPSTREAM).
+        send: Função que envia a requisição e devolve a resposta.
+        rate_limit (str | None): Balde do limitador de requisições (opcional).
+    Returns:
+        httpx.Response: A última resposta obtida (o chamador decide se é erro).
+    Raises:
+        httpx.RequestError: Se todas as tentativas falharem por erro de rede.
+        CircuitOpenError: Se o circuito do serviço estiver aberto.
+        RateLimitExceededError: Se o limite de requisições for atingido.
+    """
+    breaker = get_circuit_breaker(upstream)
+    attempts = max(settings.UPSTREAM_RETRY_ATTEMPTS, 1)
+    attempt = 0
+
+    while True:
+        attempt += 1
+        last_attempt = attempt >= attempts
+        if rate_limit is not None:
+            await get_rate_limiter().acquire(rate_limit)
+        try:
+            response = await breaker.call(send, is_failure=is_transient_response)
+        except httpx.RequestError as e:
+            if last_attempt:
+                raise
+            logger.warning(f"Erro de rede em '{upstream}', nova tentativa: {e}")
+            await asyncio.sleep(_backoff_delay(attempt, None))
+            continue
+
+        if last_attempt or not is_transient_response(response):
+            return response
+
+        logger.warning(
+            f"Resposta {response.status_code} de '{upstream}', nova tentativa."
+        )
+        await asyncio.sleep(_backoff_delay(attempt, response))
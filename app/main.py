@@ -1,9 +1,62 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from app.api.routers import autocomplete, geocoding, occurrences, reviews
 from app.config import settings
+from app.infrastructure.api_clients.crossfire_client import CrossfireAPIService
+from app.infrastructure.api_clients.crossfire_directory import (
+    get_crossfire_location_directory,
+)
+from app.infrastructure.api_clients.http_client import (
+    CROSSFIRE_UPSTREAM,
+    close_http_client_pool,
+    get_http_client_pool,
+)
+from app.infrastructure.auth.crossfire_token_manager import get_crossfire_token_manager
+from app.infrastructure.cache.async_redis_cache_service import (
+    close_async_redis_client,
+)
+from app.infrastructure.cache.hot_cache import get_hot_cache
+from app.infrastructure.cache.result_cache import run_metrics_flush
+from app.infrastructure.geo.municipality_resolver import get_municipality_resolver
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Carrega os limites municipais antes de aceitar requisições
+    await asyncio.to_thread(get_municipality_resolver)
+
+    location_directory = get_crossfire_location_directory()
+    crossfire_gateway = CrossfireAPIService(
+        client=get_http_client_pool().get_client(CROSSFIRE_UPSTREAM),
+        location_directory=location_directory,
+        token_manager=get_crossfire_token_manager(),
+    )
+    directory_refresh = asyncio.create_task(
+        location_directory.run_periodic_refresh(crossfire_gateway)
+    )
+
+    cache_invalidation = asyncio.create_task(
+        get_hot_cache().run_invalidation_listener()
+    )
+
+    metrics_flush = asyncio.create_task(run_metrics_flush())
+
+    yield
+
+    background_tasks = (metrics_flush, cache_invalidation, directory_refresh)
+    for task in background_tasks:
+        task.cancel()
+    # Aguarda o fim das tarefas antes de fechar os pools: o cancelamento envia
+    # as contagens pendentes e fecha a subscrição de invalidação
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await close_http_client_pool()
+    await close_async_redis_client()
+
 
-app = FastAPI(title=settings.PROJECT_NAME)
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 app.include_router(occurrences.router)
 app.include_router(autocomplete.router)
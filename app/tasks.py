@@ -1,88 +1,284 @@
 import asyncio
-import json
 import logging
+from dataclasses import asdict
 from datetime import date, timedelta
 
-import redis
-from celery import Celery
+from celery import group
+from celery.signals import worker_process_shutdown
 
-from app.config import settings
+from app.celery_app import app
+from app.config import HotspotCity, settings
+from app.core.use_cases.build_hotspot_tiles_use_case import BuildHotspotTilesUseCase
 from app.core.use_cases.cluster_occurrences_use_case import ClusterOccurrencesUseCase
 from app.infrastructure.api_clients.crossfire_client import CrossfireAPIService
-from app.infrastructure.auth.crossfire_auth_service import CrossfireAuthService
+from app.infrastructure.api_clients.crossfire_directory import (
+    get_crossfire_location_directory,
+)
+from app.infrastructure.api_clients.http_client import (
+    CROSSFIRE_UPSTREAM,
+    close_http_client_pool,
+    get_http_client_pool,
+)
+from app.infrastructure.auth.crossfire_token_manager import get_crossfire_token_manager
+from app.infrastructure.cache.async_redis_cache_service import (
+    close_async_redis_client,
+)
+from app.infrastructure.cache.hot_cache import INVALIDATION_CHANNEL
+from app.infrastructure.cache.redis_cache_service import (
+    RedisClient,
+    get_redis_client,
+)
+from app.infrastructure.clustering.engines import create_clustering_engine
+from app.infrastructure.database.repositories.sqlite_occurrence_store import (
+    SQLiteOccurrenceStore,
+)
 
 logger = logging.getLogger(__name__)
 
-CELERY_BROKER_URL = (
-    f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
-)
-
-DEFAULT_CACHE_KEY = "analysis_result_salvador"
-DEFAULT_CITY = "Salvador"
-DEFAULT_STATE = "Bahia"
 DEFAULT_DAYS_AGO = 365
 
+# Tempo máximo de uma execução por cidade (o lock expira mesmo se o worker cair)
+PROCESSING_LOCK_TTL_MS = 60 * 60_000
+PROCESSING_SLOT_KEY = "hotspots:processing_slot"
+
 PRODUCTION_SCHEDULE = getattr(settings, "CELERY_BEAT_SCHEDULE", timedelta(days=1))
 
 # PRODUCTION_SCHEDULE = getattr(
 #     settings, "CELERY_BEAT_SCHEDULE", crontab(hour=0, minute=1)
 # )
 
-app = Celery("tasks", broker=CELERY_BROKER_URL)
+_occurrence_store: SQLiteOccurrenceStore | None = None
+
+# Loop de eventos do processo do worker. É mantido entre as tarefas para que o
+# pool de conexões HTTP seja reutilizado em vez de recriado a cada execução.
+_worker_loop: asyncio.AbstractEventLoop | None = None
+
+
+def run_async(coro):
+    """
+    Executa uma corrotina no loop de eventos persistente do processo do worker.
+    """
+    global _worker_loop
+
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+
+    return _worker_loop.run_until_complete(coro)
+
+
+def get_occurrence_store() -> SQLiteOccurrenceStore:
+    """
+    Fornece o armazenamento local de ocorrências do processo do worker.
+    """
+    global _occurrence_store
+
+    if _occurrence_store is None:
+        _occurrence_store = SQLiteOccurrenceStore(settings.OCCURRENCE_STORE_PATH)
+
+    return _occurrence_store
+
+
+@worker_process_shutdown.connect
+def close_worker_http_clients(**kwargs):
+    if _worker_loop is not None and not _worker_loop.is_closed():
+        _worker_loop.run_until_complete(close_http_client_pool())
+        _worker_loop.run_until_complete(close_async_redis_client())
+        _worker_loop.close()
+
+
+def _acquire_processing_slot(redis_client: RedisClient) -> tuple[str, str] | None:
+    """
+    Ocupa uma das HOTSPOT_MAX_PARALLEL_CITIES vagas de processamento,
+    partilhadas por todos os workers. Devolve (chave, dono) do lock da vaga,
+    ou None se estiverem todas ocupadas.
+    """
+    for slot in range(settings.HOTSPOT_MAX_PARALLEL_CITIES):
+        slot_key = f"{PROCESSING_SLOT_KEY}:{slot}"
+        owner = redis_client.acquire_lock(slot_key, PROCESSING_LOCK_TTL_MS)
+        if owner is not None:
+            return slot_key, owner
+    return None
+
 
+@app.task(name="tasks.process_all_cities")
+def process_all_cities():
+    """
+    Dispara, em paralelo (grupo do Celery), o processamento dos hotspots de
+    cada cidade de HOTSPOT_CITIES.
+    """
+    # As tarefas que não começarem até à execução seguinte são descartadas,
+    # para que duas execuções agendadas nunca se acumulem na fila
+    group(
+        process_and_cache_occurrences.si(
+            city_name=city.city,
+            state_name=city.state,
+            days_ago=city.days_ago,
+            cache_key=city.cache_key,
+        ).set(expires=PRODUCTION_SCHEDULE.total_seconds())
+        for city in settings.HOTSPOT_CITIES
+    ).apply_async()
 
-@app.task(name="tasks.process_and_cache_occurrences")
+    return f"Processamento agendado para {len(settings.HOTSPOT_CITIES)} cidades."
+
+
+@app.task(
+    name="tasks.process_and_cache_occurrences",
+    bind=True,
+    max_retries=settings.HOTSPOT_SLOT_MAX_RETRIES,
+)
 def process_and_cache_occurrences(
-    city_name: str = DEFAULT_CITY,
-    state_name: str = DEFAULT_STATE,
+    self,
+    city_name: str,
+    state_name: str,
     days_ago: int = DEFAULT_DAYS_AGO,
-    cache_key: str = DEFAULT_CACHE_KEY,
+    cache_key: str | None = None,
+    clustering_engine: str | None = None,
 ):
-    logger.info(f"WORKER: Tarefa agendada iniciada para {city_name}/{state_name}.")
+    """
+    Calcula e guarda no cache os hotspots de uma cidade.
+
+    Cada cidade é processada por uma execução de cada vez, e no máximo
+    HOTSPOT_MAX_PARALLEL_CITIES cidades ao mesmo tempo: sem vaga livre, a
+    tarefa é reagendada, no máximo HOTSPOT_SLOT_MAX_RETRIES vezes.
+    """
+    city = HotspotCity(city=city_name, state=state_name, days_ago=days_ago)
+    cache_key = cache_key or city.cache_key
+    redis_client = get_redis_client()
+
+    city_lock_key = f"{cache_key}:processing"
+    city_owner = redis_client.acquire_lock(city_lock_key, PROCESSING_LOCK_TTL_MS)
+    if city_owner is None:
+        logger.info(f"WORKER: {city_name}/{state_name} já está a ser processada.")
+        return f"Processamento de {city_name} já em curso."
+
+    slot = _acquire_processing_slot(redis_client)
+    if slot is None:
+        redis_client.release_lock(city_lock_key, city_owner)
+        if self.request.retries >= self.max_retries:
+            logger.warning(
+                f"WORKER: Sem vaga de processamento para {city_name}/{state_name} "
+                f"após {self.max_retries} tentativas."
+            )
+            return f"Processamento de {city_name} adiado para a próxima execução."
+        raise self.retry(countdown=settings.HOTSPOT_SLOT_RETRY_DELAY)
 
     try:
-        auth_service = CrossfireAuthService()
-        occurrence_gateway = CrossfireAPIService()
+        return _process_city(city, cache_key, clustering_engine)
+    finally:
+        redis_client.release_lock(*slot)
+        redis_client.release_lock(city_lock_key, city_owner)
+
+
+def _process_city(city: HotspotCity, cache_key: str, clustering_engine: str | None):
+    city_name, state_name, days_ago = city.city, city.state, city.days_ago
+    logger.info(f"WORKER: Tarefa agendada iniciada para {city_name}/{state_name}.")
 
-        logger.info("WORKER: Obtendo token de autenticação...")
-        access_token = auth_service.get_auth_token(
-            settings.EMAIL_CROSSFIRE_API, settings.PASSWORD_CROSSFIRE_API
+    try:
+        occurrence_gateway = CrossfireAPIService(
+            client=get_http_client_pool().get_client(CROSSFIRE_UPSTREAM),
+            location_directory=get_crossfire_location_directory(),
+            token_manager=get_crossfire_token_manager(),
         )
-        occurrence_gateway.set_access_token(access_token)
-        logger.info("WORKER: Token obtido com sucesso.")
 
         today = date.today()
         final_date = today.strftime("%Y-%m-%d")
         initial_date = (today - timedelta(days=days_ago)).strftime("%Y-%m-%d")
 
+        occurrence_store = get_occurrence_store()
+        city_key = city.key
+        sync_start = occurrence_store.get_sync_start(
+            city_key, initial_date, settings.OCCURRENCE_SYNC_OVERLAP_DAYS
+        )
+
         logger.info(
-            f"WORKER: Buscando ocorrências para {city_name}/{state_name} entre {initial_date} e {final_date}..."
+            f"WORKER: Buscando ocorrências para {city_name}/{state_name} entre {sync_start} e {final_date}..."
         )
 
-        raw_data = asyncio.run(
+        new_data = run_async(
             occurrence_gateway.get_occurrences(
                 city_name=city_name,
                 state_name=state_name,
-                initial_date=initial_date,
+                initial_date=sync_start,
                 final_date=final_date,
             )
         )
+        logger.info(f"WORKER: {len(new_data)} ocorrências sincronizadas.")
 
-        print(raw_data[0])
-        logger.info(f"WORKER: {len(raw_data)} ocorrências encontradas.")
+        occurrence_store.sync(
+            city_key=city_key,
+            window_start=initial_date,
+            window_end=final_date,
+            sync_start=sync_start,
+            occurrences=new_data,
+        )
+        raw_data = occurrence_store.get_occurrences(city_key, initial_date, final_date)
+        logger.info(f"WORKER: {len(raw_data)} ocorrências na janela de análise.")
 
-        logger.info("WORKER: Iniciando processamento (clusterização)...")
-        processor = ClusterOccurrencesUseCase(epsilon_km=0.7, min_samples=8)
+        engine_name = clustering_engine or settings.CLUSTERING_ENGINE_BY_CITY.get(
+            city_key, settings.CLUSTERING_ENGINE
+        )
+        logger.info(
+            f"WORKER: Iniciando processamento (clusterização: {engine_name})..."
+        )
+        processor = ClusterOccurrencesUseCase(
+            engine=create_clustering_engine(
+                engine_name,
+                epsilon_km=settings.CLUSTERING_EPSILON_KM,
+                min_samples=settings.CLUSTERING_MIN_SAMPLES,
+            )
+        )
 
         analyzed_data_dict = processor.execute(raw_data)
-        logger.info("WORKER: Processamento finalizado.")
+        summaries = [
+            asdict(summary) for summary in processor.summarize(analyzed_data_dict)
+        ]
+        logger.info(f"WORKER: Processamento finalizado ({len(summaries)} hotspots).")
 
-        json_output = json.dumps(analyzed_data_dict)
+        # Os registos com o rótulo do grupo e, à parte, o resumo de cada grupo
+        redis_client = get_redis_client()
+        for key, value in (
+            (cache_key, analyzed_data_dict),
+            (f"{cache_key}:summary", summaries),
+        ):
+            if not redis_client.set_swr_cache(
+                key,
+                value,
+                fresh_for=settings.HOTSPOTS_CACHE_TTL,
+                stale_for=settings.HOTSPOTS_CACHE_STALE_TTL,
+            ):
+                raise RuntimeError(f"Falha ao gravar o cache '{key}'.")
+            redis_client.publish_message(INVALIDATION_CHANNEL, key)
 
-        redis_client = redis.Redis(
-            host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB
-        )
-        redis_client.set(cache_key, json_output)
+        tiles = BuildHotspotTilesUseCase(
+            engine_factory=lambda epsilon_km: create_clustering_engine(
+                engine_name,
+                epsilon_km=epsilon_km,
+                min_samples=settings.CLUSTERING_MIN_SAMPLES,
+            ),
+            epsilon_km=settings.CLUSTERING_EPSILON_KM,
+            min_zoom=settings.HOTSPOT_TILE_MIN_ZOOM,
+            max_zoom=settings.HOTSPOT_TILE_MAX_ZOOM,
+            grid_max_zoom=settings.HOTSPOT_TILE_GRID_MAX_ZOOM,
+            reference_zoom=settings.HOTSPOT_TILE_REFERENCE_ZOOM,
+            grid_size=settings.HOTSPOT_TILE_GRID_SIZE,
+        ).execute(raw_data)
+        # Os tiles de cidades vizinhas são juntados na leitura
+        for zoom_tiles in tiles.values():
+            for tile in zoom_tiles.values():
+                for feature in tile["features"]:
+                    feature["city"] = city_key
+
+        # Um hash por zoom, com um campo "x/y" por tile
+        for zoom in range(
+            settings.HOTSPOT_TILE_MIN_ZOOM, settings.HOTSPOT_TILE_MAX_ZOOM + 1
+        ):
+            if not redis_client.set_swr_hash_cache(
+                f"{cache_key}:tiles:{zoom}",
+                tiles.get(zoom, {}),
+                fresh_for=settings.HOTSPOTS_CACHE_TTL,
+                stale_for=settings.HOTSPOTS_CACHE_STALE_TTL,
+            ):
+                raise RuntimeError(f"Falha ao gravar os tiles do zoom {zoom}.")
 
         logger.info(f"WORKER: Resultado salvo no cache com a chave '{cache_key}'.")
         return f"Cache atualizado com sucesso para {city_name}."
@@ -93,15 +289,9 @@ def process_and_cache_occurrences(
 
 
 app.conf.beat_schedule = {
-    f"processar-dados-diarios-{DEFAULT_CITY.lower()}": {
-        "task": "tasks.process_and_cache_occurrences",
+    "processar-dados-diarios": {
+        "task": "tasks.process_all_cities",
         "schedule": PRODUCTION_SCHEDULE,
-        "kwargs": {
-            "city_name": DEFAULT_CITY,
-            "state_name": DEFAULT_STATE,
-            "days_ago": DEFAULT_DAYS_AGO,
-            "cache_key": DEFAULT_CACHE_KEY,
-        },
     },
 }
 app.conf.timezone = "UTC"
@@ -0,0 +1,148 @@
+"""
+Compara a ingestão colunar do ClusterOccurrencesUseCase com a implementação
+anterior (DataFrame do pandas com os registos completos), em tempo e pico de
+memória, sobre ocorrências sintéticas com a estrutura da API do CrossFire.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.cluster_ingestion --occurrences 50000
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import numpy as np
+import pandas as pd
+from app.core.use_cases.cluster_occurrences_use_case import ClusterOccurrencesUseCase
+from app.core.utils.occurrence_columns import extract_columns
+from app.infrastructure.clustering.engines import HaversineDBSCANEngine
+from sklearn.cluster import DBSCAN
+
+EPSILON_KM = 0.7
+MIN_SAMPLES = 8
+
+
+def dataframe_execute(occurrences: list[dict]) -> list[dict]:
+    """Implementação anterior, com o DataFrame completo."""
+    df = pd.DataFrame([o for o in occurrences])
+    for col in ["latitude", "longitude"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df.dropna(subset=["latitude", "longitude"], inplace=True)
+
+    coords_radians = np.radians(df[["latitude", "longitude"]].values)
+    db = DBSCAN(
+        eps=EPSILON_KM / 6371.0,
+        min_samples=MIN_SAMPLES,
+        algorithm="ball_tree",
+        metric="haversine",
+    ).fit(coords_radians)
+    df["cluster"] = db.labels_
+    return df.to_dict(orient="records")
+
+
+def dataframe_ingest(occurrences: list[dict]) -> np.ndarray:
+    """Só a ingestão da implementação anterior, até às coordenadas em radianos."""
+    df = pd.DataFrame([o for o in occurrences])
+    for col in ["latitude", "longitude"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df.dropna(subset=["latitude", "longitude"], inplace=True)
+    return np.radians(df[["latitude", "longitude"]].values)
+
+
+def columnar_ingest(occurrences: list[dict]) -> np.ndarray:
+    columns = extract_columns(occurrences)
+    return np.radians(np.column_stack((columns.latitudes, columns.longitudes)))
+
+
+def make_occurrences(count: int, seed: int = 42) -> list[dict]:
+    """
+    Ocorrências à volta de alguns focos em Salvador (e 10% espalhadas pela
+    cidade), com campos aninhados.
+    """
+    rng = random.Random(seed)
+    centers = [
+        (-12.97 + rng.uniform(-0.12, 0.12), -38.5 + rng.uniform(-0.12, 0.12))
+        for _ in range(60)
+    ]
+    occurrences = []
+    for i in range(count):
+        if rng.random() < 0.1:
+            latitude = -12.97 + rng.uniform(-0.15, 0.15)
+            longitude = -38.5 + rng.uniform(-0.15, 0.15)
+        else:
+            center_latitude, center_longitude = rng.choice(centers)
+            latitude = rng.gauss(center_latitude, 0.003)
+            longitude = rng.gauss(center_longitude, 0.003)
+        occurrences.append(
+            {
+                "id": f"occ-{i}",
+                "document_number": i,
+                "address": f"Rua {i}, Salvador - BA",
+                "state": {"id": "ba", "name": "Bahia"},
+                "city": {"id": "ssa", "name": "Salvador"},
+                "neighborhood": {"id": f"n{i % 160}", "name": f"Bairro {i % 160}"},
+                "latitude": str(latitude),
+                "longitude": str(longitude),
+                "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T10:00:00.000Z",
+                "police_action": rng.random() < 0.5,
+                "context_info": {
+                    "main_reason": {"id": "r", "name": "Não identificado"},
+                    "clippings": [{"id": "c", "name": "Tiroteio"}],
+                },
+                "victims": [
+                    {"id": f"v{i}-{v}", "situation": "Wounded", "age": 20 + v}
+                    for v in range(rng.randint(0, 3))
+                ],
+                "transports": [],
+                "animal_victims": [],
+            }
+        )
+    return occurrences
+
+
+def measure(execute: Callable[[list[dict]], list[dict]], occurrences: list[dict]):
+    # O tempo é medido sem o tracemalloc, que atrasa cada alocação
+    start = time.perf_counter()
+    result = execute(occurrences)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    execute(occurrences)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--occurrences", type=int, default=50_000)
+    args = parser.parse_args()
+
+    occurrences = make_occurrences(args.occurrences)
+    columnar = ClusterOccurrencesUseCase(
+        engine=HaversineDBSCANEngine(epsilon_km=EPSILON_KM, min_samples=MIN_SAMPLES)
+    )
+
+    rows = [
+        ("Ingestão", dataframe_ingest, columnar_ingest),
+        ("Total", dataframe_execute, columnar.execute),
+    ]
+
+    print(f"{args.occurrences} ocorrências")
+    print(f"{'':>22} {'tempo (s)':>10} {'pico (MiB)':>11}")
+    for stage, old_execute, new_execute in rows:
+        old, old_time, old_peak = measure(old_execute, occurrences)
+        new, new_time, new_peak = measure(new_execute, occurrences)
+        if stage == "Total":
+            assert [o["cluster"] for o in old] == [o["cluster"] for o in new]
+
+        print(
+            f"{stage + ' (DataFrame)':>22} {old_time:>10.3f} {old_peak / 2**20:>11.1f}"
+        )
+        print(f"{stage + ' (colunar)':>22} {new_time:>10.3f} {new_peak / 2**20:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
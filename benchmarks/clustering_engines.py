@@ -0,0 +1,62 @@
+"""
+Compara os motores de agrupamento (ver app/infrastructure/clustering) em tempo
+de execução e concordância dos rótulos com o DBSCAN haversine, sobre as mesmas
+ocorrências sintéticas de benchmarks/cluster_ingestion.py.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.clustering_engines --occurrences 50000
+"""
+
+import argparse
+import time
+
+import numpy as np
+from app.core.utils.occurrence_columns import extract_columns
+from app.infrastructure.clustering.engines import (
+    CLUSTERING_ENGINES,
+    create_clustering_engine,
+)
+from benchmarks.cluster_ingestion import EPSILON_KM, MIN_SAMPLES, make_occurrences
+from sklearn.metrics import adjusted_rand_score
+
+BASELINE_ENGINE = "haversine_dbscan"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--occurrences", type=int, default=50_000)
+    parser.add_argument("--epsilon-km", type=float, default=EPSILON_KM)
+    parser.add_argument("--min-samples", type=int, default=MIN_SAMPLES)
+    args = parser.parse_args()
+
+    columns = extract_columns(make_occurrences(args.occurrences))
+
+    labels = {}
+    print(f"{args.occurrences} ocorrências")
+    print(
+        f"{'motor':>18} {'tempo (s)':>10} {'grupos':>7} {'isolados':>9} "
+        f"{'ARI':>6} {'ruído igual':>12}"
+    )
+    for name in CLUSTERING_ENGINES:
+        engine = create_clustering_engine(
+            name, epsilon_km=args.epsilon_km, min_samples=args.min_samples
+        )
+        start = time.perf_counter()
+        labels[name] = engine.fit_predict(columns.latitudes, columns.longitudes)
+        elapsed = time.perf_counter() - start
+
+        baseline = labels[BASELINE_ENGINE]
+        # ARI: 1.0 quando as partições são idênticas (a menos da numeração)
+        agreement = adjusted_rand_score(baseline, labels[name])
+        same_noise = np.mean((baseline == -1) == (labels[name] == -1))
+        clusters = len(set(labels[name].tolist()) - {-1})
+        noise = int(np.count_nonzero(labels[name] == -1))
+
+        print(
+            f"{name:>18} {elapsed:>10.3f} {clusters:>7} {noise:>9} "
+            f"{agreement:>6.3f} {same_noise:>12.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+# As credenciais são obrigatórias nas configurações, mas os testes não chamam
+# as APIs externas
+for name in (
+    "EMAIL_CROSSFIRE_API",
+    "PASSWORD_CROSSFIRE_API",
+    "GOOGLE_MAPS_API_KEY",
+    "SUPABASE_KEY",
+):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+
+
+@pytest.fixture
+def redis_client():
+    """
+    AsyncRedisClient sobre um Redis em memória (fakeredis, com Lua), vazio em
+    cada teste. As conexões são abertas no loop de eventos do teste.
+    """
+    fakeredis = pytest.importorskip("fakeredis")
+    import redis.asyncio as redis
+    from app.infrastructure.cache.async_redis_cache_service import AsyncRedisClient
+    from fakeredis.aioredis import FakeAsyncRedisConnection
+
+    pool = redis.ConnectionPool(
+        connection_class=FakeAsyncRedisConnection, server=fakeredis.FakeServer()
+    )
+    return AsyncRedisClient(pool)
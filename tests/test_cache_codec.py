@@ -0,0 +1,143 @@
+import json
+import math
+import time
+
+import pytest
+from app.config import settings
+from app.infrastructure.cache import codec
+from app.infrastructure.cache.codec import (
+    COMPRESSION_NONE,
+    COMPRESSION_ZLIB,
+    COMPRESSION_ZSTD,
+    SERIALIZER_JSON,
+    CacheEntry,
+    encode_entry,
+    parse_entry,
+)
+
+OCCURRENCES = [
+    {"id": str(i), "latitude": -22.9 + i / 1000, "longitude": -43.2, "tags": ["a"]}
+    for i in range(200)
+]
+
+
+def _entry(fresh_until: float | None) -> CacheEntry:
+    return CacheEntry(
+        serializer=SERIALIZER_JSON,
+        compression=COMPRESSION_NONE,
+        fresh_until=fresh_until,
+        payload=b"[]",
+    )
+
+
+def test_small_payload_is_not_compressed():
+    entry = parse_entry(encode_entry({"a": 1}))
+
+    assert entry.compression == COMPRESSION_NONE
+    assert entry.decode() == {"a": 1}
+
+
+def test_large_payload_roundtrip_with_zstd():
+    pytest.importorskip("zstandard")
+    entry = parse_entry(encode_entry(OCCURRENCES, fresh_until=123.0))
+
+    assert entry.compression == COMPRESSION_ZSTD
+    assert entry.fresh_until == 123.0
+    assert entry.decode() == OCCURRENCES
+    assert json.loads(entry.json_bytes()) == OCCURRENCES
+
+
+def test_fallbacks_without_optional_dependencies(monkeypatch):
+    monkeypatch.setattr(codec, "orjson", None)
+    monkeypatch.setattr(codec, "zstandard", None)
+
+    entry = parse_entry(encode_entry(OCCURRENCES))
+
+    assert entry.serializer == SERIALIZER_JSON
+    assert entry.compression == COMPRESSION_ZLIB
+    assert entry.decode() == OCCURRENCES
+
+
+def test_zstd_entry_without_zstandard_is_rejected(monkeypatch):
+    pytest.importorskip("zstandard")
+    entry = parse_entry(encode_entry(OCCURRENCES))
+    monkeypatch.setattr(codec, "zstandard", None)
+
+    with pytest.raises(ValueError):
+        entry.decode()
+
+
+def test_corrupted_payload_is_rejected():
+    raw = encode_entry(OCCURRENCES)
+
+    with pytest.raises(ValueError):
+        parse_entry(raw[:-10] + b"0" * 10).decode()
+
+
+def test_legacy_entries_are_read():
+    plain = parse_entry(json.dumps([1, 2]))
+    assert plain.decode() == [1, 2]
+    assert plain.fresh_until is None
+
+    envelope = parse_entry(json.dumps({"fresh_until": 50.0, "data": [3]}))
+    assert envelope.decode() == [3]
+    assert envelope.fresh_until == 50.0
+
+
+@pytest.mark.parametrize("compression_min_bytes", [0, 10**9])
+@pytest.mark.parametrize("zstd", [True, False])
+def test_iter_items_streams_item_per_line_lists(
+    monkeypatch, compression_min_bytes, zstd
+):
+    monkeypatch.setattr(settings, "CACHE_COMPRESSION_MIN_BYTES", compression_min_bytes)
+    # Blocos pequenos: os elementos atravessam os limites dos blocos
+    monkeypatch.setattr(codec, "_STREAM_CHUNK_SIZE", 7)
+    if not zstd:
+        monkeypatch.setattr(codec, "zstandard", None)
+
+    entry = parse_entry(encode_entry(OCCURRENCES, item_per_line=True))
+
+    assert [json.loads(item) for item in entry.iter_items()] == OCCURRENCES
+    # Continua a ser JSON válido para quem lê a lista inteira
+    assert entry.decode() == OCCURRENCES
+
+
+def test_iter_items_reads_compact_lists():
+    entry = parse_entry(encode_entry(OCCURRENCES))
+
+    assert [json.loads(item) for item in entry.iter_items()] == OCCURRENCES
+
+
+def test_iter_items_of_an_empty_list():
+    entry = parse_entry(encode_entry([], item_per_line=True))
+
+    assert list(entry.iter_items()) == []
+
+
+def test_iter_items_detects_truncated_lists(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_COMPRESSION_MIN_BYTES", 10**9)
+    raw = encode_entry(OCCURRENCES, item_per_line=True)
+
+    with pytest.raises(ValueError):
+        list(parse_entry(raw[:-30]).iter_items())
+
+
+def test_is_stale():
+    assert not _entry(None).is_stale
+    assert not _entry(time.time() + 60).is_stale
+    assert _entry(time.time() - 1).is_stale
+
+
+def test_should_refresh_early(monkeypatch):
+    # 1 - random() = 1/e: a antecipação é exatamente recompute_time * beta
+    monkeypatch.setattr(codec.random, "random", lambda: 1 - math.exp(-1))
+    entry = _entry(time.time() + 5)
+
+    assert entry.should_refresh_early(recompute_time=10)
+    assert not entry.should_refresh_early(recompute_time=1)
+    assert entry.should_refresh_early(recompute_time=1, beta=10)
+    assert not _entry(None).should_refresh_early(recompute_time=10)
+
+
+def test_should_refresh_early_once_stale():
+    assert _entry(time.time() - 1).should_refresh_early(recompute_time=0)
@@ -0,0 +1,171 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from app.infrastructure.resilience import circuit_breaker
+from app.infrastructure.resilience.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake_clock = FakeClock()
+    # Só o relógio do módulo: o do loop de eventos continua o real
+    monkeypatch.setattr(circuit_breaker, "time", SimpleNamespace(monotonic=fake_clock))
+    return fake_clock
+
+
+def _breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        name="test",
+        window_size=4,
+        minimum_calls=4,
+        failure_rate_threshold=0.5,
+        slow_call_seconds=2.0,
+        slow_call_rate_threshold=0.75,
+        open_seconds=30.0,
+    )
+
+
+async def _succeed() -> str:
+    return "ok"
+
+
+async def _fail() -> str:
+    raise RuntimeError("falhou")
+
+
+def _call(breaker: CircuitBreaker, operation, **kwargs):
+    return asyncio.run(breaker.call(operation, **kwargs))
+
+
+def _fail_calls(breaker: CircuitBreaker, count: int):
+    for _ in range(count):
+        with pytest.raises(RuntimeError):
+            _call(breaker, _fail)
+
+
+def test_stays_closed_below_minimum_calls(clock):
+    breaker = _breaker()
+
+    _fail_calls(breaker, 3)
+
+    assert breaker.state == CLOSED
+
+
+def test_opens_on_failure_rate(clock):
+    breaker = _breaker()
+
+    _call(breaker, _succeed)
+    _call(breaker, _succeed)
+    _fail_calls(breaker, 2)
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as error:
+        _call(breaker, _succeed)
+    assert error.value.retry_after == 30.0
+
+
+def test_results_can_count_as_failures(clock):
+    breaker = _breaker()
+
+    for _ in range(4):
+        _call(breaker, _succeed, is_failure=lambda result: result == "ok")
+
+    assert breaker.state == OPEN
+
+
+def test_opens_on_slow_call_rate(clock):
+    breaker = _breaker()
+
+    async def slow() -> str:
+        clock.now += 2.0
+        return "ok"
+
+    for _ in range(3):
+        _call(breaker, slow)
+    assert breaker.state == CLOSED
+
+    _call(breaker, slow)
+    assert breaker.state == OPEN
+
+
+def test_half_open_probe_closes_on_success(clock):
+    breaker = _breaker()
+    _fail_calls(breaker, 4)
+
+    clock.now += 30.0
+    assert breaker.state == HALF_OPEN
+    assert _call(breaker, _succeed) == "ok"
+
+    assert breaker.state == CLOSED
+    # A janela recomeça: falhas anteriores não contam
+    _fail_calls(breaker, 3)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_reopens_on_failure(clock):
+    breaker = _breaker()
+    _fail_calls(breaker, 4)
+
+    clock.now += 30.0
+    _fail_calls(breaker, 1)
+
+    assert breaker.state == OPEN
+    clock.now += 29.0
+    assert breaker.state == OPEN
+
+
+def test_half_open_allows_a_single_probe(clock):
+    breaker = _breaker()
+    _fail_calls(breaker, 4)
+    clock.now += 30.0
+
+    async def probe_and_concurrent_call():
+        release = asyncio.Event()
+
+        async def probe() -> str:
+            await release.wait()
+            return "ok"
+
+        probing = asyncio.create_task(breaker.call(probe))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(_succeed)
+        release.set()
+        return await probing
+
+    assert asyncio.run(probe_and_concurrent_call()) == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_cancelled_probe_allows_another_probe(clock):
+    breaker = _breaker()
+    _fail_calls(breaker, 4)
+    clock.now += 30.0
+
+    async def cancel_probe():
+        probing = asyncio.create_task(breaker.call(asyncio.Event().wait))
+        await asyncio.sleep(0)
+        probing.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probing
+
+    asyncio.run(cancel_probe())
+
+    assert breaker.state == HALF_OPEN
+    assert _call(breaker, _succeed) == "ok"
+    assert breaker.state == CLOSED
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from app.core.interfaces.clustering_engine import ClusteringEngine
+from app.core.use_cases.cluster_occurrences_use_case import (
+    MIN_CLUSTER_AREA_KM2,
+    ClusterOccurrencesUseCase,
+)
+
+
+class FixedLabelsEngine(ClusteringEngine):
+    """Motor que devolve rótulos pré-definidos, pela ordem dos pontos."""
+
+    def __init__(self, labels: list[int]):
+        self.labels = labels
+        self.points: list[tuple[float, float]] = []
+
+    def fit_predict(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        self.points = list(zip(latitudes.tolist(), longitudes.tolist()))
+        return np.array(self.labels[: len(latitudes)])
+
+
+def _occurrence(occurrence_id: str, latitude, longitude, **fields) -> dict:
+    return {
+        "id": occurrence_id,
+        "latitude": latitude,
+        "longitude": longitude,
+        **fields,
+    }
+
+
+def test_execute_labels_occurrences_with_valid_coordinates():
+    engine = FixedLabelsEngine([0, -1])
+    occurrences = [
+        _occurrence("a", "-22.9", "-43.2", address="Rua A"),
+        _occurrence("b", None, -43.2),
+        _occurrence("c", -22.8, -43.1),
+    ]
+
+    clustered = ClusterOccurrencesUseCase(engine).execute(occurrences)
+
+    assert engine.points == [(-22.9, -43.2), (-22.8, -43.1)]
+    assert clustered == [
+        _occurrence("a", -22.9, -43.2, address="Rua A", cluster=0),
+        _occurrence("c", -22.8, -43.1, cluster=-1),
+    ]
+    # Os registos originais não são alterados
+    assert occurrences[0]["latitude"] == "-22.9"
+
+
+def test_execute_without_occurrences_or_coordinates():
+    use_case = ClusterOccurrencesUseCase(FixedLabelsEngine([]))
+
+    assert use_case.execute([]) == []
+    assert use_case.execute([_occurrence("a", "x", None)]) == []
+    with pytest.raises(ValueError):
+        use_case.execute([{"id": "a"}])
+
+
+def test_summarize_clusters():
+    clustered = [
+        _occurrence(
+            "a", -22.90, -43.20, cluster=0, date="2025-01-03", victims=[{}, {}]
+        ),
+        _occurrence("b", -22.90, -43.19, cluster=0, date="2025-01-01"),
+        _occurrence(
+            "c", -22.89, -43.20, cluster=0, date=None, police_action=True, victims=[]
+        ),
+        _occurrence("d", -22.50, -43.00, cluster=-1, victims=[{}]),
+        _occurrence("e", -22.70, -43.10, cluster=1, date="2025-02-01"),
+    ]
+
+    summaries = ClusterOccurrencesUseCase(FixedLabelsEngine([])).summarize(clustered)
+
+    assert [summary.cluster for summary in summaries] == [0, 1]
+    first, second = summaries
+
+    assert first.count == 3
+    assert first.latitude == pytest.approx(-22.8967, abs=1e-4)
+    assert first.longitude == pytest.approx(-43.1967, abs=1e-4)
+    assert sorted(map(tuple, first.hull)) == [
+        (-22.90, -43.20),
+        (-22.90, -43.19),
+        (-22.89, -43.20),
+    ]
+    assert (first.first_date, first.last_date) == ("2025-01-01", "2025-01-03")
+    assert first.victims == 2
+    assert first.police_actions == 1
+    # Triângulo retângulo de ~1,02 km por ~1,11 km
+    assert first.area_km2 == pytest.approx(0.57, abs=0.01)
+    assert first.density == pytest.approx(3 / first.area_km2)
+
+    # Um único ponto: sem área, com a densidade limitada pela área mínima
+    assert second.count == 1
+    assert second.area_km2 == 0.0
+    assert second.density == 1 / MIN_CLUSTER_AREA_KM2
+    assert (second.first_date, second.last_date) == ("2025-02-01", "2025-02-01")
+
+
+def test_summarize_without_clusters():
+    use_case = ClusterOccurrencesUseCase(FixedLabelsEngine([]))
+
+    assert use_case.summarize([]) == []
+    assert use_case.summarize([_occurrence("a", -22.9, -43.2, cluster=-1)]) == []
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from app.infrastructure.clustering.engines import (
+    CLUSTERING_ENGINES,
+    HDBSCANEngine,
+    create_clustering_engine,
+)
+
+# Dois grupos densos (pontos a ~100 m uns dos outros) e um ponto isolado
+OFFSETS = np.array([0.0, 0.0005, -0.0005, 0.001, -0.001])
+LATITUDES = np.concatenate([-22.90 + OFFSETS, -22.95 + OFFSETS[::-1], [-22.80]])
+LONGITUDES = np.concatenate([-43.20 + OFFSETS[::-1], -43.30 + OFFSETS, [-43.00]])
+
+
+@pytest.mark.parametrize("name", CLUSTERING_ENGINES)
+def test_engines_separate_groups_and_noise(name):
+    engine = create_clustering_engine(name, epsilon_km=0.5, min_samples=3)
+
+    labels = engine.fit_predict(LATITUDES, LONGITUDES)
+
+    assert labels.shape == (11,)
+    first, second = labels[0], labels[5]
+    assert first >= 0 and second >= 0 and first != second
+    assert (labels[:5] == first).all()
+    assert (labels[5:10] == second).all()
+    assert labels[10] == -1
+
+
+def test_dbscan_engines_agree_within_a_city():
+    latitudes = np.random.default_rng(0).uniform(-23.0, -22.8, 500)
+    longitudes = np.random.default_rng(1).uniform(-43.4, -43.1, 500)
+
+    haversine = create_clustering_engine("haversine_dbscan", 0.5, 3)
+    projected = create_clustering_engine("projected_dbscan", 0.5, 3)
+
+    # Os rótulos podem ser numerados de outra forma, mas a partição é a mesma
+    def partition(labels: np.ndarray) -> set:
+        return {
+            frozenset(np.flatnonzero(labels == label).tolist())
+            for label in set(labels.tolist())
+        }
+
+    assert partition(haversine.fit_predict(latitudes, longitudes)) == partition(
+        projected.fit_predict(latitudes, longitudes)
+    )
+
+
+def test_dbscan_requires_min_samples():
+    engine = create_clustering_engine("projected_dbscan", epsilon_km=0.5, min_samples=6)
+
+    assert (engine.fit_predict(LATITUDES, LONGITUDES) == -1).all()
+
+
+@pytest.mark.parametrize("count", [0, 1])
+def test_hdbscan_with_fewer_than_two_points(count):
+    labels = HDBSCANEngine(min_cluster_size=3).fit_predict(
+        LATITUDES[:count], LONGITUDES[:count]
+    )
+
+    assert labels.tolist() == [-1] * count
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        create_clustering_engine("kmeans", epsilon_km=0.5, min_samples=3)
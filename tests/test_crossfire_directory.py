@@ -0,0 +1,41 @@
+import pytest
+from app.infrastructure.api_clients.crossfire_directory import (
+    CrossfireLocationDirectory,
+)
+
+
+@pytest.fixture
+def directory() -> CrossfireLocationDirectory:
+    directory = CrossfireLocationDirectory()
+    # Nomes repetidos entre estados, como "Bom Jesus" no Piauí e no Rio Grande
+    # do Sul
+    directory._index(
+        {
+            "states": [
+                {"id": "pi", "name": "Piauí"},
+                {"id": "rs", "name": "Rio Grande do Sul"},
+                {"id": "ba", "name": "Bahia"},
+            ],
+            "cities": [
+                {"id": "pi-bj", "state_id": "pi", "name": "Bom Jesus"},
+                {"id": "rs-bj", "state_id": "rs", "name": "Bom Jesus"},
+                {"id": "ba-ssa", "state_id": "ba", "name": "Salvador"},
+            ],
+            "updated_at": 0.0,
+        }
+    )
+    return directory
+
+
+def test_resolve_city_within_the_state(directory):
+    assert directory.resolve("bom jesus", "PIAUI") == ("pi", "pi-bj")
+    assert directory.resolve("Bom Jesus", "Rio Grande do Sul") == ("rs", "rs-bj")
+
+
+def test_city_missing_from_the_state_is_not_taken_from_another(directory):
+    assert directory.resolve("Bom Jesus", "Bahia") == ("ba", None)
+
+
+def test_city_is_resolved_by_name_when_the_state_is_unknown(directory):
+    assert directory.resolve("Salvador", "Baía") == (None, "ba-ssa")
+    assert directory.resolve("Cidade", "Estado") == (None, None)
@@ -0,0 +1,175 @@
+import asyncio
+
+import httpx
+import pytest
+from app.config import settings
+from app.infrastructure.api_clients.crossfire_client import (
+    CrossfireAPIService,
+    PartialOccurrencesError,
+)
+from app.infrastructure.resilience.circuit_breaker import CircuitOpenError
+from app.infrastructure.resilience.rate_limiter import RateLimitExceededError
+
+TAKE = 3
+
+
+class FakeLocationDirectory:
+    async def ensure_loaded(self, gateway):
+        pass
+
+    def resolve(self, city_name: str, state_name: str) -> tuple[str, str]:
+        return "state-id", "city-id"
+
+
+class FakeCrossfireAPIService(CrossfireAPIService):
+    """
+    Serviço com as respostas de cada página definidas no teste: uma lista de
+    itens, uma exceção a lançar, ou um payload completo (dict).
+    """
+
+    def __init__(self, pages: dict, page_meta: dict | None = None):
+        super().__init__(client=None, location_directory=FakeLocationDirectory())
+        self.set_access_token("token")
+        self.pages = pages
+        self.page_meta = page_meta
+        self.requested: list[int] = []
+
+    async def _fetch_page(self, params: dict, page: int) -> dict:
+        self.requested.append(page)
+        response = self.pages.get(page, [])
+        if isinstance(response, Exception):
+            raise response
+        if isinstance(response, dict):
+            return response
+        payload = {"code": 200, "data": response}
+        if page == 1 and self.page_meta is not None:
+            payload["pageMeta"] = self.page_meta
+        return payload
+
+
+@pytest.fixture(autouse=True)
+def page_settings(monkeypatch):
+    monkeypatch.setattr(settings, "CROSSFIRE_PAGE_SIZE", TAKE)
+    monkeypatch.setattr(settings, "CROSSFIRE_MAX_CONCURRENT_PAGES", 2)
+    monkeypatch.setattr(settings, "CROSSFIRE_MAX_FALLBACK_PAGES", 10)
+
+
+def _items(page: int, count: int = TAKE) -> list[dict]:
+    return [{"id": f"{page}-{i}"} for i in range(count)]
+
+
+def _get_occurrences(service: CrossfireAPIService) -> list[dict]:
+    return asyncio.run(
+        service.get_occurrences("Rio de Janeiro", "Rio de Janeiro", "a", "b")
+    )
+
+
+@pytest.mark.parametrize(
+    "page_meta", [{"pageCount": 3}, {"itemCount": 3 * TAKE, "take": TAKE}]
+)
+def test_fetches_the_pages_given_by_page_meta(page_meta):
+    service = FakeCrossfireAPIService(
+        {1: _items(1), 2: _items(2), 3: _items(3)}, page_meta=page_meta
+    )
+
+    occurrences = _get_occurrences(service)
+
+    # Juntas pela ordem das páginas, qualquer que seja a ordem de chegada
+    assert occurrences == _items(1) + _items(2) + _items(3)
+    assert sorted(service.requested) == [1, 2, 3]
+
+
+def test_failed_pages_are_reported_with_the_partial_result():
+    service = FakeCrossfireAPIService(
+        {
+            1: _items(1),
+            2: httpx.ConnectError("falhou"),
+            3: _items(3),
+            4: {"code": 500},
+        },
+        page_meta={"pageCount": 4},
+    )
+
+    with pytest.raises(PartialOccurrencesError) as error:
+        _get_occurrences(service)
+
+    assert error.value.failed_pages == [2, 4]
+    assert error.value.occurrences == _items(1) + _items(3)
+
+
+def test_first_page_failure_is_partial():
+    service = FakeCrossfireAPIService({1: {"code": 500}})
+
+    with pytest.raises(PartialOccurrencesError) as error:
+        _get_occurrences(service)
+
+    assert error.value.failed_pages == [1]
+    assert error.value.occurrences == []
+
+
+def test_single_incomplete_page_without_page_meta():
+    service = FakeCrossfireAPIService({1: _items(1, 2)})
+
+    assert _get_occurrences(service) == _items(1, 2)
+    assert service.requested == [1]
+
+
+def test_without_page_meta_stops_at_the_first_incomplete_page():
+    service = FakeCrossfireAPIService(
+        {1: _items(1), 2: _items(2), 3: _items(3), 4: _items(4, 1)}
+    )
+
+    assert _get_occurrences(service) == (
+        _items(1) + _items(2) + _items(3) + _items(4, 1)
+    )
+    # Lotes de CROSSFIRE_MAX_CONCURRENT_PAGES páginas: [2, 3] e [4, 5]
+    assert sorted(service.requested) == [1, 2, 3, 4, 5]
+
+
+def test_fallback_stops_when_a_whole_batch_fails():
+    service = FakeCrossfireAPIService(
+        {
+            1: _items(1),
+            2: _items(2),
+            3: _items(3),
+            4: httpx.ConnectError("falhou"),
+            5: httpx.ConnectError("falhou"),
+        }
+    )
+
+    with pytest.raises(PartialOccurrencesError) as error:
+        _get_occurrences(service)
+
+    assert error.value.failed_pages == [4, 5]
+    assert error.value.occurrences == _items(1) + _items(2) + _items(3)
+    assert sorted(service.requested) == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.parametrize(
+    "rejection",
+    [
+        CircuitOpenError("crossfire", retry_after=30),
+        RateLimitExceededError("crossfire:occurrences", retry_after=5),
+    ],
+)
+def test_fallback_stops_when_requests_are_rejected(rejection):
+    service = FakeCrossfireAPIService({1: _items(1), 2: _items(2), 3: rejection})
+
+    with pytest.raises(PartialOccurrencesError) as error:
+        _get_occurrences(service)
+
+    assert error.value.failed_pages == [3]
+    assert error.value.occurrences == _items(1) + _items(2)
+    assert sorted(service.requested) == [1, 2, 3]
+
+
+def test_fallback_stops_at_the_page_limit():
+    # A API devolve sempre páginas cheias
+    service = FakeCrossfireAPIService({page: _items(page) for page in range(1, 20)})
+
+    with pytest.raises(PartialOccurrencesError) as error:
+        _get_occurrences(service)
+
+    assert error.value.failed_pages == [11]
+    assert len(error.value.occurrences) == 10 * TAKE
+    assert max(service.requested) == settings.CROSSFIRE_MAX_FALLBACK_PAGES
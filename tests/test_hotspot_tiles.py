@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+from app.core.use_cases.build_hotspot_tiles_use_case import BuildHotspotTilesUseCase
+from app.core.utils.tiles import tile_coordinates, tile_key
+from app.infrastructure.clustering.engines import ProjectedDBSCANEngine
+
+
+def test_tile_coordinates():
+    xs, ys = tile_coordinates(np.array([0.0, -22.9068]), np.array([0.0, -43.1729]), 10)
+
+    assert xs[0] == ys[0] == 512.0
+    # Centro do Rio de Janeiro: tile 389/578 no zoom 10
+    assert (int(xs[1]), int(ys[1])) == (389, 578)
+
+
+def test_tile_coordinates_at_the_edges():
+    xs, ys = tile_coordinates(np.array([90.0, -90.0]), np.array([180.0, -180.0]), 2)
+
+    assert xs.tolist() == [np.nextafter(4, 0), 0.0]
+    assert ys[0] == 0.0
+    assert int(ys[1]) == 3
+
+
+def _occurrence(occurrence_id: str, latitude: float, longitude: float) -> dict:
+    return {"id": occurrence_id, "latitude": latitude, "longitude": longitude}
+
+
+# Dois grupos densos no Rio de Janeiro e uma ocorrência isolada em Niterói
+OCCURRENCES = (
+    [_occurrence(f"a{i}", -22.9000 + i * 0.0005, -43.2000) for i in range(4)]
+    + [_occurrence(f"b{i}", -22.9500, -43.3000 + i * 0.0005) for i in range(4)]
+    + [_occurrence("c", -22.8800, -43.1000), _occurrence("x", None, None)]
+)
+
+
+@pytest.fixture
+def epsilons() -> list[float]:
+    return []
+
+
+@pytest.fixture
+def use_case(epsilons) -> BuildHotspotTilesUseCase:
+    def engine_factory(epsilon_km: float) -> ProjectedDBSCANEngine:
+        epsilons.append(epsilon_km)
+        return ProjectedDBSCANEngine(epsilon_km=epsilon_km, min_samples=3)
+
+    return BuildHotspotTilesUseCase(
+        engine_factory=engine_factory,
+        epsilon_km=0.25,
+        min_zoom=8,
+        max_zoom=16,
+        grid_max_zoom=10,
+        reference_zoom=14,
+        grid_size=4,
+    )
+
+
+def test_pyramid_has_grid_then_cluster_zooms(use_case):
+    tiles = use_case.execute(OCCURRENCES)
+
+    assert sorted(tiles) == list(range(8, 17))
+    for zoom, zoom_tiles in tiles.items():
+        kinds = {tile["kind"] for tile in zoom_tiles.values()}
+        assert kinds == ({"grid"} if zoom <= 10 else {"clusters"})
+
+
+def test_grid_tiles_aggregate_every_valid_occurrence(use_case):
+    tiles = use_case.execute(OCCURRENCES)
+
+    for zoom in range(8, 11):
+        features = [
+            feature for tile in tiles[zoom].values() for feature in tile["features"]
+        ]
+        assert sum(feature["count"] for feature in features) == 9
+        # Cada célula fica no tile que contém o seu centróide
+        for key, tile in tiles[zoom].items():
+            for feature in tile["features"]:
+                xs, ys = tile_coordinates(
+                    np.array([feature["latitude"]]),
+                    np.array([feature["longitude"]]),
+                    zoom,
+                )
+                assert tile_key(int(xs[0]), int(ys[0])) == key
+
+
+def test_cluster_tiles_hold_the_clusters_touching_them(use_case):
+    tiles = use_case.execute(OCCURRENCES)
+
+    clusters = {
+        feature["cluster"]: feature
+        for tile in tiles[16].values()
+        for feature in tile["features"]
+    }
+    assert sorted(feature["count"] for feature in clusters.values()) == [4, 4]
+    for feature in clusters.values():
+        hull = np.array(feature["hull"])
+        xs, ys = tile_coordinates(hull[:, 0], hull[:, 1], 16)
+        touched = {
+            tile_key(x, y)
+            for x in range(int(xs.min()), int(xs.max()) + 1)
+            for y in range(int(ys.min()), int(ys.max()) + 1)
+        }
+        holding = {
+            key for key, tile in tiles[16].items() if feature in tile["features"]
+        }
+        assert holding == touched
+
+
+def test_cluster_radius_halves_per_zoom_until_the_reference(use_case, epsilons):
+    use_case.execute(OCCURRENCES)
+
+    # Zooms 11 a 13 dobram o raio a cada nível abaixo do 14; de 14 em diante o
+    # raio é o de referência, agrupado uma única vez
+    assert epsilons == [2.0, 1.0, 0.5, 0.25]
+
+
+def test_empty_pyramid(use_case, epsilons):
+    assert use_case.execute([]) == {}
+    assert use_case.execute([_occurrence("x", None, None)]) == {}
+    assert epsilons == []
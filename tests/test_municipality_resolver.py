@@ -0,0 +1,156 @@
+import json
+
+import numpy as np
+import pytest
+from app.config import settings
+from app.core.utils.geo import polygon_contains, ring_contains
+from app.infrastructure.geo import municipality_resolver
+from app.infrastructure.geo.municipality_resolver import (
+    MunicipalityResolver,
+    get_municipality_resolver,
+)
+
+SQUARE = np.array([(0, 0), (4, 0), (4, 4), (0, 4), (0, 0)], dtype=np.float64)
+HOLE = np.array([(1, 1), (3, 1), (3, 3), (1, 3), (1, 1)], dtype=np.float64)
+# "U" côncavo: a reentrância entre x=1 e x=3 acima de y=1 fica de fora
+CONCAVE = np.array(
+    [(0, 0), (4, 0), (4, 4), (3, 4), (3, 1), (1, 1), (1, 4), (0, 4)],
+    dtype=np.float64,
+)
+
+
+@pytest.mark.parametrize(
+    "point, inside",
+    [((2, 2), True), ((0.5, 3.9), True), ((5, 2), False), ((2, -1), False)],
+)
+def test_ring_contains(point, inside):
+    assert ring_contains(SQUARE, *point) is inside
+
+
+@pytest.mark.parametrize(
+    "point, inside",
+    [((0.5, 3), True), ((3.5, 3), True), ((2, 0.5), True), ((2, 3), False)],
+)
+def test_ring_contains_concave_ring(point, inside):
+    # Anel aberto: o último vértice liga-se ao primeiro
+    assert ring_contains(CONCAVE, *point) is inside
+
+
+def test_polygon_contains_excludes_holes():
+    assert polygon_contains([SQUARE, HOLE], 0.5, 0.5)
+    assert not polygon_contains([SQUARE, HOLE], 2, 2)
+    assert not polygon_contains([SQUARE, HOLE], 5, 5)
+
+
+def _feature(name: str, state: str, geometry: dict) -> dict:
+    return {
+        "type": "Feature",
+        "properties": {"NM_MUN": name, "SIGLA_UF": state},
+        "geometry": geometry,
+    }
+
+
+def _square(min_x: float, min_y: float, size: float) -> list:
+    return [
+        [
+            [min_x, min_y],
+            [min_x + size, min_y],
+            [min_x + size, min_y + size],
+            [min_x, min_y + size],
+            [min_x, min_y],
+        ]
+    ]
+
+
+@pytest.fixture
+def boundaries_path(tmp_path) -> str:
+    collection = {
+        "type": "FeatureCollection",
+        "features": [
+            _feature(
+                "Cidade A", "RJ", {"type": "Polygon", "coordinates": _square(0, 0, 1)}
+            ),
+            # Município em duas partes, com um buraco na primeira
+            _feature(
+                "Cidade B",
+                "Bahia",
+                {
+                    "type": "MultiPolygon",
+                    "coordinates": [
+                        _square(1, 0, 2) + _square(1.5, 0.5, 0.5)[:1],
+                        _square(5, 5, 0.5),
+                    ],
+                },
+            ),
+            _feature("Sem geometria", "SP", None),
+            _feature("Ponto", "SP", {"type": "Point", "coordinates": [0.5, 0.5]}),
+        ],
+    }
+    path = tmp_path / "municipalities.geojson"
+    path.write_text(json.dumps(collection), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("cell_size", [0.25, 10.0])
+def test_resolver_finds_the_municipality(boundaries_path, cell_size):
+    resolver = MunicipalityResolver(cell_size=cell_size)
+    resolver.load(boundaries_path, name_property="NM_MUN", state_property="SIGLA_UF")
+
+    assert resolver.is_loaded
+    assert resolver.resolve(latitude=0.5, longitude=0.5) == (
+        "Cidade A",
+        "Rio de Janeiro",
+    )
+    assert resolver.resolve(latitude=1.5, longitude=2.5) == ("Cidade B", "Bahia")
+    assert resolver.resolve(latitude=5.25, longitude=5.25) == ("Cidade B", "Bahia")
+    # Dentro do buraco, fora de todos os municípios e fora da grade
+    assert resolver.resolve(latitude=0.75, longitude=1.75) is None
+    assert resolver.resolve(latitude=4.0, longitude=4.0) is None
+    assert resolver.resolve(latitude=-30.0, longitude=-50.0) is None
+
+
+def test_empty_resolver_resolves_nothing():
+    resolver = MunicipalityResolver(cell_size=0.25)
+
+    assert not resolver.is_loaded
+    assert resolver.resolve(latitude=0.5, longitude=0.5) is None
+
+
+@pytest.fixture
+def resolver_singleton(monkeypatch):
+    monkeypatch.setattr(municipality_resolver, "_municipality_resolver_instance", None)
+
+
+def test_missing_boundaries_are_optional_by_default(
+    monkeypatch, tmp_path, resolver_singleton
+):
+    monkeypatch.setattr(
+        settings, "MUNICIPALITY_BOUNDARIES_PATH", str(tmp_path / "missing.geojson")
+    )
+    monkeypatch.setattr(settings, "MUNICIPALITY_BOUNDARIES_REQUIRED", False)
+
+    assert not get_municipality_resolver().is_loaded
+
+
+def test_missing_boundaries_fail_when_required(
+    monkeypatch, tmp_path, resolver_singleton
+):
+    monkeypatch.setattr(
+        settings, "MUNICIPALITY_BOUNDARIES_PATH", str(tmp_path / "missing.geojson")
+    )
+    monkeypatch.setattr(settings, "MUNICIPALITY_BOUNDARIES_REQUIRED", True)
+
+    with pytest.raises(RuntimeError):
+        get_municipality_resolver()
+
+
+def test_boundaries_are_loaded_once(monkeypatch, boundaries_path, resolver_singleton):
+    monkeypatch.setattr(settings, "MUNICIPALITY_BOUNDARIES_PATH", boundaries_path)
+    monkeypatch.setattr(settings, "MUNICIPALITY_NAME_PROPERTY", "NM_MUN")
+    monkeypatch.setattr(settings, "MUNICIPALITY_STATE_PROPERTY", "SIGLA_UF")
+    monkeypatch.setattr(settings, "MUNICIPALITY_BOUNDARIES_REQUIRED", True)
+
+    resolver = get_municipality_resolver()
+
+    assert resolver.is_loaded
+    assert get_municipality_resolver() is resolver
@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+from app.api.routers.occurrences import _stream_and_cache_pages
+from app.infrastructure.api_clients.crossfire_client import PartialOccurrencesError
+from app.infrastructure.cache.hot_cache import HotCache
+from app.infrastructure.cache.lru_cache import TTLLRUCache
+
+ANALYSIS_ID = "occurrences:test"
+
+
+def _occurrence(occurrence_id: str) -> dict:
+    return {"id": occurrence_id}
+
+
+async def _pages(error: Exception | None = None):
+    yield 2, [_occurrence("c"), _occurrence("d")]
+    if error is not None:
+        raise error
+    yield 3, [_occurrence("e")]
+
+
+def _stream(redis_client, pages) -> list[dict]:
+    async def consume():
+        owner = await redis_client.acquire_lock(f"{ANALYSIS_ID}:refresh", 60_000)
+        hot_cache = HotCache(redis_client, TTLLRUCache(max_entries=8, ttl=60))
+        chunks = [
+            chunk
+            async for chunk in _stream_and_cache_pages(
+                [_occurrence("a"), _occurrence("b")],
+                pages,
+                redis_client,
+                hot_cache,
+                ANALYSIS_ID,
+                owner,
+            )
+        ]
+        # O lock é sempre libertado no fim da transmissão
+        assert await redis_client.acquire_lock(f"{ANALYSIS_ID}:refresh", 60_000)
+        return chunks
+
+    chunks = asyncio.run(consume())
+    return [json.loads(line) for line in "".join(chunks).splitlines()]
+
+
+def _cached(redis_client):
+    async def read():
+        return await redis_client.get_cache_entry(ANALYSIS_ID)
+
+    return asyncio.run(read())
+
+
+def test_complete_stream_is_cached(redis_client):
+    lines = _stream(redis_client, _pages())
+
+    assert [line["id"] for line in lines] == ["a", "b", "c", "d", "e"]
+    entry = _cached(redis_client)
+    assert [json.loads(item)["id"] for item in entry.iter_items()] == [
+        "a",
+        "b",
+        "c",
+        "d",
+        "e",
+    ]
+
+
+def test_partial_stream_ends_with_the_failed_pages(redis_client):
+    error = PartialOccurrencesError(failed_pages=[3])
+
+    lines = _stream(redis_client, _pages(error))
+
+    assert [line.get("id") for line in lines[:-1]] == ["a", "b", "c", "d"]
+    assert lines[-1] == {"partial": True, "failed_pages": [3]}
+    assert _cached(redis_client) is None
+
+
+def test_failed_stream_ends_with_a_partial_line(redis_client):
+    lines = _stream(redis_client, _pages(RuntimeError("ligação perdida")))
+
+    assert [line.get("id") for line in lines[:-1]] == ["a", "b", "c", "d"]
+    assert lines[-1]["partial"] is True
+    assert "error" in lines[-1]
+    assert _cached(redis_client) is None
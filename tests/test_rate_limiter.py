@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+import pytest
+from app.config import RateLimit, settings
+from app.infrastructure.resilience import rate_limiter
+from app.infrastructure.resilience.rate_limiter import (
+    RateLimiter,
+    RateLimitExceededError,
+)
+
+BUCKET = "test:bucket"
+
+
+@pytest.fixture(autouse=True)
+def rate_limits(monkeypatch):
+    monkeypatch.setitem(
+        settings.RATE_LIMITS, BUCKET, RateLimit(rate=1, burst=2, max_wait=1.5)
+    )
+
+
+def test_burst_is_admitted_then_requests_queue(redis_client):
+    limiter = RateLimiter(redis_client)
+
+    async def reserve_all():
+        return [await limiter._reserve(BUCKET) for _ in range(3)]
+
+    waits = asyncio.run(reserve_all())
+
+    assert waits[:2] == [0.0, 0.0]
+    # 1 token/s: cada pedido em fila espera mais ~1 s que o anterior
+    assert waits[2] == pytest.approx(1.0, abs=0.1)
+
+
+def test_request_over_max_wait_is_rejected(redis_client):
+    limiter = RateLimiter(redis_client)
+
+    async def reserve_all():
+        for _ in range(3):
+            await limiter._reserve(BUCKET)
+        with pytest.raises(RateLimitExceededError) as error:
+            await limiter._reserve(BUCKET)
+        metrics = await redis_client.r.hgetall(f"ratelimit:metrics:{BUCKET}")
+        tokens = await redis_client.r.hget(f"ratelimit:bucket:{BUCKET}", "tokens")
+        return error.value, metrics, tokens
+
+    error, metrics, tokens = asyncio.run(reserve_all())
+
+    assert error.bucket == BUCKET
+    assert error.retry_after == pytest.approx(2.0, abs=0.1)
+    assert metrics[b"admitted"] == b"2"
+    assert metrics[b"throttled"] == b"1"
+    assert metrics[b"rejected"] == b"1"
+    # O pedido recusado não reserva nenhum token
+    assert float(tokens) == pytest.approx(-1, abs=0.1)
+
+
+def test_tokens_refill_over_time(redis_client):
+    limiter = RateLimiter(redis_client)
+
+    async def reserve_after_idle():
+        # Balde vazio há dois segundos: já recuperou os tokens do burst
+        await redis_client.r.hset(
+            f"ratelimit:bucket:{BUCKET}",
+            mapping={"tokens": 0, "updated_at": int(time.time() * 1000) - 2000},
+        )
+        return [await limiter._reserve(BUCKET) for _ in range(2)]
+
+    assert asyncio.run(reserve_after_idle()) == [0.0, 0.0]
+
+
+def test_acquire_waits_for_the_reserved_token(redis_client, monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(delay: float):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    limiter = RateLimiter(redis_client)
+
+    async def acquire_all():
+        for _ in range(3):
+            await limiter.acquire(BUCKET)
+
+    asyncio.run(acquire_all())
+
+    assert sleeps == [pytest.approx(1.0, abs=0.1)]
+
+
+def test_unlimited_without_bucket_or_redis(redis_client):
+    assert asyncio.run(RateLimiter(redis_client)._reserve("unknown")) == 0.0
+    assert asyncio.run(RateLimiter(None)._reserve(BUCKET)) == 0.0
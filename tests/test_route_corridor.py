@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+from app.core.utils.geo import haversine_km
+from app.core.utils.polyline import decode_polyline
+from app.core.utils.route_corridor import (
+    densify_route,
+    occurrences_along_route,
+    route_grid_cells,
+    route_length_km,
+)
+from app.core.utils.spatial_index import KM_PER_DEGREE, build_grid_index
+
+# Exemplo da documentação do "Encoded Polyline Algorithm Format"
+ENCODED = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+DECODED = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+
+CELL_SIZE = 0.01
+
+# Rota em "L": para leste ao longo da latitude -22.9 e depois para norte
+ROUTE = np.array([(-22.9, -43.3), (-22.9, -43.2), (-22.8, -43.2)])
+
+
+def _occurrence(occurrence_id: str, latitude, longitude) -> dict:
+    return {"id": occurrence_id, "latitude": latitude, "longitude": longitude}
+
+
+def test_decode_polyline():
+    assert np.allclose(decode_polyline(ENCODED), DECODED)
+    assert np.allclose(decode_polyline(ENCODED, precision=6), np.array(DECODED) / 10)
+    assert decode_polyline("") == []
+
+
+@pytest.mark.parametrize("encoded", [ENCODED[:-1], "_p~iF", "_p~iF ~ps|U"])
+def test_decode_invalid_polyline(encoded):
+    with pytest.raises(ValueError):
+        decode_polyline(encoded)
+
+
+def test_route_length_km():
+    east = haversine_km(-22.9, -43.3, np.array([-22.9]), np.array([-43.2]))[0]
+    north = 0.1 * KM_PER_DEGREE
+
+    assert route_length_km(ROUTE) == pytest.approx(east + north)
+    assert route_length_km(ROUTE[:1]) == 0.0
+
+
+def test_densify_route_keeps_the_vertices():
+    samples = densify_route(ROUTE, spacing_km=1.0)
+
+    for vertex in ROUTE:
+        assert (np.abs(samples - vertex).sum(axis=1) < 1e-9).any()
+    steps = haversine_km(
+        samples[:-1, 0], samples[:-1, 1], samples[1:, 0], samples[1:, 1]
+    )
+    assert steps.max() <= 1.0
+    assert len(samples) == 1 + 11 + 12
+
+
+def test_route_grid_cells_hold_every_occurrence_in_the_corridor():
+    rng = np.random.default_rng(7)
+    occurrences = [
+        _occurrence(str(i), latitude, longitude)
+        for i, (latitude, longitude) in enumerate(
+            zip(rng.uniform(-23.0, -22.7, 3000), rng.uniform(-43.4, -43.1, 3000))
+        )
+    ]
+    corridor_km = 0.5
+
+    index = build_grid_index(occurrences, CELL_SIZE)
+    candidates = [
+        occurrence
+        for cell in route_grid_cells(ROUTE, corridor_km, CELL_SIZE)
+        for occurrence in index.get(cell, [])
+    ]
+
+    from_grid, _ = occurrences_along_route(candidates, ROUTE, corridor_km)
+    from_scan, _ = occurrences_along_route(occurrences, ROUTE, corridor_km)
+
+    assert from_scan
+    assert len(candidates) < len(occurrences)
+    # O plano da projeção depende das ocorrências, por isso só o conjunto conta
+    assert sorted(o["id"] for o in from_grid) == sorted(o["id"] for o in from_scan)
+
+
+def test_occurrences_along_route():
+    occurrences = [
+        # ~0,5 km a leste do meio do segmento para norte
+        _occurrence("north", -22.85, -43.2 + 0.5 / 102.5),
+        _occurrence("start", -22.9, -43.3),
+        # ~0,33 km a sul do primeiro segmento
+        _occurrence("middle", -22.903, -43.25),
+        _occurrence("far", -22.95, -43.25),
+        _occurrence("invalid", None, -43.25),
+    ]
+
+    matches, counts = occurrences_along_route(occurrences, ROUTE, corridor_km=0.6)
+
+    assert [o["id"] for o in matches] == ["start", "middle", "north"]
+    start, middle, north = matches
+    assert (start["distance_km"], start["along_km"], start["segment"]) == (0, 0, 0)
+    assert middle["distance_km"] == pytest.approx(0.334, abs=0.005)
+    assert middle["along_km"] == pytest.approx(5.12, abs=0.05)
+    assert middle["segment"] == 0
+    assert north["distance_km"] == pytest.approx(0.5, abs=0.01)
+    assert north["along_km"] == pytest.approx(10.24 + 5.56, abs=0.05)
+    assert north["segment"] == 1
+    assert counts == [2, 1]
+    # Os registos originais não são alterados
+    assert "distance_km" not in occurrences[0]
+
+
+def test_occurrences_around_a_single_point():
+    occurrences = [
+        _occurrence("near", -22.901, -43.2),
+        _occurrence("far", -22.95, -43.2),
+    ]
+
+    matches, counts = occurrences_along_route(occurrences, ROUTE[1:2], 1.0)
+
+    assert [o["id"] for o in matches] == ["near"]
+    assert matches[0]["distance_km"] == pytest.approx(0.111, abs=0.001)
+    assert counts == [1]
+
+
+def test_occurrences_along_route_without_occurrences():
+    assert occurrences_along_route([], ROUTE, 1.0) == ([], [0, 0])
+    assert occurrences_along_route([_occurrence("a", None, None)], ROUTE, 1.0) == (
+        [],
+        [0, 0],
+    )
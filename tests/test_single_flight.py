@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+from app.infrastructure.resilience.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = 0
+
+    async def scenario():
+        single_flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def operation() -> str:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "result"
+
+        waiting = [
+            asyncio.create_task(single_flight.run("key", operation)) for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiting)
+        # Concluída a chave, uma nova chamada volta a executar
+        results.append(await single_flight.run("key", operation))
+        return results
+
+    assert asyncio.run(scenario()) == ["result"] * 6
+    assert calls == 2
+
+
+def test_callers_receive_the_same_exception():
+    async def scenario():
+        single_flight = SingleFlight()
+
+        async def operation():
+            await asyncio.sleep(0)
+            raise ValueError("falhou")
+
+        return await asyncio.gather(
+            single_flight.run("key", operation),
+            single_flight.run("key", operation),
+            return_exceptions=True,
+        )
+
+    first, second = asyncio.run(scenario())
+    assert isinstance(first, ValueError)
+    assert first is second
+
+
+def test_cancelling_one_caller_keeps_the_others():
+    async def scenario():
+        single_flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def operation() -> str:
+            await release.wait()
+            return "result"
+
+        cancelled = asyncio.create_task(single_flight.run("key", operation))
+        kept = asyncio.create_task(single_flight.run("key", operation))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return await kept, cancelled.cancelled()
+
+    assert asyncio.run(scenario()) == ("result", True)
+
+
+def test_find_prefix_of_in_flight_and_recent_keys():
+    async def scenario():
+        single_flight = SingleFlight(recent_window=60)
+        release = asyncio.Event()
+
+        async def operation() -> list[str]:
+            await release.wait()
+            return ["rua sao joao"]
+
+        await single_flight.run("ru", lambda: asyncio.sleep(0, result=["rua"]))
+        in_flight = asyncio.create_task(single_flight.run("rua sao", operation))
+        await asyncio.sleep(0)
+
+        pending_match = asyncio.create_task(single_flight.find_prefix("rua sao j"))
+        await asyncio.sleep(0)
+        release.set()
+        await in_flight
+
+        return (
+            await pending_match,
+            await single_flight.find_prefix("rua sao jo"),
+            await single_flight.find_prefix("rua"),
+            await single_flight.find_prefix("av"),
+        )
+
+    pending, recent, shorter, missing = asyncio.run(scenario())
+    assert pending == ("rua sao", ["rua sao joao"])
+    assert recent == ("rua sao", ["rua sao joao"])
+    assert shorter == ("ru", ["rua"])
+    assert missing is None
+
+
+def test_completed_keys_are_not_kept_without_recent_window():
+    async def scenario():
+        single_flight = SingleFlight()
+        await single_flight.run("rua", lambda: asyncio.sleep(0, result=["rua"]))
+        return await single_flight.find_prefix("rua sao")
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_find_prefix_ignores_failed_keys():
+    async def scenario():
+        single_flight = SingleFlight(recent_window=60)
+
+        async def operation():
+            await asyncio.sleep(0)
+            raise ValueError("falhou")
+
+        failing = asyncio.create_task(single_flight.run("rua", operation))
+        await asyncio.sleep(0)
+        match = await single_flight.find_prefix("rua sao")
+        with pytest.raises(ValueError):
+            await failing
+        return match, await single_flight.find_prefix("rua sao")
+
+    assert asyncio.run(scenario()) == (None, None)
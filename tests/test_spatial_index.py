@@ -0,0 +1,151 @@
+import numpy as np
+import pytest
+from app.core.entities.bounding_box import BoundingBox
+from app.core.utils.geo import haversine_km
+from app.core.utils.spatial_index import (
+    build_grid_index,
+    count_grid_cells,
+    grid_cells_in,
+    occurrences_in_bbox,
+    occurrences_in_radius,
+    radius_bounding_box,
+)
+
+CELL_SIZE = 0.01
+
+
+def _occurrence(occurrence_id: str, latitude, longitude, date: str = "") -> dict:
+    return {
+        "id": occurrence_id,
+        "latitude": latitude,
+        "longitude": longitude,
+        "date": date,
+    }
+
+
+def test_haversine_km():
+    distances = haversine_km(
+        -22.9068,
+        -43.1729,
+        np.array([-22.9068, -23.5505]),
+        np.array([-43.1729, -46.6333]),
+    )
+
+    # Rio de Janeiro - São Paulo: ~361 km
+    assert distances[0] == 0.0
+    assert distances[1] == pytest.approx(361, abs=2)
+
+
+def test_build_grid_index():
+    occurrences = [
+        _occurrence("a", -22.905, -43.175),
+        _occurrence("b", "-22.901", "-43.171"),
+        _occurrence("c", 0.005, 0.015),
+        _occurrence("d", None, -43.17),
+    ]
+
+    index = build_grid_index(occurrences, CELL_SIZE)
+
+    assert index == {
+        "-2291:-4318": [occurrences[0], occurrences[1]],
+        "0:1": [occurrences[2]],
+    }
+
+
+def test_grid_cells_in_bbox():
+    bbox = BoundingBox(
+        min_latitude=-0.015, min_longitude=0.005, max_latitude=0.005, max_longitude=0.02
+    )
+
+    cells = grid_cells_in(bbox, CELL_SIZE)
+
+    assert cells == [
+        "-2:0",
+        "-2:1",
+        "-2:2",
+        "-1:0",
+        "-1:1",
+        "-1:2",
+        "0:0",
+        "0:1",
+        "0:2",
+    ]
+    assert count_grid_cells(bbox, CELL_SIZE) == len(cells)
+
+
+def test_radius_bounding_box_contains_the_circle():
+    bbox = radius_bounding_box(-22.9, -43.2, radius_km=2.0)
+
+    north = haversine_km(-22.9, -43.2, np.array([bbox.max_latitude]), np.array([-43.2]))
+    east = haversine_km(-22.9, -43.2, np.array([-22.9]), np.array([bbox.max_longitude]))
+    assert north[0] == pytest.approx(2.0, rel=1e-3)
+    assert east[0] == pytest.approx(2.0, rel=1e-2)
+    assert bbox.min_latitude == pytest.approx(-22.9 - (bbox.max_latitude + 22.9))
+
+
+def test_radius_bounding_box_near_the_pole():
+    bbox = radius_bounding_box(90.0, 0.0, radius_km=10.0)
+
+    assert bbox.min_longitude == -180.0
+    assert bbox.max_longitude == 180.0
+
+
+def test_radius_query_on_the_grid_cells_matches_a_full_scan():
+    rng = np.random.default_rng(42)
+    occurrences = [
+        _occurrence(str(i), latitude, longitude)
+        for i, (latitude, longitude) in enumerate(
+            zip(rng.uniform(-23.0, -22.8, 2000), rng.uniform(-43.4, -43.1, 2000))
+        )
+    ]
+    latitude, longitude, radius_km = -22.9, -43.25, 1.5
+
+    index = build_grid_index(occurrences, CELL_SIZE)
+    bbox = radius_bounding_box(latitude, longitude, radius_km)
+    candidates = [
+        occurrence
+        for cell in grid_cells_in(bbox, CELL_SIZE)
+        for occurrence in index.get(cell, [])
+    ]
+
+    from_grid = occurrences_in_radius(candidates, latitude, longitude, radius_km)
+    from_scan = occurrences_in_radius(occurrences, latitude, longitude, radius_km)
+
+    assert from_grid
+    assert len(candidates) < len(occurrences)
+    assert sorted(o["id"] for o in from_grid) == sorted(o["id"] for o in from_scan)
+
+
+def test_occurrences_in_radius_are_sorted_by_distance():
+    occurrences = [
+        _occurrence("far", -22.91, -43.2),
+        _occurrence("outside", -23.0, -43.2),
+        _occurrence("near", -22.901, -43.2),
+        _occurrence("invalid", "x", -43.2),
+    ]
+
+    selected = occurrences_in_radius(occurrences, -22.9, -43.2, radius_km=2.0)
+
+    assert [o["id"] for o in selected] == ["near", "far"]
+    assert selected[0]["distance_km"] == pytest.approx(0.111, abs=0.001)
+    assert selected[1]["distance_km"] == pytest.approx(1.112, abs=0.001)
+    assert "distance_km" not in occurrences[0]
+
+
+def test_occurrences_in_bbox_are_sorted_by_date():
+    occurrences = [
+        _occurrence("old", -22.9, -43.2, "2025-01-01"),
+        _occurrence("outside", -22.7, -43.2, "2025-03-01"),
+        _occurrence("new", -22.85, -43.25, "2025-02-01"),
+        _occurrence("edge", -22.8, -43.3, "2025-01-15"),
+    ]
+    bbox = BoundingBox(
+        min_latitude=-22.95,
+        min_longitude=-43.3,
+        max_latitude=-22.8,
+        max_longitude=-43.1,
+    )
+
+    selected = occurrences_in_bbox(occurrences, bbox)
+
+    assert [o["id"] for o in selected] == ["new", "edge", "old"]
@@ -0,0 +1,96 @@
+import pytest
+from app.infrastructure.database.repositories.sqlite_occurrence_store import (
+    SQLiteOccurrenceStore,
+)
+
+CITY = "rio de janeiro/rio de janeiro"
+
+
+def _occurrence(occurrence_id: str, day: str) -> dict:
+    return {"id": occurrence_id, "date": f"{day}T10:00:00.000Z"}
+
+
+@pytest.fixture
+def store(tmp_path) -> SQLiteOccurrenceStore:
+    return SQLiteOccurrenceStore(str(tmp_path / "data" / "occurrences.sqlite3"))
+
+
+def test_unsynced_city_starts_at_the_window_start(store):
+    assert store.get_sync_start(CITY, "2025-01-01", overlap_days=7) == "2025-01-01"
+
+
+def test_synced_city_resumes_before_the_watermark(store):
+    store.sync(CITY, "2025-01-01", "2025-03-31", "2025-01-01", [])
+
+    assert store.get_sync_start(CITY, "2025-01-02", overlap_days=7) == "2025-03-24"
+    # A sobreposição nunca recua para antes do início da janela
+    assert store.get_sync_start(CITY, "2025-03-30", overlap_days=7) == "2025-03-30"
+
+
+def test_window_starting_before_the_stored_one_needs_a_full_sync(store):
+    store.sync(CITY, "2025-02-01", "2025-03-31", "2025-02-01", [])
+
+    assert store.get_sync_start(CITY, "2025-01-01", overlap_days=7) == "2025-01-01"
+
+
+def test_watermarks_are_per_city(store):
+    store.sync(CITY, "2025-01-01", "2025-03-31", "2025-01-01", [])
+
+    assert store.get_sync_start("niteroi/rio de janeiro", "2025-01-01", 7) == (
+        "2025-01-01"
+    )
+
+
+def test_sync_replaces_the_resynced_range_and_drops_old_occurrences(store):
+    store.sync(
+        CITY,
+        "2025-01-01",
+        "2025-03-31",
+        "2025-01-01",
+        [
+            _occurrence("old", "2025-01-05"),
+            _occurrence("kept", "2025-03-01"),
+            _occurrence("deleted", "2025-03-28"),
+            _occurrence("edited", "2025-03-29"),
+        ],
+    )
+    store.sync(
+        CITY,
+        "2025-01-10",
+        "2025-04-10",
+        "2025-03-24",
+        [
+            {**_occurrence("edited", "2025-03-29"), "address": "novo"},
+            _occurrence("new", "2025-04-09"),
+        ],
+    )
+
+    occurrences = store.get_occurrences(CITY, "2025-01-10", "2025-04-10")
+
+    assert occurrences == [
+        _occurrence("kept", "2025-03-01"),
+        {**_occurrence("edited", "2025-03-29"), "address": "novo"},
+        _occurrence("new", "2025-04-09"),
+    ]
+    assert store.get_sync_start(CITY, "2025-01-11", overlap_days=7) == "2025-04-03"
+
+
+def test_get_occurrences_filters_by_city_and_dates(store):
+    store.sync(
+        CITY,
+        "2025-01-01",
+        "2025-01-31",
+        "2025-01-01",
+        [_occurrence("a", "2025-01-02"), _occurrence("b", "2025-01-20")],
+    )
+    store.sync(
+        "niteroi/rio de janeiro",
+        "2025-01-01",
+        "2025-01-31",
+        "2025-01-01",
+        [_occurrence("c", "2025-01-02")],
+    )
+
+    assert store.get_occurrences(CITY, "2025-01-01", "2025-01-10") == [
+        _occurrence("a", "2025-01-02")
+    ]